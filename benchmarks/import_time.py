@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+ABOUTME: Import-time regression benchmark for the `bb` startup path using `python -X importtime`
+ABOUTME: Fails when startup exceeds a budget or when heavy modules leak onto the startup path
+
+Usage:
+    python benchmarks/import_time.py                # report
+    python benchmarks/import_time.py --max-ms 100   # exit 1 if over budget
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+# Scenarios run in a fresh interpreter. Each must finish without touching the network.
+SCENARIOS = {
+    "import": "import bitbucket_cli.cli",
+    "help": (
+        "from bitbucket_cli.cli import cli\n"
+        "cli(['--help'], standalone_mode=False)"
+    ),
+    "pr-help": (
+        "from bitbucket_cli.cli import cli\n"
+        "cli(['pr', 'review', '--help'], standalone_mode=False)"
+    ),
+}
+
+# Modules that must not be imported before a command actually needs them
+HEAVY_MODULES = ("rich", "requests", "urllib3", "git", "pydantic", "yaml")
+
+
+def run_scenario(code: str) -> Tuple[List[Tuple[str, int, int]], List[str]]:
+    """
+    Run a snippet under ``-X importtime``.
+
+    Returns:
+        (module, self_us, cumulative_us) rows for every import, and the loaded heavy modules
+    """
+    probe = (
+        f"{code}\n"
+        "import sys\n"
+        f"print('HEAVY:' + ','.join(sorted({{m.split('.')[0] for m in sys.modules}} & {set(HEAVY_MODULES)!r})))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # Header row
+        # Keep the indentation: importtime nests imports by indenting them
+        rows.append((module.rstrip()[1:], int(self_us), int(cumulative_us)))
+
+    marker = [line for line in result.stdout.splitlines() if line.startswith("HEAVY:")]
+    heavy = [m for m in marker[-1][len("HEAVY:"):].split(",") if m] if marker else []
+    return rows, heavy
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (median is reported)")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if any scenario's median exceeds this")
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list per scenario")
+    args = parser.parse_args()
+
+    failed = False
+    for name, code in SCENARIOS.items():
+        totals = []
+        slowest: Dict[str, int] = {}
+        heavy: List[str] = []
+        for _ in range(args.runs):
+            rows, heavy = run_scenario(code)
+            # Unindented rows are top-level imports; their cumulative times add up to the total
+            top_level = [(m, c) for m, _, c in rows if not m.startswith(" ")]
+            totals.append(sum(c for _, c in top_level) / 1000)
+            for module, self_us, _ in rows:
+                slowest[module.strip()] = max(slowest.get(module.strip(), 0), self_us)
+
+        median = statistics.median(totals)
+        print(f"{name}: median {median:.1f} ms over {args.runs} runs (min {min(totals):.1f} ms)")
+        for module, self_us in sorted(slowest.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"    {self_us / 1000:7.2f} ms  {module}")
+
+        if heavy:
+            print(f"  FAIL: heavy modules imported at startup: {', '.join(heavy)}")
+            failed = True
+        if args.max_ms is not None and median > args.max_ms:
+            print(f"  FAIL: {median:.1f} ms exceeds budget of {args.max_ms:.1f} ms")
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
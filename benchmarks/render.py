@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+ABOUTME: Output rendering benchmark comparing rich with the plain/orjson backend on large PR lists
+ABOUTME: Times table and JSON output of synthetic pull requests written to an in-memory sink
+
+Usage:
+    python benchmarks/render.py                 # 10,000 PRs, median of 3 runs
+    python benchmarks/render.py --prs 50000 --runs 5
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from bitbucket_cli.utils import render  # noqa: E402
+
+
+def make_prs(count: int) -> List[Dict[str, Any]]:
+    """Synthetic pull requests shaped like list responses (titles include [brackets])."""
+    return [
+        {
+            "id": i,
+            "title": f"[PROJ-{i}] Refactor module {i % 97} for [feature] flag handling",
+            "state": "OPEN" if i % 3 else "MERGED",
+            "author": {"display_name": f"User {i % 50}", "nickname": f"user{i % 50}", "uuid": f"{{u{i % 50}}}"},
+            "created_on": "2025-01-%02dT10:00:00.000000+00:00" % (1 + i % 28),
+            "updated_on": "2025-02-%02dT10:00:00.000000+00:00" % (1 + i % 28),
+            "source": {"branch": {"name": f"feature/{i}"}, "commit": {"hash": f"{i:012x}"}},
+            "destination": {"branch": {"name": "main"}, "repository": {"full_name": "ws/repo"}},
+            "description": "Lorem ipsum dolor sit amet. " * 4,
+        }
+        for i in range(count)
+    ]
+
+
+def rich_table(prs: List[Dict[str, Any]], sink: io.StringIO) -> None:
+    from rich.console import Console
+    from rich.table import Table
+
+    console = Console(file=sink, force_terminal=True, width=120)
+    table = Table(title="Pull Requests")
+    for name, style in (("ID", "cyan"), ("Title", "bold"), ("Author", "green"), ("State", "magenta"), ("Created", "dim")):
+        table.add_column(name, style=style)
+    for p in prs:
+        title = p["title"][:50] + "..." if len(p["title"]) > 50 else p["title"]
+        table.add_row(str(p["id"]), title, p["author"]["nickname"], p["state"], p["created_on"][:10])
+    console.print(table)
+
+
+def rich_json(prs: List[Dict[str, Any]], sink: io.StringIO) -> None:
+    from rich.console import Console
+
+    Console(file=sink, force_terminal=False, width=120).print(json.dumps(prs, indent=2, default=str))
+
+
+def plain_table(prs: List[Dict[str, Any]], sink: io.StringIO) -> None:
+    writer = render.TableWriter([("ID", 6), ("Title", 53), ("Author", 15), ("State", 10), ("Created", 10)], stream=sink)
+    for p in prs:
+        writer.add_row(p["id"], p["title"], p["author"]["nickname"], p["state"], p["created_on"][:10])
+
+
+def fast_json(prs: List[Dict[str, Any]], sink: io.StringIO) -> None:
+    render.write_json(prs, stream=sink)
+
+
+def fast_ndjson(prs: List[Dict[str, Any]], sink: io.StringIO) -> None:
+    for p in prs:
+        render.write_ndjson(p, stream=sink)
+
+
+# name → (renderer, largest PR count it is run on). console.print of one big JSON
+# string grows worse than linearly (about 7 s and 400 MB at 200 PRs), so that
+# scenario runs on a small sample; its per-1k figure understates the real cost
+SCENARIOS: Dict[str, Tuple[Callable[[List[Dict[str, Any]], io.StringIO], None], Optional[int]]] = {
+    "table: rich": (rich_table, None),
+    "table: plain writer": (plain_table, None),
+    "json: rich console.print": (rich_json, 100),
+    "json: write_json": (fast_json, None),
+    "ndjson: write_ndjson": (fast_ndjson, None),
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prs", type=int, default=10_000, help="Pull requests to render")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per scenario (median is reported)")
+    args = parser.parse_args()
+
+    prs = make_prs(args.prs)
+    backend = "orjson" if render.orjson is not None else "json (install the `fast` extra for orjson)"
+    print(f"{args.prs} pull requests, {args.runs} runs each; JSON backend: {backend}")
+
+    for name, (scenario, cap) in SCENARIOS.items():
+        sample = prs[:cap] if cap else prs
+        times = []
+        size = 0
+        for _ in range(args.runs):
+            sink = io.StringIO()
+            started = time.perf_counter()
+            scenario(sample, sink)
+            times.append(time.perf_counter() - started)
+            size = len(sink.getvalue())
+        median = statistics.median(times) * 1000
+        print(
+            f"  {name:26} {len(sample):>7} PRs  median {median:9.1f} ms  "
+            f"{median * 1000 / len(sample):8.1f} ms/1k PRs  ({size / 1024:,.0f} KiB)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
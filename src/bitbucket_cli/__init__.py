@@ -10,18 +10,49 @@ __version__ = "1.0.0"
 __author__ = "CiteMed Development Team"
 __email__ = "dev@citemed.com"
 
-from .api import BitbucketAPI
-from .auth import load_config, save_config
-from .models import PullRequest, Comment, User
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .api import BitbucketAPI
+    from .async_api import AsyncBitbucketAPI
+    from .auth import load_config, save_config
+    from .models import PullRequest, Comment, User
+
+# Public names are imported on first access (PEP 562) so `bb` startup only loads
+# what the invoked command uses — requests and pydantic are comparatively slow.
+_LAZY_ATTRS = {
+    "BitbucketAPI": ".api",
+    "AsyncBitbucketAPI": ".async_api",
+    "load_config": ".auth",
+    "save_config": ".auth",
+    "PullRequest": ".models",
+    "Comment": ".models",
+    "User": ".models",
+}
 
 __all__ = [
     "__version__",
     "__author__", 
     "__email__",
     "BitbucketAPI",
+    "AsyncBitbucketAPI",
     "load_config",
     "save_config", 
     "PullRequest",
     "Comment",
     "User",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -3,22 +3,43 @@ ABOUTME: Core API client for Bitbucket Cloud REST API v2.0 with comprehensive er
 ABOUTME: Provides high-level methods for PR operations, pagination, and authentication management
 """
 
+import json
+import math
 import time
-from typing import Dict, List, Any, Optional, Union
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import Callable, Dict, Iterator, List, Any, Optional, Union
+from urllib.parse import urlencode, urlsplit
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from urllib3.exceptions import NewConnectionError
 
 from .auth import get_auth_headers, get_workspace
+from .cache import ImmutableCache, ResponseCache, endpoint_ttl
 from .exceptions import (
     BitbucketAPIError, 
     AuthenticationError, 
     NotFoundError, 
     PermissionError,
     RateLimitError,
-    ConflictError
+    ConflictError,
+    ValidationError
 )
-from .models import PullRequest, Comment, User
+from .ratelimit import IDEMPOTENT_METHODS, RETRY_STATUSES, RequestScheduler
+from .trace import TimingHTTPAdapter, begin_phases, end_phases
+
+
+# Initial suffix range requested when tailing step logs; widened until enough lines arrive
+LOG_TAIL_INITIAL_BYTES = 64 * 1024
+
+# Largest page Bitbucket serves for most collection endpoints
+MAX_PAGELEN = 50
+
+# Read size when streaming diff bodies from the network or the diff cache
+DIFF_CHUNK_BYTES = 64 * 1024
+
+# Diffstat pages are much larger than other collections
+DIFFSTAT_PAGELEN = 500
 
 
 class BitbucketAPI:
@@ -31,22 +52,55 @@ class BitbucketAPI:
         self.base_url = config["api"]["base_url"].rstrip("/")
         self.timeout = config["api"]["timeout"]
         self.max_retries = config["api"]["retries"]
+        self.max_workers = max(1, int(config["api"].get("max_workers", 8)))
         
-        # Setup session with retry strategy
+        # Setup session; retries are handled by _send so they can honor Retry-After
+        # and the shared request scheduler instead of urllib3's fixed backoff
         self.session = requests.Session()
-        retry_strategy = Retry(
-            total=self.max_retries,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS"]
+        # Size the connection pool for the worker pool so concurrent page
+        # fetches reuse keep-alive connections instead of discarding them. The timing
+        # adapter only does extra work while a request hook is registered.
+        adapter = TimingHTTPAdapter(
+            max_retries=0,
+            pool_maxsize=max(self.max_workers, 10)
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
+        
+        # Token bucket shared by every request this client makes
+        self.scheduler = RequestScheduler.from_config(config)
+        
+        # Persistent GET response cache and commit-addressed diff store (None when disabled)
+        self.cache = ResponseCache.from_config(config)
+        self.diff_cache = ImmutableCache.from_config(config)
+        
+        # Callbacks receiving one timing record per request (see add_hook)
+        self.hooks: List[Callable[[Dict[str, Any]], None]] = []
+        
+        # Auth headers depend only on config and environment; built on first use
+        self._auth_headers: Optional[Dict[str, str]] = None
+        
+        # (source, destination) commit hashes of PRs seen by this client, keyed by
+        # (workspace, repo, pr_id); diff cache lookups reuse them instead of fetching
+        # the PR again. Long-lived holders (the daemon) clear it between commands.
+        self.commit_pairs: Dict[tuple, tuple] = {}
+    
+    def add_hook(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Register a callback invoked once per request with a timing record.
+        
+        Records hold method, path, status, bytes, retries, cache outcome ("hit",
+        "revalidated", "miss" or None), wall-clock start, duration and a ``phases``
+        breakdown (queue, dns, connect, tls, ttfb, download) in seconds. Callbacks may
+        run on worker threads.
+        """
+        self.hooks.append(callback)
     
     def _get_headers(self) -> Dict[str, str]:
-        """Get authentication headers for requests."""
-        return get_auth_headers(self.config)
+        """Get authentication headers for requests (a fresh copy callers may modify)."""
+        if self._auth_headers is None:
+            self._auth_headers = get_auth_headers(self.config)
+        return dict(self._auth_headers)
     
     def _handle_response(self, response: requests.Response) -> Any:
         """Handle API response and errors."""
@@ -63,7 +117,9 @@ class BitbucketAPI:
         elif response.status_code == 409:
             raise ConflictError("Conflict - operation cannot be completed (e.g., PR already merged).")
         elif response.status_code == 429:
-            raise RateLimitError("Rate limit exceeded. Please wait and try again.")
+            retry_after = response.headers.get("Retry-After")
+            hint = f" Retry after {retry_after}s." if retry_after else " Please wait and try again."
+            raise RateLimitError(f"Rate limit exceeded.{hint}")
         else:
             try:
                 error_data = response.json()
@@ -81,16 +137,229 @@ class BitbucketAPI:
         if "headers" in kwargs:
             headers.update(kwargs.pop("headers"))
         
-        response = self.session.request(
-            method=method,
-            url=url,
-            headers=headers,
-            timeout=self.timeout,
-            **kwargs
-        )
+        cache_key = None
+        cached = None
+        if method == "GET" and self.cache is not None:
+            cache_key = self.cache.make_key(method, url, kwargs.get("params"), headers.get("Authorization", ""))
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                if self.cache.is_fresh(cached, endpoint):
+                    self._trace_cache_hit(method, url, kwargs.get("params"), len(cached["body"]))
+                    return json.loads(cached["body"]) if cached["body"] else {}
+                # Revalidate: an unchanged resource costs a bodiless 304
+                if cached.get("etag"):
+                    headers["If-None-Match"] = cached["etag"]
+                if cached.get("last_modified"):
+                    headers["If-Modified-Since"] = cached["last_modified"]
+        
+        response = self._send(method, url, headers=headers, cache="miss" if cached is None else "stale", **kwargs)
+        
+        if cache_key is not None:
+            if response.status_code == 304 and cached is not None:
+                self.cache.refresh(cache_key, cached)
+                return json.loads(cached["body"]) if cached["body"] else {}
+            if response.status_code == 200 and self._is_cacheable(response, endpoint):
+                self.cache.store(cache_key, url, response.text, response.headers)
         
         return self._handle_response(response)
     
+    def _send(self, method: str, url: str, throttle: bool = True, cache: Optional[str] = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the shared scheduler, retrying transient failures.
+        
+        Idempotent methods retry on 429/5xx and network errors with jittered backoff
+        (or the server's Retry-After). POSTs retry only when the server provably did
+        not process them: a 429, or a connection that was never established.
+        
+        ``cache`` describes the response cache's state for this request ("miss", or
+        "stale" when revalidating) and only feeds request hooks.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if not self.hooks:
+            return self._send_with_retries(method, url, throttle, None, **kwargs)
+        
+        record: Dict[str, Any] = {
+            "method": method,
+            "path": self._trace_path(url, kwargs.get("params")),
+            "status": None,
+            "bytes": None,
+            "retries": 0,
+            "cache": cache,
+            "start": time.time(),
+            "thread": threading.get_ident(),
+        }
+        record["phases"] = begin_phases()
+        started = time.perf_counter()
+        try:
+            response = self._send_with_retries(method, url, throttle, record, **kwargs)
+        except Exception as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            end_phases()
+            record["duration"] = time.perf_counter() - started
+        
+        record["status"] = response.status_code
+        if cache == "stale":
+            record["cache"] = "revalidated" if response.status_code == 304 else "miss"
+        if kwargs.get("stream"):
+            # Body not read yet: the record is emitted once it has been
+            self._trace_stream(response, record)
+            return response
+        record["bytes"] = len(response.content)
+        self._emit(record)
+        return response
+    
+    def _trace_stream(self, response: requests.Response, record: Dict[str, Any]) -> None:
+        """
+        Complete a streamed response's trace record as its body is read.
+        
+        Time spent waiting for body chunks counts as the download phase (and is
+        added to the duration); time the caller spends on each chunk doesn't. The
+        record is emitted with the bytes actually received when the body has been
+        read to the end or the response is closed, whichever comes first.
+        """
+        iter_content = response.iter_content
+        close = response.close
+        received = {"bytes": 0, "seconds": 0.0}
+        emitted = False
+        
+        def finish() -> None:
+            nonlocal emitted
+            if emitted:
+                return
+            emitted = True
+            record["bytes"] = received["bytes"]
+            record["phases"]["download"] = record["phases"].get("download", 0.0) + received["seconds"]
+            record["duration"] += received["seconds"]
+            self._emit(record)
+        
+        def traced_iter_content(chunk_size: Optional[int] = 1, decode_unicode: bool = False) -> Iterator[Any]:
+            chunks = iter_content(chunk_size, decode_unicode)
+            try:
+                while True:
+                    started = time.perf_counter()
+                    try:
+                        chunk = next(chunks)
+                    except StopIteration:
+                        break
+                    finally:
+                        received["seconds"] += time.perf_counter() - started
+                    received["bytes"] += len(chunk)
+                    yield chunk
+            finally:
+                finish()
+        
+        def traced_close() -> None:
+            close()
+            finish()
+        
+        response.iter_content = traced_iter_content  # type: ignore[method-assign]
+        response.close = traced_close  # type: ignore[method-assign]
+    
+    def _send_with_retries(self, method: str, url: str, throttle: bool, record: Optional[Dict[str, Any]], **kwargs) -> requests.Response:
+        """The retry loop behind _send; fills in ``record`` timings when tracing."""
+        attempt = 0
+        while True:
+            waited = self.scheduler.acquire() if throttle else 0.0
+            if record is not None:
+                record["phases"]["queue"] = record["phases"].get("queue", 0.0) + waited
+                sent = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                retryable = method in IDEMPOTENT_METHODS or self._request_not_sent(e)
+                if attempt >= self.max_retries or not retryable:
+                    raise
+                delay = self.scheduler.retry_delay(attempt)
+            else:
+                if record is not None:
+                    self._record_response_phases(record["phases"], response, time.perf_counter() - sent)
+                if throttle:
+                    self.scheduler.record_response(response.status_code, response.headers)
+                retryable = response.status_code in RETRY_STATUSES and (
+                    method in IDEMPOTENT_METHODS or response.status_code == 429
+                )
+                if attempt >= self.max_retries or not retryable:
+                    if method != "GET":
+                        # A write (merge, new commits via the API) may move a PR's commits
+                        self.commit_pairs.clear()
+                    return response
+                delay = self.scheduler.retry_delay(attempt, response.headers)
+                response.close()
+            
+            self.scheduler.record_retry(delay)
+            time.sleep(delay)
+            attempt += 1
+            if record is not None:
+                record["retries"] = attempt
+                record["phases"]["queue"] = record["phases"].get("queue", 0.0) + delay
+    
+    @staticmethod
+    def _record_response_phases(phases: Dict[str, float], response: requests.Response, seconds: float) -> None:
+        """Split one attempt into time-to-first-byte and body download."""
+        # elapsed runs from sending until the headers were parsed, including any new
+        # connection's DNS/connect/TLS time recorded by the timing adapter
+        elapsed = response.elapsed.total_seconds()
+        setup = sum(phases.get(name, 0.0) for name in ("dns", "connect", "tls"))
+        phases["ttfb"] = max(0.0, elapsed - setup)
+        phases["download"] = max(0.0, seconds - elapsed)
+    
+    def _trace_path(self, url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Short display form of a request URL for trace records."""
+        if url.startswith(self.base_url):
+            path = url[len(self.base_url):]
+            query = urlencode([(k, v) for k, v in (params or {}).items() if v is not None])
+            return f"{path}?{query}" if query else path
+        # Pre-signed URLs (S3 logs) carry credentials in the query string
+        parts = urlsplit(url)
+        return f"{parts.netloc}{parts.path}"
+    
+    def _trace_cache_hit(self, method: str, url: str, params: Optional[Dict[str, Any]], size: Optional[int]) -> None:
+        """Report a response served from a local cache without touching the network."""
+        if not self.hooks:
+            return
+        self._emit({
+            "method": method,
+            "path": self._trace_path(url, params),
+            "status": None,
+            "bytes": size,
+            "retries": 0,
+            "cache": "hit",
+            "start": time.time(),
+            "duration": 0.0,
+            "thread": threading.get_ident(),
+            "phases": {},
+        })
+    
+    def _emit(self, record: Dict[str, Any]) -> None:
+        """Hand a request record to every hook; a failing hook never fails the request."""
+        for hook in self.hooks:
+            try:
+                hook(record)
+            except Exception:
+                pass
+    
+    @staticmethod
+    def _request_not_sent(error: Exception) -> bool:
+        """True when a request failed before reaching the server (safe to resend)."""
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        reason = getattr(error.args[0], "reason", None) if error.args else None
+        return isinstance(reason, NewConnectionError)
+    
+    def rate_limit_stats(self) -> Dict[str, Any]:
+        """Request budget and throttling statistics for this client."""
+        return self.scheduler.stats()
+    
+    @staticmethod
+    def _is_cacheable(response: requests.Response, endpoint: str) -> bool:
+        """Keep responses that can be revalidated or have a TTL, unless marked no-store."""
+        if "no-store" in response.headers.get("Cache-Control", ""):
+            return False
+        has_validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+        return bool(has_validator or endpoint_ttl(endpoint) > 0)
+    
     def get(self, endpoint: str, params: Optional[Dict] = None) -> Any:
         """Make a GET request."""
         return self._request("GET", endpoint, params=params)
@@ -117,32 +386,109 @@ class BitbucketAPI:
         """Make a DELETE request."""
         return self._request("DELETE", endpoint)
     
-    def get_all_pages(self, endpoint: str, params: Optional[Dict] = None) -> List[Any]:
-        """Get all pages of paginated results."""
-        results = []
-        url = endpoint
-        is_first_request = True
+    def get_all_pages(self, endpoint: str, params: Optional[Dict] = None, parallel: bool = True, max_items: Optional[int] = None) -> List[Any]:
+        """Get all pages of paginated results (at most ``max_items`` values)."""
+        return list(self.iter_values(endpoint, params, parallel=parallel, max_items=max_items))
+    
+    def iter_values(self, endpoint: str, params: Optional[Dict] = None, parallel: bool = True, max_items: Optional[int] = None) -> Iterator[Any]:
+        """Yield values of paginated results as each page arrives, stopping after ``max_items``."""
+        remaining = max_items
+        for page in self.iter_pages(endpoint, params, parallel=parallel, max_items=max_items):
+            values = page.get("values", [])
+            if remaining is not None:
+                values = values[:remaining]
+                remaining -= len(values)
+            yield from values
+    
+    def iter_pages(self, endpoint: str, params: Optional[Dict] = None, parallel: bool = True, max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield raw pages of paginated results in order, as they arrive.
         
-        while url:
-            if is_first_request:
-                response = self.get(url, params)
-                is_first_request = False
-            else:
-                # For subsequent requests, url already contains the full URL
-                parsed_url = url.replace(self.base_url, "")
-                response = self.get(parsed_url)
-            
-            if "values" in response:
-                results.extend(response["values"])
+        When the first page reports ``size`` and ``pagelen``, the remaining pages are
+        requested by number on a bounded worker pool. Endpoints without ``size``
+        (cursor-paginated) fall back to walking ``next`` links.
+        
+        With ``max_items``, the page length is chosen so the budget takes as few
+        requests as possible, and no page past the budget is requested.
+        """
+        if max_items is not None:
+            params = dict(params or {}, pagelen=self._budget_pagelen(max_items, (params or {}).get("pagelen")))
+        
+        response = self.get(endpoint, params)
+        yield response
+        
+        seen = len(response.get("values", []))
+        if not response.get("next") or (max_items is not None and seen >= max_items):
+            return
+        
+        page_numbers = self._remaining_page_numbers(response) if parallel else []
+        if max_items is not None and page_numbers:
+            pages_needed = math.ceil(max_items / response["pagelen"])
+            page_numbers = [n for n in page_numbers if n <= pages_needed]
+        if page_numbers and self.max_workers > 1:
+            yield from self._iter_numbered_pages(endpoint, params, response["pagelen"], page_numbers)
+            return
+        
+        url = response.get("next")
+        while url and (max_items is None or seen < max_items):
+            # For subsequent requests, url already contains the full URL
+            parsed_url = url.replace(self.base_url, "")
+            response = self.get(parsed_url)
+            yield response
+            seen += len(response.get("values", []))
             
             # Get next page URL
             url = response.get("next")
-            
-            # Optional delay to respect rate limits
-            if url:
-                time.sleep(0.1)
+    
+    @staticmethod
+    def _budget_pagelen(max_items: int, cap: Optional[int] = None) -> int:
+        """
+        Page length that fetches ``max_items`` in the fewest requests with the least
+        over-fetch: 60 items at a cap of 50 is two pages of 30, not 50 + 50.
+        """
+        cap = min(int(cap), MAX_PAGELEN) if cap else MAX_PAGELEN
+        pages = max(1, math.ceil(max_items / cap))
+        return max(1, min(cap, math.ceil(max_items / pages)))
+    
+    def _iter_numbered_pages(self, endpoint: str, params: Optional[Dict], pagelen: int, page_numbers: List[int]) -> Iterator[Dict[str, Any]]:
+        """
+        Fetch numbered pages on the worker pool and yield them in page order.
+        
+        At most ``2 * max_workers`` pages are in flight or buffered at a time, so memory
+        stays flat when the consumer is slower than the network.
+        """
+        numbers = iter(page_numbers)
+        pending: deque = deque()
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(page_numbers)))
+        
+        def submit_next() -> None:
+            number = next(numbers, None)
+            if number is not None:
+                page_params = dict(params or {}, page=number, pagelen=pagelen)
+                pending.append(executor.submit(self.get, endpoint, page_params))
         
-        return results
+        try:
+            for _ in range(2 * self.max_workers):
+                submit_next()
+            while pending:
+                page = pending.popleft().result()
+                submit_next()
+                yield page
+        finally:
+            # Consumers may stop early; don't fetch pages nobody will read
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @staticmethod
+    def _remaining_page_numbers(response: Dict[str, Any]) -> List[int]:
+        """Work out which page numbers follow a numbered first page, if possible."""
+        size = response.get("size")
+        pagelen = response.get("pagelen")
+        if size is None or not pagelen:
+            return []
+        
+        page = response.get("page", 1)
+        last_page = math.ceil(size / pagelen)
+        return list(range(page + 1, last_page + 1))
     
     def get_paginated(self, endpoint: str, params: Optional[Dict] = None) -> Dict[str, Any]:
         """Get a single page of paginated results with pagination info."""
@@ -157,6 +503,13 @@ class BitbucketAPI:
             "previous": response.get("previous")
         }
     
+    # Repository Methods
+    
+    def list_repositories(self, workspace: str) -> List[Dict[str, Any]]:
+        """List every repository in a workspace."""
+        endpoint = f"/repositories/{workspace}"
+        return self.get_all_pages(endpoint, {"pagelen": 100})
+    
     # Pull Request Methods
     
     def create_pull_request(self, workspace: str, repo: str, **kwargs) -> Dict[str, Any]:
@@ -183,35 +536,101 @@ class BitbucketAPI:
         return self.post(endpoint, json=payload)
     
     def get_pull_request(self, workspace: str, repo: str, pr_id: int) -> Dict[str, Any]:
-        """Get a specific pull request."""
+        """Get a specific pull request (and remember its commit pair for diff lookups)."""
         endpoint = f"/repositories/{workspace}/{repo}/pullrequests/{pr_id}"
-        return self.get(endpoint)
+        pr = self.get(endpoint)
+        source = (pr.get("source", {}).get("commit") or {}).get("hash")
+        destination = (pr.get("destination", {}).get("commit") or {}).get("hash")
+        if source and destination:
+            self.commit_pairs[(workspace, repo, pr_id)] = (source, destination)
+        else:
+            self.commit_pairs.pop((workspace, repo, pr_id), None)
+        return pr
     
     def list_pull_requests(self, workspace: str, repo: str, **kwargs) -> List[Dict[str, Any]]:
-        """List pull requests with optional filtering."""
+        """
+        List pull requests with optional filtering.
+        
+        Filters (all applied server-side): state (one or a list), author, reviewer,
+        source_branch, destination_branch, title_contains, updated_since /
+        updated_before (ISO 8601), created_since / created_before, draft (bool),
+        sort (e.g. "-updated_on"), pagelen and fields (Bitbucket partial-response
+        spec, e.g. "values.id,values.title"; pagination keys are kept automatically).
+        
+        ``limit`` caps the number of pull requests returned, fetching only the pages
+        needed; ``fetch_all`` without a limit returns every match. With neither,
+        only the first page is returned.
+        """
+        if kwargs.get("fetch_all") or kwargs.get("limit"):
+            return list(self.iter_pull_requests(workspace, repo, **kwargs))
+        
+        endpoint = f"/repositories/{workspace}/{repo}/pullrequests"
+        response = self.get_paginated(endpoint, self._pull_request_params(**kwargs))
+        return response["values"]
+    
+    def iter_pull_requests(self, workspace: str, repo: str, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Yield pull requests across all pages as each page arrives (at most ``limit``)."""
         endpoint = f"/repositories/{workspace}/{repo}/pullrequests"
+        params = self._pull_request_params(**kwargs)
+        if not kwargs.get("limit"):
+            # Unbounded: the largest pages mean the fewest round trips
+            params.setdefault("pagelen", MAX_PAGELEN)
+        return self.iter_values(endpoint, params, max_items=kwargs.get("limit"))
+    
+    def iter_workspace_pull_requests(self, workspace: str, user: str, **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Yield a user's pull requests across every repository in a workspace.
         
+        ``user`` is a UUID or account id. Accepts the same filters as list_pull_requests.
+        """
+        endpoint = f"/workspaces/{workspace}/pullrequests/{user}"
+        return self.iter_values(endpoint, self._pull_request_params(**kwargs), max_items=kwargs.get("limit"))
+    
+    @staticmethod
+    def _pull_request_params(**kwargs) -> Dict[str, Any]:
+        """Build query parameters for pull request listing."""
         params = {}
         if kwargs.get("state"):
             params["state"] = kwargs["state"]
-        if kwargs.get("limit"):
-            params["pagelen"] = kwargs["limit"]
+        if kwargs.get("pagelen"):
+            params["pagelen"] = kwargs["pagelen"]
+        if kwargs.get("sort"):
+            params["sort"] = kwargs["sort"]
+        if kwargs.get("fields"):
+            fields = kwargs["fields"]
+            # A projection that doesn't start with "+" drops everything else,
+            # including the keys pagination relies on
+            if not fields.startswith("+"):
+                fields += ",next,page,pagelen,size"
+            params["fields"] = fields
         
         # Build query string for additional filters
         query_parts = []
         if kwargs.get("author"):
-            query_parts.append(f'author.username="{kwargs["author"]}"')
+            query_parts.append(f'author.username={_bbql_string(kwargs["author"])}')
         if kwargs.get("reviewer"):
-            query_parts.append(f'reviewers.username="{kwargs["reviewer"]}"')
+            query_parts.append(f'reviewers.username={_bbql_string(kwargs["reviewer"])}')
+        if kwargs.get("source_branch"):
+            query_parts.append(f'source.branch.name={_bbql_string(kwargs["source_branch"])}')
+        if kwargs.get("destination_branch"):
+            query_parts.append(f'destination.branch.name={_bbql_string(kwargs["destination_branch"])}')
+        if kwargs.get("title_contains"):
+            query_parts.append(f'title ~ {_bbql_string(kwargs["title_contains"])}')
+        if kwargs.get("updated_since"):
+            query_parts.append(f'updated_on >= {_bbql_datetime(kwargs["updated_since"])}')
+        if kwargs.get("updated_before"):
+            query_parts.append(f'updated_on < {_bbql_datetime(kwargs["updated_before"])}')
+        if kwargs.get("created_since"):
+            query_parts.append(f'created_on >= {_bbql_datetime(kwargs["created_since"])}')
+        if kwargs.get("created_before"):
+            query_parts.append(f'created_on < {_bbql_datetime(kwargs["created_before"])}')
+        if kwargs.get("draft") is not None:
+            query_parts.append(f'draft = {"true" if kwargs["draft"] else "false"}')
         
         if query_parts:
             params["q"] = " AND ".join(query_parts)
         
-        if kwargs.get("fetch_all"):
-            return self.get_all_pages(endpoint, params)
-        else:
-            response = self.get_paginated(endpoint, params)
-            return response["values"]
+        return params
     
     def update_pull_request(self, workspace: str, repo: str, pr_id: int, **kwargs) -> Dict[str, Any]:
         """Update a pull request."""
@@ -294,36 +713,151 @@ class BitbucketAPI:
     
     def get_comments(self, workspace: str, repo: str, pr_id: int) -> List[Dict[str, Any]]:
         """Get all comments for a pull request."""
+        return list(self.iter_comments(workspace, repo, pr_id))
+    
+    def iter_comments(self, workspace: str, repo: str, pr_id: int, updated_since: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Yield comments for a pull request as each page arrives, optionally only those updated since a timestamp."""
         endpoint = f"/repositories/{workspace}/{repo}/pullrequests/{pr_id}/comments"
-        return self.get_all_pages(endpoint)
+        params = {"q": f"updated_on >= {_bbql_datetime(updated_since)}", "sort": "updated_on"} if updated_since else None
+        return self.iter_values(endpoint, params)
     
     # Utility Methods
     
     def get_diff(self, workspace: str, repo: str, pr_id: int) -> str:
         """Get the diff for a pull request."""
+        return b"".join(self.iter_diff(workspace, repo, pr_id)).decode("utf-8", errors="replace")
+    
+    def iter_diff(self, workspace: str, repo: str, pr_id: int, chunk_size: int = DIFF_CHUNK_BYTES) -> Iterator[bytes]:
+        """
+        Yield the raw diff of a pull request in chunks of bytes as they arrive.
+        
+        Nothing is buffered beyond one chunk: downloads are compressed into the diff
+        cache as they stream, and cached diffs are decompressed incrementally.
+        """
+        cache_key = self._diff_cache_key(workspace, repo, pr_id, "diff")
         endpoint = f"/repositories/{workspace}/{repo}/pullrequests/{pr_id}/diff"
+        url = f"{self.base_url}{endpoint}"
+        if cache_key:
+            cached = self.diff_cache.open(cache_key)
+            if cached is not None:
+                self._trace_cache_hit("GET", url, None, None)
+                with cached:
+                    yield from iter(lambda: cached.read(chunk_size), b"")
+                return
         
         # This endpoint returns raw diff text, not JSON
-        url = f"{self.base_url}{endpoint}"
         headers = self._get_headers()
         headers["Accept"] = "text/plain"
         
-        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        response = self._send("GET", url, headers=headers, cache="miss" if cache_key else None, stream=True)
+        with response:
+            if response.status_code != 200:
+                self._handle_response(response)
+            chunks = response.iter_content(chunk_size=chunk_size)
+            if cache_key:
+                # Only keep the body if the PR didn't move while it streamed
+                chunks = self.diff_cache.tee(
+                    cache_key, chunks,
+                    keep=lambda: self._diff_cache_key(workspace, repo, pr_id, "diff", refresh=True) == cache_key,
+                )
+            yield from chunks
+    
+    def get_path_diff(self, workspace: str, repo: str, source: str, destination: str, paths: List[str]) -> str:
+        """
+        Get the diff between two commits limited to ``paths``.
+        
+        Uses the repository diff endpoint's ``path`` filter, so only the selected
+        files' changes are downloaded. Like the PR diff it is a "topic" diff (source
+        against its merge base with destination), cached by commit pair and paths.
+        """
+        endpoint = f"/repositories/{workspace}/{repo}/diff/{source}..{destination}"
+        url = f"{self.base_url}{endpoint}"
+        params = {"path": list(paths), "topic": "true"}
+        cache_key = None
+        if self.diff_cache is not None:
+            cache_key = self.diff_cache.make_key("path-diff", workspace, repo, source, destination, *paths)
+            cached = self.diff_cache.get(cache_key)
+            if cached is not None:
+                self._trace_cache_hit("GET", url, params, len(cached))
+                return cached.decode("utf-8", errors="replace")
         
-        if response.status_code == 200:
-            return response.text
-        else:
+        headers = self._get_headers()
+        headers["Accept"] = "text/plain"
+        
+        response = self._send("GET", url, headers=headers, params=params, cache="miss" if cache_key else None)
+        if response.status_code != 200:
             self._handle_response(response)
+        if cache_key:
+            self.diff_cache.put(cache_key, response.content)
+        return response.content.decode("utf-8", errors="replace")
+    
+    def iter_diffstat(self, workspace: str, repo: str, pr_id: int) -> Iterator[Dict[str, Any]]:
+        """Yield every diffstat entry of a pull request, across all pages."""
+        endpoint = f"/repositories/{workspace}/{repo}/pullrequests/{pr_id}/diffstat"
+        return self.iter_values(endpoint, {"pagelen": DIFFSTAT_PAGELEN})
     
     def get_diffstat(self, workspace: str, repo: str, pr_id: int) -> Dict[str, Any]:
-        """Get diffstat for a pull request."""
+        """
+        Get the complete diffstat for a pull request.
+        
+        Every page is fetched (concurrently once the first reports the total), so
+        ``values`` holds one entry per changed file and ``size`` their count.
+        """
+        cache_key = self._diff_cache_key(workspace, repo, pr_id, "diffstat-all")
         endpoint = f"/repositories/{workspace}/{repo}/pullrequests/{pr_id}/diffstat"
-        return self.get(endpoint)
+        if cache_key:
+            cached = self.diff_cache.get(cache_key)
+            if cached is not None:
+                self._trace_cache_hit("GET", f"{self.base_url}{endpoint}", None, len(cached))
+                return json.loads(cached)
+        
+        values = list(self.iter_diffstat(workspace, repo, pr_id))
+        diffstat = {"values": values, "size": len(values)}
+        self._store_diff(workspace, repo, pr_id, "diffstat-all", cache_key, json.dumps(diffstat).encode("utf-8"))
+        return diffstat
+    
+    def _pr_commit_pair(self, workspace: str, repo: str, pr_id: int, refresh: bool = False) -> Optional[tuple]:
+        """
+        Return the PR's (source, destination) commit hashes, if both are known.
+        
+        The pair from the last time this client fetched the PR is reused unless
+        ``refresh`` is set.
+        """
+        key = (workspace, repo, pr_id)
+        if refresh or key not in self.commit_pairs:
+            self.get_pull_request(workspace, repo, pr_id)
+        return self.commit_pairs.get(key)
+    
+    def _diff_cache_key(self, workspace: str, repo: str, pr_id: int, kind: str, refresh: bool = False) -> Optional[str]:
+        """
+        Content address for a PR diff body.
+        
+        The diff between two fixed commits never changes, so bodies are keyed by the
+        commit pair from the (cheaply revalidated) PR payload rather than the PR ID.
+        ``refresh`` fetches the PR again instead of reusing the commit pair it had.
+        """
+        if self.diff_cache is None:
+            return None
+        commits = self._pr_commit_pair(workspace, repo, pr_id, refresh=refresh)
+        if commits is None:
+            return None
+        return self.diff_cache.make_key(kind, workspace, repo, *commits)
+    
+    def _store_diff(self, workspace: str, repo: str, pr_id: int, kind: str, cache_key: Optional[str], body: bytes) -> None:
+        """Store a freshly downloaded diff body unless the PR moved while we fetched it."""
+        if not cache_key:
+            return
+        if self._diff_cache_key(workspace, repo, pr_id, kind, refresh=True) == cache_key:
+            self.diff_cache.put(cache_key, body)
     
-    def get_activity(self, workspace: str, repo: str, pr_id: int) -> List[Dict[str, Any]]:
-        """Get activity timeline for a pull request."""
+    def get_activity(self, workspace: str, repo: str, pr_id: int, max_items: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get activity timeline for a pull request (the newest ``max_items`` entries)."""
+        return list(self.iter_activity(workspace, repo, pr_id, max_items=max_items))
+    
+    def iter_activity(self, workspace: str, repo: str, pr_id: int, max_items: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield activity entries for a pull request, newest first, as each page arrives."""
         endpoint = f"/repositories/{workspace}/{repo}/pullrequests/{pr_id}/activity"
-        return self.get_all_pages(endpoint)
+        return self.iter_values(endpoint, max_items=max_items)
     
     def get_user(self, username: str) -> Dict[str, Any]:
         """Get user information."""
@@ -370,11 +904,32 @@ class BitbucketAPI:
 
     def get_pipeline_steps(self, workspace: str, repo: str, pipeline_uuid: str) -> List[Dict[str, Any]]:
         """List all steps for a pipeline."""
+        return list(self.iter_pipeline_steps(workspace, repo, pipeline_uuid))
+    
+    def iter_pipeline_steps(self, workspace: str, repo: str, pipeline_uuid: str) -> Iterator[Dict[str, Any]]:
+        """Yield steps for a pipeline as each page arrives."""
         endpoint = f"/repositories/{workspace}/{repo}/pipelines/{pipeline_uuid}/steps/"
-        return self.get_all_pages(endpoint)
+        return self.iter_values(endpoint)
 
-    def get_step_log(self, workspace: str, repo: str, pipeline_uuid: str, step_uuid: str) -> str:
-        """Get the log output for a pipeline step (returns plain text)."""
+    def get_step_log_tail(self, workspace: str, repo: str, pipeline_uuid: str, step_uuid: str, lines: int = 50) -> str:
+        """
+        Get the last ``lines`` lines of a pipeline step log.
+        
+        Asks the pre-signed log URL for ``Range: bytes=-N`` and widens N until enough
+        lines arrive, so large logs are never downloaded in full. If the server ignores
+        the range, the body is streamed and only the tail is kept in memory.
+        """
+        if lines <= 0:
+            return ""
+        
+        response = self._request_step_log(workspace, repo, pipeline_uuid, step_uuid)
+        if response.status_code in (307, 302) and response.headers.get("Location"):
+            response.close()
+            return self._tail_log_url(response.headers["Location"], lines)
+        return self._read_log_tail(response, lines)
+    
+    def _request_step_log(self, workspace: str, repo: str, pipeline_uuid: str, step_uuid: str) -> requests.Response:
+        """Request a step log from Bitbucket without following its S3 redirect."""
         # Log endpoint returns text/plain, not JSON — use session directly like get_diff does.
         # UUIDs must be URL-encoded (%7B/%7D for curly braces) — Bitbucket returns 406 with
         # literal curly braces on this endpoint, though other pipeline endpoints accept them.
@@ -387,15 +942,71 @@ class BitbucketAPI:
         headers.pop("Content-Type", None)  # No body on GET
         headers["Accept"] = "*/*"  # Log endpoint returns 406 for text/plain or application/json
         # Don't auto-follow redirects — Bitbucket redirects to a pre-signed S3 URL and forwarding
-        # the Authorization header to S3 causes a 400. Manually follow without auth headers.
-        response = self.session.get(url, headers=headers, timeout=self.timeout, allow_redirects=False)
-        if response.status_code in (307, 302):
-            s3_url = response.headers.get("Location")
-            if s3_url:
-                response = self.session.get(s3_url, timeout=self.timeout)
-        if response.status_code == 200:
-            return response.text
-        elif response.status_code in (404, 406):
-            return ""  # No log available (step not yet run, or log not accessible)
-        else:
-            self._handle_response(response)
\ No newline at end of file
+        # the Authorization header to S3 causes a 400. Callers follow it without auth headers.
+        return self._send("GET", url, headers=headers, allow_redirects=False, stream=True)
+    
+    def _tail_log_url(self, url: str, lines: int) -> str:
+        """Fetch the tail of a log with suffix byte-range requests, widening as needed."""
+        range_bytes = LOG_TAIL_INITIAL_BYTES
+        while True:
+            response = self._send(
+                "GET",
+                url,
+                throttle=False,
+                headers={"Range": f"bytes=-{range_bytes}"},
+                stream=True
+            )
+            if response.status_code != 206:
+                # Range not honored — stream the full body instead
+                return self._read_log_tail(response, lines)
+            
+            with response:
+                content_range = response.headers.get("Content-Range", "")
+                log_lines = response.content.decode("utf-8", errors="replace").splitlines()
+            
+            # "bytes <start>-<end>/<total>" — a start of 0 means we already have the whole log
+            whole_log = not content_range.startswith("bytes ") or content_range[6:].startswith("0-")
+            if not whole_log:
+                # The range almost certainly starts mid-line
+                log_lines = log_lines[1:]
+            
+            if whole_log or len(log_lines) >= lines:
+                return "\n".join(log_lines[-lines:])
+            
+            range_bytes *= 4
+    
+    def _read_log_tail(self, response: requests.Response, lines: int) -> str:
+        """Stream a log response, keeping only its last ``lines`` lines in memory."""
+        with response:
+            if response.status_code in (404, 406, 416):
+                return ""  # No log available (step not yet run, log not accessible, or empty)
+            if response.status_code != 200:
+                self._handle_response(response)
+            
+            tail: deque = deque(maxlen=lines)
+            pending = b""
+            for chunk in response.iter_content(chunk_size=LOG_TAIL_INITIAL_BYTES):
+                pending += chunk
+                *complete, pending = pending.split(b"\n")
+                tail.extend(complete)
+            if pending:
+                tail.append(pending)
+        
+        text = b"\n".join(tail).decode("utf-8", errors="replace")
+        return "\n".join(text.splitlines()[-lines:])
+
+
+def _bbql_string(value: str) -> str:
+    """Quote a value for a Bitbucket query (q=) string literal."""
+    escaped = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
+
+
+def _bbql_datetime(value: str) -> str:
+    """A date or timestamp for a Bitbucket query, validated so it can't alter the query."""
+    from .utils.dates import normalize_timestamp
+
+    try:
+        return normalize_timestamp(value)
+    except ValueError as e:
+        raise ValidationError(str(e))
@@ -0,0 +1,97 @@
+"""
+ABOUTME: Asyncio client for Bitbucket Cloud API mirroring the BitbucketAPI method surface
+ABOUTME: Runs requests on a bounded connection pool so fan-out workloads execute concurrently
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, TypeVar, Union
+
+from .api import BitbucketAPI
+
+T = TypeVar("T")
+
+_DONE = object()
+
+
+class AsyncBitbucketAPI:
+    """
+    Asyncio Bitbucket Cloud client with the same methods as BitbucketAPI.
+
+    Every public BitbucketAPI method is available as a coroutine, and ``iter_*``
+    methods become async iterators. Requests share the wrapped client's keep-alive
+    session and at most ``max_connections`` are in flight at once.
+    """
+
+    def __init__(self, api: Union[BitbucketAPI, Dict[str, Any]], max_connections: Optional[int] = None):
+        self.api = api if isinstance(api, BitbucketAPI) else BitbucketAPI(api)
+        self.config = self.api.config
+        self.max_connections = max_connections or self.api.max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_connections,
+            thread_name_prefix="bitbucket-api"
+        )
+
+    async def __aenter__(self) -> "AsyncBitbucketAPI":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Release the worker threads backing the connection pool."""
+        self._executor.shutdown(wait=False)
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.api, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        if name.startswith("iter_"):
+            @functools.wraps(attr)
+            def iterate(*args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+                return self._aiter(functools.partial(attr, *args, **kwargs))
+            return iterate
+
+        @functools.wraps(attr)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self._run(functools.partial(attr, *args, **kwargs))
+        return call
+
+    async def _run(self, func: Callable[[], T]) -> T:
+        """Run a blocking call on the connection pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func)
+
+    async def _aiter(self, make_iterator: Callable[[], Iterator[Any]]) -> AsyncIterator[Any]:
+        """Drive a blocking iterator on the connection pool, one item at a time."""
+        iterator = await self._run(make_iterator)
+        while True:
+            item = await self._run(functools.partial(next, iterator, _DONE))
+            if item is _DONE:
+                return
+            yield item
+
+
+def run_async_command(
+    api: BitbucketAPI,
+    command: Callable[..., Awaitable[T]],
+    *args: Any,
+    **kwargs: Any
+) -> T:
+    """
+    Run an async command variant to completion from synchronous code.
+
+    Args:
+        api: BitbucketAPI instance to wrap
+        command: Async command function taking an AsyncBitbucketAPI first
+
+    Returns:
+        The command's result
+    """
+    async def runner() -> T:
+        async with AsyncBitbucketAPI(api) as async_api:
+            return await command(async_api, *args, **kwargs)
+
+    return asyncio.run(runner())
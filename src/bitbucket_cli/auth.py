@@ -3,11 +3,15 @@ ABOUTME: Authentication and configuration management for Bitbucket Cloud API
 ABOUTME: Handles app passwords, tokens, and secure credential storage in user config files
 """
 
+import copy
+import hashlib
+import json
 import os
-import yaml
+import re
+import tempfile
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
-import requests
+from typing import Dict, Any, Optional, Tuple
 from .exceptions import AuthenticationError, ConfigurationError
 
 
@@ -24,55 +28,194 @@ DEFAULT_CONFIG = {
         "delete_source_branch": True,
         "merge_strategy": "merge_commit",
         "default_branch": "main",
+        "repos": [],  # Repositories for `bb pr list --workspace-wide` (all when empty)
     },
     "api": {
         "base_url": "https://api.bitbucket.org/2.0",
         "timeout": 30,
         "retries": 3,
+        "max_workers": 8,  # Concurrent requests for pagination and fan-out
+        "rate_limit": 10,  # Requests per second ceiling; adapts down on 429s
+        "burst": 20,
+    },
+    "cache": {
+        "enabled": True,  # On-disk response cache under ~/.bitbucket-cli/cache
+        "max_size_mb": 100,
     }
 }
 
 CONFIG_DIR = Path.home() / ".bitbucket-cli"
 CONFIG_FILE = CONFIG_DIR / "config.yaml"
 
+# Parsed and merged copy of config.yaml, reused while the YAML file is unchanged.
+# Loading it skips importing and running the YAML parser.
+CONFIG_SNAPSHOT_FILE = CONFIG_DIR / "config.cache.json"
+_SNAPSHOT_VERSION = 2
+
+# Credentials stay in config.yaml only: the snapshot records a hash of each, and
+# loads pick the values back out of the YAML's ``key: value`` lines (plain,
+# single-quoted, or double-quoted without escapes)
+SECRET_FIELDS = ("repo_token", "app_password", "oauth_token")
+_SECRET_LINE = re.compile(
+    r"""^\s+(repo_token|app_password|oauth_token):[ \t]*("[^"\\\n]*"|'(?:[^'\n]|'')*'|\S+)[ \t]*$""",
+    re.MULTILINE,
+)
+
+# In-process cache: (file signature, merged config)
+_config_cache: Optional[Tuple[Tuple[int, int, int], Dict[str, Any]]] = None
+_config_lock = threading.Lock()
+
 
 def ensure_config_dir() -> None:
     """Ensure the configuration directory exists."""
     CONFIG_DIR.mkdir(exist_ok=True, mode=0o700)
 
 
+def _file_signature(path: Path) -> Optional[Tuple[int, int, int]]:
+    """(mtime_ns, size, inode) of a file, or None if it doesn't exist."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _defaults_fingerprint() -> str:
+    """Changes whenever DEFAULT_CONFIG does, so snapshots from older versions are ignored."""
+    return hashlib.sha256(json.dumps(DEFAULT_CONFIG, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _merge_configs(default: dict, user: dict) -> dict:
+    """Merge user settings over defaults so all keys exist."""
+    result = copy.deepcopy(default)
+    for key, value in user.items():
+        if key in result and isinstance(result[key], dict) and isinstance(value, dict):
+            result[key] = _merge_configs(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+def _secret_hash(value: Any) -> str:
+    return hashlib.sha256(str(value).encode()).hexdigest()
+
+
+def _unquote_secret(raw: str) -> str:
+    """The value of a scalar matched by _SECRET_LINE."""
+    if raw[:1] == '"' and raw[-1:] == '"' and len(raw) > 1:
+        return raw[1:-1]
+    if raw[:1] == "'" and raw[-1:] == "'" and len(raw) > 1:
+        return raw[1:-1].replace("''", "'")
+    return raw
+
+
+def _read_snapshot(signature: Tuple[int, int, int]) -> Optional[Dict[str, Any]]:
+    """Return the snapshot's config if it was compiled from this exact config file."""
+    try:
+        with open(CONFIG_SNAPSHOT_FILE, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        snapshot.get("version") != _SNAPSHOT_VERSION
+        or snapshot.get("source") != list(signature)
+        or snapshot.get("defaults") != _defaults_fingerprint()
+    ):
+        return None
+    config = snapshot.get("config")
+    secrets = snapshot.get("secrets") or {}
+    if config is None or not secrets:
+        return config
+
+    try:
+        text = CONFIG_FILE.read_text(encoding="utf-8")
+    except OSError:
+        return None
+    found = {field: _unquote_secret(raw) for field, raw in _SECRET_LINE.findall(text)}
+    for field, digest in secrets.items():
+        value = found.get(field)
+        if value is None or _secret_hash(value) != digest:
+            return None  # Escaped, multi-line or otherwise unusual: parse the YAML properly
+        config["auth"][field] = value
+    return config
+
+
+def _write_snapshot(signature: Tuple[int, int, int], config: Dict[str, Any]) -> None:
+    """Atomically write the snapshot (without credentials) with the same permissions as the config file."""
+    auth = config.get("auth") or {}
+    secrets = {field: _secret_hash(auth[field]) for field in SECRET_FIELDS if auth.get(field)}
+    stripped = dict(config, auth={k: (None if k in secrets else v) for k, v in auth.items()})
+    try:
+        data = json.dumps({
+            "version": _SNAPSHOT_VERSION,
+            "source": list(signature),
+            "defaults": _defaults_fingerprint(),
+            "config": stripped,
+            "secrets": secrets,
+        })
+    except (TypeError, ValueError):
+        return  # Config holds something JSON can't represent; just re-parse the YAML next time
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=CONFIG_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, CONFIG_SNAPSHOT_FILE)
+    except OSError:
+        pass  # The snapshot is only an optimization
+
+
+def _invalidate_config_cache() -> None:
+    global _config_cache
+    with _config_lock:
+        _config_cache = None
+    try:
+        CONFIG_SNAPSHOT_FILE.unlink()
+    except OSError:
+        pass
+
+
 def load_config() -> Dict[str, Any]:
-    """Load configuration from file, creating defaults if needed."""
-    ensure_config_dir()
+    """
+    Load configuration merged over defaults.
     
-    if not CONFIG_FILE.exists():
-        save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG.copy()
+    The parsed config is cached in-process and in a JSON snapshot, both keyed on
+    the config file's mtime/size/inode, so repeated loads cost a stat. A missing
+    config file yields the defaults without writing anything. Callers get their
+    own copy and may modify it freely.
+    """
+    global _config_cache
+    signature = _file_signature(CONFIG_FILE)
+    if signature is None:
+        return copy.deepcopy(DEFAULT_CONFIG)
     
-    try:
-        with open(CONFIG_FILE, 'r') as f:
-            config = yaml.safe_load(f) or {}
-        
-        # Merge with defaults to ensure all keys exist
-        def merge_configs(default: dict, user: dict) -> dict:
-            result = default.copy()
-            for key, value in user.items():
-                if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                    result[key] = merge_configs(result[key], value)
-                else:
-                    result[key] = value
-            return result
-        
-        return merge_configs(DEFAULT_CONFIG, config)
+    with _config_lock:
+        if _config_cache is not None and _config_cache[0] == signature:
+            return copy.deepcopy(_config_cache[1])
+    
+    config = _read_snapshot(signature)
+    if config is None:
+        import yaml  # Only needed when the snapshot is missing or stale
         
-    except yaml.YAMLError as e:
-        raise ConfigurationError(f"Invalid YAML in config file: {e}")
-    except Exception as e:
-        raise ConfigurationError(f"Error loading config: {e}")
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                user_config = yaml.safe_load(f) or {}
+            config = _merge_configs(DEFAULT_CONFIG, user_config)
+        except yaml.YAMLError as e:
+            raise ConfigurationError(f"Invalid YAML in config file: {e}")
+        except Exception as e:
+            raise ConfigurationError(f"Error loading config: {e}")
+        _write_snapshot(signature, config)
+    
+    with _config_lock:
+        _config_cache = (signature, config)
+    return copy.deepcopy(config)
 
 
 def save_config(config: Dict[str, Any]) -> None:
     """Save configuration to file."""
+    import yaml
+    
     ensure_config_dir()
     
     try:
@@ -84,6 +227,8 @@ def save_config(config: Dict[str, Any]) -> None:
         
     except Exception as e:
         raise ConfigurationError(f"Error saving config: {e}")
+    finally:
+        _invalidate_config_cache()
 
 
 def get_auth_headers(config: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
@@ -137,6 +282,8 @@ def get_auth_headers(config: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
 
 def validate_auth(config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Validate authentication by making a test API call."""
+    import requests  # Only needed here; keeps it off the CLI startup path
+    
     if config is None:
         config = load_config()
     
@@ -292,7 +439,7 @@ def set_config_value(key_path: str, value: Any) -> None:
 
 def reset_config() -> None:
     """Reset configuration to defaults."""
-    save_config(DEFAULT_CONFIG.copy())
+    save_config(copy.deepcopy(DEFAULT_CONFIG))
 
 
 def get_workspace(config: Optional[Dict[str, Any]] = None) -> Optional[str]:
@@ -0,0 +1,337 @@
+"""
+ABOUTME: Persistent on-disk HTTP response cache with ETag revalidation and immutable diff storage
+ABOUTME: Applies per-endpoint TTLs and size-bounded LRU eviction under ~/.bitbucket-cli/cache
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+from .auth import CONFIG_DIR
+
+
+CACHE_DIR = CONFIG_DIR / "cache"
+
+# Seconds a cached response may be served without asking the server. Anything not
+# listed is revalidated on every use (a conditional request, usually a cheap 304).
+ENDPOINT_TTLS: List[Tuple[Pattern[str], int]] = [
+    (re.compile(r"^/users/[^/]+$"), 24 * 60 * 60),
+    (re.compile(r"^/user$"), 60 * 60),
+]
+DEFAULT_TTL = 0
+
+
+def endpoint_ttl(endpoint: str) -> int:
+    """Return the freshness lifetime in seconds for an API endpoint path."""
+    path = endpoint.split("?", 1)[0]
+    for pattern, ttl in ENDPOINT_TTLS:
+        if pattern.search(path):
+            return ttl
+    return DEFAULT_TTL
+
+
+class _DiskStore:
+    """
+    Directory of cache files with atomic writes and size-bounded LRU eviction.
+
+    File mtimes track last use, and the least recently used files are evicted once
+    the directory grows past ``max_bytes``.
+    """
+
+    suffix = ""
+
+    def __init__(self, directory: Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.suffix}"
+
+    def _read(self, key: str) -> Optional[bytes]:
+        """Read a file and mark it as recently used."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def _write(self, key: str, data: bytes) -> None:
+        fd, tmp_path = self._mkstemp()
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+        except OSError:
+            self._discard(tmp_path)
+            return
+        self._install(key, tmp_path)
+
+    def _mkstemp(self) -> Tuple[int, str]:
+        """Create a temporary file in the store directory for a write in progress."""
+        self.directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+        return tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+
+    @staticmethod
+    def _discard(tmp_path: str) -> None:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+    def _install(self, key: str, tmp_path: str) -> None:
+        """Move a fully written temporary file into place as ``key``."""
+        path = self._path(key)
+        try:
+            old_size = path.stat().st_size
+        except OSError:
+            old_size = 0
+
+        # Write then rename so concurrent readers never see a partial file
+        try:
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            self._discard(tmp_path)
+            return
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_total()
+            else:
+                self._total_bytes += size - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entry_files(self) -> List[os.DirEntry]:
+        try:
+            return [e for e in os.scandir(self.directory) if e.name.endswith(self.suffix)]
+        except OSError:
+            return []
+
+    def _scan_total(self) -> int:
+        total = 0
+        for entry in self._entry_files():
+            try:
+                total += entry.stat().st_size
+            except OSError:
+                pass
+        return total
+
+    def _evict(self) -> None:
+        """Remove least recently used files until the store is within 90% of its bound."""
+        files = []
+        for entry in self._entry_files():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        total = sum(size for _, size, _ in files)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+            except OSError:
+                pass
+        self._total_bytes = total
+
+    def stats(self) -> Dict[str, Any]:
+        """Summarize what the store holds."""
+        count = 0
+        total = 0
+        oldest: Optional[float] = None
+        newest: Optional[float] = None
+        for entry in self._entry_files():
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            count += 1
+            total += stat.st_size
+            oldest = stat.st_mtime if oldest is None else min(oldest, stat.st_mtime)
+            newest = stat.st_mtime if newest is None else max(newest, stat.st_mtime)
+
+        return {
+            "directory": str(self.directory),
+            "entries": count,
+            "size_bytes": total,
+            "max_size_bytes": self.max_bytes,
+            "least_recently_used": _isoformat(oldest),
+            "most_recently_used": _isoformat(newest),
+        }
+
+    def clear(self) -> int:
+        """Delete every cached file. Returns the number of entries removed."""
+        removed = 0
+        with self._lock:
+            for entry in self._entry_files():
+                try:
+                    os.unlink(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+            self._total_bytes = 0
+        return removed
+
+
+class ResponseCache(_DiskStore):
+    """
+    Disk cache of GET responses keyed by method, URL, params and auth identity.
+
+    Each entry is a JSON file holding the body and its ETag/Last-Modified validators.
+    """
+
+    suffix = ".json"
+
+    def __init__(self, directory: Path = CACHE_DIR / "responses", max_bytes: int = 100 * 1024 * 1024):
+        super().__init__(directory, max_bytes)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["ResponseCache"]:
+        """Build a cache from the ``cache`` config section, or None when disabled."""
+        cache_config = config.get("cache", {})
+        if not cache_config.get("enabled", False):
+            return None
+        return cls(max_bytes=int(cache_config.get("max_size_mb", 100) * 1024 * 1024))
+
+    @staticmethod
+    def make_key(method: str, url: str, params: Optional[Dict[str, Any]], authorization: str) -> str:
+        """Build a cache key; credentials are hashed so they never reach the disk."""
+        identity = hashlib.sha256(authorization.encode()).hexdigest()
+        normalized_params = sorted((str(k), str(v)) for k, v in (params or {}).items() if v is not None)
+        material = json.dumps([method.upper(), url, normalized_params, identity])
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Load an entry and mark it as recently used."""
+        data = self._read(key)
+        if data is None:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    def is_fresh(self, entry: Dict[str, Any], endpoint: str) -> bool:
+        """Check whether an entry can be served without revalidation."""
+        return time.time() - entry.get("stored_at", 0) < endpoint_ttl(endpoint)
+
+    def store(self, key: str, url: str, body: str, headers: Dict[str, str]) -> None:
+        """Store a response body along with its ETag/Last-Modified validators."""
+        entry = {
+            "url": url,
+            "stored_at": time.time(),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "body": body,
+        }
+        self._write(key, json.dumps(entry).encode("utf-8"))
+
+    def refresh(self, key: str, entry: Dict[str, Any]) -> None:
+        """Restart an entry's TTL after the server confirmed it is unchanged (304)."""
+        entry["stored_at"] = time.time()
+        self._write(key, json.dumps(entry).encode("utf-8"))
+
+
+class ImmutableCache(_DiskStore):
+    """
+    Content-addressed, gzip-compressed store for bodies that never change.
+
+    Used for diffs and diffstats keyed by the (source, destination) commit pair —
+    entries have no TTL and leave only through LRU eviction or ``bb cache clear``.
+    """
+
+    suffix = ".gz"
+
+    def __init__(self, directory: Path = CACHE_DIR / "immutable", max_bytes: int = 100 * 1024 * 1024):
+        super().__init__(directory, max_bytes)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional["ImmutableCache"]:
+        """Build a cache from the ``cache`` config section, or None when disabled."""
+        cache_config = config.get("cache", {})
+        if not cache_config.get("enabled", False):
+            return None
+        return cls(max_bytes=int(cache_config.get("max_size_mb", 100) * 1024 * 1024))
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a content address from identifying parts (kind, commits, ...)."""
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the decompressed body, or None on a miss."""
+        data = self._read(key)
+        if data is None:
+            return None
+        try:
+            return gzip.decompress(data)
+        except (OSError, EOFError):
+            return None
+
+    def put(self, key: str, body: bytes) -> None:
+        """Compress and store a body."""
+        self._write(key, gzip.compress(body, compresslevel=6))
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """Open a stored body for incremental reads, or return None on a miss."""
+        path = self._path(key)
+        try:
+            body = gzip.open(path, "rb")
+            os.utime(path)
+        except OSError:
+            return None
+        return body
+
+    def tee(self, key: str, chunks: Iterable[bytes], keep: Optional[Callable[[], bool]] = None) -> Iterator[bytes]:
+        """
+        Yield ``chunks`` while compressing them into a new entry.
+
+        The entry is stored only once every chunk has been consumed (and ``keep()``
+        still holds), so an interrupted download never leaves a truncated body.
+        """
+        fd, tmp_path = self._mkstemp()
+        raw = os.fdopen(fd, "wb")
+        complete = False
+        try:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6) as out:
+                for chunk in chunks:
+                    out.write(chunk)
+                    yield chunk
+            complete = True
+        finally:
+            raw.close()  # GzipFile leaves a file object it was given open
+            if complete and (keep is None or keep()):
+                self._install(key, tmp_path)
+            else:
+                self._discard(tmp_path)
+
+
+def cache_stores(config: Dict[str, Any]) -> Dict[str, _DiskStore]:
+    """All on-disk caches by name, using configured size bounds even when disabled."""
+    max_bytes = int(config.get("cache", {}).get("max_size_mb", 100) * 1024 * 1024)
+    return {
+        "responses": ResponseCache(max_bytes=max_bytes),
+        "immutable": ImmutableCache(max_bytes=max_bytes),
+    }
+
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    if timestamp is None:
+        return None
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp))
@@ -5,9 +5,18 @@ Top-level groups:
   bb pr      — pull request operations
   bb run     — pipeline (build) operations
   bb auth    — authentication / config
+  bb batch   — run many operations from NDJSON in one process
+  bb sync    — incremental local mirror of PRs for offline reads
+  bb cache   — on-disk response cache
+  bb daemon  — background daemon keeping a warm API client
 
 Designed to match `gh` (GitHub CLI) ergonomics so agents and humans can use
 the same muscle memory for both Bitbucket and GitHub repos.
+
+Startup cost matters because agents invoke `bb` thousands of times a day: keep
+module-level imports to click and the standard library, and import rich,
+requests, the API client and command implementations inside the commands that
+use them.
 """
 
 import functools
@@ -15,26 +24,8 @@ import json
 import sys
 
 import click
-from rich.console import Console
-from rich.table import Table
-
-from .api import BitbucketAPI
-from .auth import is_authenticated, load_config
-from .commands import (
-    approve_pr,
-    comment_pr,
-    create_pr,
-    decline_pr,
-    get_pipeline_status,
-    list_prs,
-    merge_pr,
-    show_pr,
-    unapprove_pr,
-)
-from .utils.git import get_repository_info
-from .utils.output import error, handle_output, success
 
-console = Console()
+from .utils.status import error, success
 
 
 # ─── Helpers ──────────────────────────────────────────────────────────
@@ -43,7 +34,8 @@ console = Console()
 def validate_auth(f):
     @functools.wraps(f)
     def wrapper(*args, **kwargs):
-        if not is_authenticated():
+        from .auth import is_authenticated
+        if not is_authenticated(_config()):
             error("Authentication not configured. Run: bb auth login")
             sys.exit(1)
         return f(*args, **kwargs)
@@ -55,14 +47,117 @@ def _resolve_repo(ctx):
     workspace = ctx.obj.get("workspace")
     repo = ctx.obj.get("repo")
     if not workspace or not repo:
+        from .utils.git import get_repository_info
         info = get_repository_info()
         workspace = workspace or info["workspace"]
         repo = repo or info["repo"]
     return workspace, repo
 
 
+def _config():
+    """Return the invocation's config, loading it from disk only once."""
+    ctx = click.get_current_context(silent=True)
+    root = ctx.find_root() if ctx is not None else None
+    if root is not None and root.obj.get("config") is not None:
+        return root.obj["config"]
+
+    from .auth import load_config
+
+    config = load_config()
+    if root is not None:
+        if root.obj.get("no_cache"):
+            config["cache"]["enabled"] = False
+        root.obj["config"] = config
+    return config
+
+
 def _api():
-    return BitbucketAPI(load_config())
+    """Return the invocation's API client, creating it on first use."""
+    ctx = click.get_current_context(silent=True)
+    root = ctx.find_root() if ctx is not None else None
+    if root is not None and root.obj.get("api") is not None:
+        return root.obj["api"]
+
+    from .api import BitbucketAPI
+
+    config = _config()
+    # Under `bb daemon`, reuse a warm client (open connections, caches) across commands
+    pool = root.obj.get("client_pool") if root is not None else None
+    api = pool.get(config) if pool is not None else BitbucketAPI(config)
+    if root is not None:
+        root.obj["api"] = api
+        if root.obj.get("tracer") is not None:
+            api.add_hook(root.obj["tracer"])
+    return api
+
+
+def _console():
+    """The shared rich console, imported on first use."""
+    from .utils.output import console
+    return console
+
+
+def _report_request_stats(ctx):
+    """Print the request budget and throttling summary to stderr (--verbose)."""
+    api = ctx.obj.get("api")
+    if api is None:
+        return
+    stats = api.rate_limit_stats()
+    click.echo(
+        f"[bb] {stats['requests']} requests, {stats['retries']} retries, "
+        f"{stats['rate_limited']} rate-limited, throttled {stats['throttle_seconds']}s, "
+        f"rate {stats['rate_per_second']}/s of {stats['max_rate_per_second']}/s",
+        err=True,
+    )
+
+
+def _report_trace(ctx, show_waterfall, trace_file):
+    """Print the request waterfall (--trace) and/or write a Chrome trace (--trace-file)."""
+    tracer = ctx.obj["tracer"]
+    tracer.finish()
+    if show_waterfall:
+        click.echo(tracer.waterfall(), err=True)
+    if trace_file:
+        try:
+            tracer.write_chrome_trace(trace_file)
+        except OSError as e:
+            click.echo(f"[bb] could not write trace file: {e}", err=True)
+
+
+def _mirror_options(f):
+    """Add --offline / --max-staleness to a command that can answer from the local mirror."""
+    f = click.option("--max-staleness", type=float, metavar="SECONDS",
+                     help="Answer from the local mirror, syncing it first if older than this")(f)
+    f = click.option("--offline", is_flag=True, help="Answer from the local mirror (`bb sync`) only")(f)
+    return f
+
+
+def _iso_timestamp(ctx, param, value):
+    """Click callback: validate an ISO 8601 date option and normalize it to UTC."""
+    if value is None:
+        return None
+    from .utils.dates import normalize_timestamp
+    try:
+        return normalize_timestamp(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def _mirror(ctx, workspace, repo, offline, max_staleness, state=None):
+    """The local mirror for --offline / --max-staleness, or None to go to the API."""
+    if not offline and max_staleness is None:
+        return None
+    from .commands import open_mirror
+    return open_mirror(_api(), workspace, repo, offline=offline, max_staleness=max_staleness, state=state)
+
+
+def _echo_json(ctx, data):
+    """Print JSON output — one compact line with --ndjson, indented otherwise."""
+    from .utils.render import write_json, write_ndjson
+    if ctx.obj.get("output_ndjson"):
+        write_ndjson(data)
+    else:
+        write_json(data)
 
 
 # ─── Top-level group ──────────────────────────────────────────────────
@@ -73,10 +168,15 @@ def _api():
 @click.option("-v", "--verbose", is_flag=True, help="Enable verbose logging")
 @click.option("--no-color", is_flag=True, help="Disable colored output")
 @click.option("--json", "output_json", is_flag=True, help="Output in JSON format")
+@click.option("--ndjson", "output_ndjson", is_flag=True, help="Output newline-delimited JSON, streamed as it arrives")
 @click.option("-w", "--workspace", help="Override default workspace")
 @click.option("-R", "--repo", help="Override repo (name only or workspace/name)")
+@click.option("--no-cache", is_flag=True, help="Bypass the on-disk response cache")
+@click.option("--trace", is_flag=True, help="Print a per-request timing waterfall to stderr")
+@click.option("--trace-file", type=click.Path(dir_okay=False, writable=True),
+              help="Write request timings as Chrome trace-event JSON")
 @click.pass_context
-def cli(ctx, verbose, no_color, output_json, workspace, repo):
+def cli(ctx, verbose, no_color, output_json, output_ndjson, workspace, repo, no_cache, trace, trace_file):
     """Bitbucket Cloud CLI — `gh`-style commands for Bitbucket repos.
 
     Run `bb <group> --help` for group-specific commands:
@@ -84,11 +184,23 @@ def cli(ctx, verbose, no_color, output_json, workspace, repo):
       bb pr --help      pull request operations
       bb run --help     pipeline (build) operations
       bb auth --help    authentication
+      bb batch --help   run NDJSON operations in one process
+      bb sync --help    local mirror for --offline reads
+      bb cache --help   response cache
+      bb daemon --help  background daemon for fast repeated calls
     """
     ctx.ensure_object(dict)
     ctx.obj["verbose"] = verbose
     ctx.obj["no_color"] = no_color
-    ctx.obj["output_json"] = output_json
+    ctx.obj["output_json"] = output_json or output_ndjson
+    ctx.obj["output_ndjson"] = output_ndjson
+    ctx.obj["no_cache"] = no_cache
+    if verbose:
+        ctx.call_on_close(functools.partial(_report_request_stats, ctx))
+    if trace or trace_file:
+        from .trace import RequestTracer
+        ctx.obj["tracer"] = RequestTracer()
+        ctx.call_on_close(functools.partial(_report_trace, ctx, trace, trace_file))
 
     # Allow `--repo workspace/name` shorthand like gh
     if repo and "/" in repo:
@@ -123,6 +235,10 @@ def pr():
 @validate_auth
 def pr_create(ctx, title, description, source, dest, reviewers, close_branch, template, web):
     """Create a pull request."""
+    from .commands import create_pr
+    from .utils.output import handle_output
+    from .utils.render import write_ndjson
+
     try:
         workspace, repo = _resolve_repo(ctx)
         result = create_pr(
@@ -130,7 +246,10 @@ def pr_create(ctx, title, description, source, dest, reviewers, close_branch, te
             title=title, description=description, source=source, dest=dest,
             reviewers=reviewers, close_branch=close_branch, template=template, web=web,
         )
-        handle_output(result, ctx.obj["output_json"], "Pull request created successfully")
+        if ctx.obj["output_ndjson"]:
+            write_ndjson(result)
+        else:
+            handle_output(result, ctx.obj["output_json"], "Pull request created successfully")
     except Exception as e:
         error(f"Failed to create PR: {e}")
         sys.exit(1)
@@ -140,24 +259,115 @@ def pr_create(ctx, title, description, source, dest, reviewers, close_branch, te
 @click.option("--state", default="OPEN", help="Filter by state (OPEN, MERGED, DECLINED, SUPERSEDED)")
 @click.option("--author", help="Filter by author username")
 @click.option("--reviewer", help="Filter by reviewer username")
-@click.option("-L", "--limit", default=25, help="Number of results")
+@click.option("-L", "--limit", type=int, help="Maximum number of results [default: 25, or all with --all]")
 @click.option("--all", "fetch_all", is_flag=True, help="Fetch all pages")
+@click.option("--workspace-wide", is_flag=True,
+              help="List across the workspace (defaults.repos from config, else every repository)")
+@click.option("--repos", help="Comma-separated repositories to list across (name or workspace/name)")
+@click.option("-H", "--head", help="Filter by source branch")
+@click.option("-B", "--base", help="Filter by destination branch")
+@click.option("-S", "--search", help="Filter by text in the title")
+@click.option("--updated-after", metavar="DATE", callback=_iso_timestamp,
+              help="Only PRs updated at or after DATE (ISO 8601, UTC unless an offset is given)")
+@click.option("--updated-before", metavar="DATE", callback=_iso_timestamp,
+              help="Only PRs updated before DATE (ISO 8601, UTC unless an offset is given)")
+@click.option("--draft/--no-draft", default=None, help="Only draft / only non-draft PRs")
+@click.option("--sort", help="Sort field, '-' prefix for descending (e.g. -updated_on)")
+@_mirror_options
 @click.pass_context
 @validate_auth
-def pr_list(ctx, state, author, reviewer, limit, fetch_all):
+def pr_list(ctx, state, author, reviewer, limit, fetch_all, workspace_wide, repos,
+            head, base, search, updated_after, updated_before, draft, sort, offline, max_staleness):
     """List pull requests."""
+    from .commands import iter_prs, list_prs
+    from .commands.list import PULL_REQUEST_LIST_FIELDS
+    from .utils.render import is_terminal, write_json, write_json_array, write_ndjson, write_pull_request_table
+
+    filters = {
+        "source_branch": head,
+        "destination_branch": base,
+        "title_contains": search,
+        "updated_since": updated_after,
+        "updated_before": updated_before,
+        "draft": draft,
+        "sort": sort,
+    }
+    filters = {k: v for k, v in filters.items() if v is not None}
+    if limit is None and not fetch_all:
+        limit = 25
+    if not ctx.obj["output_json"]:
+        # Tables only show a handful of columns; JSON output keeps full objects
+        filters["fields"] = PULL_REQUEST_LIST_FIELDS
+
+    if (offline or max_staleness is not None) and (workspace_wide or repos):
+        # The mirror is synced per repository; don't quietly answer from the API instead
+        raise click.UsageError("--workspace-wide and --repos can't be combined with --offline or --max-staleness")
+
+    if workspace_wide or repos:
+        _pr_list_multi(ctx, state, author, reviewer, limit, fetch_all, repos, filters)
+        return
+
+    if (offline or max_staleness is not None) and (draft is not None or sort):
+        # Draft status and arbitrary orderings aren't indexed; don't answer unfiltered
+        raise click.UsageError("--draft/--no-draft and --sort can't be combined with --offline or --max-staleness")
+
     try:
         workspace, repo = _resolve_repo(ctx)
-        prs = list_prs(
-            _api(), workspace, repo,
-            state=state, author=author, reviewer=reviewer,
-            limit=limit, fetch_all=fetch_all,
-        )
+        mirror = _mirror(ctx, workspace, repo, offline, max_staleness, state=state)
+
+        if mirror is not None:
+            prs = mirror.search(
+                workspace=workspace, repos=[f"{workspace}/{repo}"],
+                author={"nickname": author} if author else None,
+                reviewer={"nickname": reviewer} if reviewer else None,
+                branch=head,
+                state=None if state.upper() == "ALL" else state,
+                limit=limit,
+                destination_branch=base,
+                title_contains=search,
+                updated_since=updated_after,
+                updated_before=updated_before,
+            )
+        elif fetch_all:
+            # Stream rows as pages arrive instead of waiting for the last page
+            pr_iter = iter_prs(
+                _api(), workspace, repo,
+                state=state, author=author, reviewer=reviewer, limit=limit, **filters,
+            )
+            if ctx.obj["output_ndjson"]:
+                for p in pr_iter:
+                    write_ndjson(p)
+            elif ctx.obj["output_json"]:
+                write_json_array(pr_iter)
+            else:
+                from .utils.output import stream_pull_request_list
+                stream_pull_request_list(pr_iter)
+            return
+        else:
+            prs = list_prs(
+                _api(), workspace, repo,
+                state=state, author=author, reviewer=reviewer,
+                limit=limit, fetch_all=fetch_all, **filters,
+            )
+
+        if ctx.obj["output_ndjson"]:
+            for p in prs:
+                write_ndjson(p)
+            return
 
         if ctx.obj["output_json"]:
-            click.echo(json.dumps(prs, indent=2))
+            write_json(prs)
             return
 
+        if not is_terminal():
+            # Pipes and files get a plain table: no rich import, no markup parsing
+            if not write_pull_request_table(prs):
+                click.echo("No pull requests found.")
+            return
+
+        from rich.table import Table
+
+        console = _console()
         if not prs:
             console.print("No pull requests found.", style="yellow")
             return
@@ -186,23 +396,317 @@ def pr_list(ctx, state, author, reviewer, limit, fetch_all):
         sys.exit(1)
 
 
+def _resolve_workspace(ctx):
+    """Resolve the workspace from flags, config, or the current git remote."""
+    workspace = ctx.obj.get("workspace") or _config()["auth"].get("workspace")
+    if not workspace:
+        from .utils.git import get_repository_info
+        workspace = get_repository_info()["workspace"]
+    return workspace
+
+
+def _pr_list_multi(ctx, state, author, reviewer, limit, fetch_all, repos, filters):
+    """`bb pr list --workspace-wide / --repos`: one merged list across repositories."""
+    from .commands import list_prs_multi
+
+    try:
+        workspace = _resolve_workspace(ctx)
+        if repos:
+            repo_names = [r.strip() for r in repos.split(",") if r.strip()]
+        else:
+            repo_names = _config()["defaults"].get("repos") or None
+
+        filters = {k: v for k, v in filters.items() if k != "sort"}  # Always merged by update time
+        result = list_prs_multi(
+            _api(), workspace, repo_names,
+            state=state, author=author, reviewer=reviewer,
+            limit=limit, fetch_all=fetch_all, **filters,
+        )
+    except Exception as e:
+        error(f"Failed to list PRs: {e}")
+        sys.exit(1)
+
+    _print_multi_repo_prs(ctx, result, [f"{e['repo']}: {e['error']}" for e in result["errors"]])
+    if result["errors"] and len(result["errors"]) == len(result["repos"]):
+        sys.exit(1)
+
+
+def _print_multi_repo_prs(ctx, result, warnings):
+    """Render PRs from several repositories (with a Repo column) plus per-repo warnings."""
+    from .utils.render import is_terminal, write_json, write_ndjson, write_pull_request_table
+    from .utils.status import warning
+
+    prs = result["pullrequests"]
+    if ctx.obj["output_ndjson"]:
+        for p in prs:
+            write_ndjson(p)
+    elif ctx.obj["output_json"]:
+        write_json(result)
+    elif not is_terminal():
+        if not write_pull_request_table(prs, repo_column=True, date_field="updated_on"):
+            click.echo("No pull requests found.")
+    else:
+        from rich.table import Table
+
+        console = _console()
+        if not prs:
+            console.print("No pull requests found.", style="yellow")
+        else:
+            table = Table(title="Pull Requests")
+            table.add_column("Repo", style="blue")
+            table.add_column("ID", style="cyan")
+            table.add_column("Title", style="bold")
+            table.add_column("Author", style="green")
+            table.add_column("State", style="magenta")
+            table.add_column("Updated", style="dim")
+
+            for p in prs:
+                a = p.get("author", {}) or {}
+                author_name = a.get("username") or a.get("nickname") or a.get("display_name") or "Unknown"
+                repo_name = ((p.get("destination") or {}).get("repository") or {}).get("full_name", "")
+                title_text = p["title"][:50] + "..." if len(p["title"]) > 50 else p["title"]
+                table.add_row(
+                    repo_name,
+                    str(p["id"]),
+                    title_text,
+                    author_name,
+                    p["state"],
+                    (p.get("updated_on") or "")[:10],
+                )
+            console.print(table)
+
+    # JSON output already carries the errors; keep stdout parseable for NDJSON
+    for message in warnings:
+        if not ctx.obj["output_json"]:
+            warning(message)
+        elif ctx.obj["output_ndjson"]:
+            click.echo(f"[bb] {message}", err=True)
+
+
+@pr.command("search")
+@click.option("--author", help="Author username/nickname (@me for yourself)")
+@click.option("--reviewer", help="Reviewer username/nickname (@me for yourself)")
+@click.option("--branch", help="Source branch name")
+@click.option("--state", default="OPEN", help="OPEN, MERGED, DECLINED, SUPERSEDED or ALL")
+@click.option("--repos", help="Comma-separated repositories to search (default: defaults.repos, else all)")
+@click.option("-L", "--limit", default=30, help="Maximum number of results")
+@click.option("--no-refresh", is_flag=True, help="Answer from the local index without contacting Bitbucket")
+@click.pass_context
+@validate_auth
+def pr_search(ctx, author, reviewer, branch, state, repos, limit, no_refresh):
+    """Search pull requests across the workspace.
+
+    Results come from a local index (~/.bitbucket-cli/index.sqlite) that is
+    brought up to date incrementally before each search.
+    """
+    from .commands import search_prs
+
+    try:
+        workspace = _resolve_workspace(ctx)
+        result = search_prs(
+            _api(), workspace,
+            author=author, reviewer=reviewer, branch=branch,
+            state=None if state.upper() == "ALL" else state,
+            repos=[r.strip() for r in repos.split(",") if r.strip()] if repos else None,
+            refresh=not no_refresh, limit=limit,
+        )
+    except Exception as e:
+        error(f"Failed to search PRs: {e}")
+        sys.exit(1)
+
+    _print_multi_repo_prs(ctx, result, [f"{e['scope']}: {e['error']}" for e in result["errors"]])
+
+
 @pr.command("view")
 @click.argument("pr_id", type=int)
 @click.option("--web", is_flag=True, help="Open PR in web browser")
 @click.option("-c", "--comments", is_flag=True, help="Include comments in output")
+@_mirror_options
 @click.pass_context
 @validate_auth
-def pr_view(ctx, pr_id, web, comments):
+def pr_view(ctx, pr_id, web, comments, offline, max_staleness):
     """View a pull request."""
+    from .commands import iter_pr_comments, show_pr
+    from .utils.output import format_comment_output, handle_output
+    from .utils.render import write_ndjson
+
     try:
         workspace, repo = _resolve_repo(ctx)
-        pr_data = show_pr(_api(), workspace, repo, pr_id, web=web, include_comments=comments)
-        handle_output(pr_data, ctx.obj["output_json"], f"PR #{pr_id} details")
+        mirror = _mirror(ctx, workspace, repo, offline, max_staleness)
+        if mirror is not None:
+            _pr_view_mirrored(ctx, mirror, workspace, repo, pr_id, comments)
+            return
+
+        api = _api()
+
+        if comments and (ctx.obj["output_ndjson"] or not ctx.obj["output_json"]):
+            # Show the PR first, then stream comments as each page arrives
+            pr_data = show_pr(api, workspace, repo, pr_id, web=web)
+            comment_iter = iter_pr_comments(api, workspace, repo, pr_id)
+            if ctx.obj["output_ndjson"]:
+                write_ndjson(pr_data)
+                for comment in comment_iter:
+                    write_ndjson(comment)
+                return
+
+            handle_output(pr_data, False, f"PR #{pr_id} details")
+            for i, comment in enumerate(comment_iter):
+                if i == 0:
+                    _console().print("\n[bold cyan]Comments:[/bold cyan]")
+                format_comment_output(comment)
+            return
+
+        pr_data = show_pr(api, workspace, repo, pr_id, web=web, include_comments=comments)
+        if ctx.obj["output_ndjson"]:
+            write_ndjson(pr_data)
+        else:
+            handle_output(pr_data, ctx.obj["output_json"], f"PR #{pr_id} details")
     except Exception as e:
         error(f"Failed to view PR: {e}")
         sys.exit(1)
 
 
+def _pr_view_mirrored(ctx, mirror, workspace, repo, pr_id, comments):
+    """`bb pr view --offline / --max-staleness`: the PR (and comments) from the local mirror."""
+    from .exceptions import NotFoundError
+    from .utils.output import format_comment_output, handle_output
+    from .utils.render import write_ndjson
+
+    pr_data = mirror.get_pull_request(workspace, repo, pr_id)
+    if pr_data is None:
+        raise NotFoundError(f"PR #{pr_id} is not in the local mirror of {workspace}/{repo}")
+    comment_list = mirror.comments(workspace, repo, pr_id) if comments else []
+
+    if ctx.obj["output_ndjson"]:
+        for item in [pr_data] + comment_list:
+            write_ndjson(item)
+    elif ctx.obj["output_json"]:
+        handle_output(dict(pr_data, comments=comment_list) if comments else pr_data, True, "")
+    else:
+        handle_output(pr_data, False, f"PR #{pr_id} details")
+        if comment_list:
+            _console().print("\n[bold cyan]Comments:[/bold cyan]")
+            for comment in comment_list:
+                format_comment_output(comment)
+
+
+@pr.command("diff")
+@click.argument("pr_id", type=int)
+@click.option("-f", "--file", "files", multiple=True, metavar="PATH|GLOB",
+              help="Only show these files (repeatable; globs allowed, `dir/` for a directory)")
+@click.option("--exclude", multiple=True, metavar="GLOB", help="Leave out matching files (repeatable)")
+@click.option("--stat", is_flag=True, help="Show changed files and line counts only")
+@click.option("--summary", is_flag=True,
+              help="With --stat: totals, per-directory rollups, largest files, binary/rename counts")
+@click.option("--top", type=int, default=10, show_default=True, help="Largest files listed by --summary")
+@click.option("--depth", type=int, default=1, show_default=True, help="Directory depth of --summary rollups")
+@click.option("--no-pager", is_flag=True, help="Write straight to stdout instead of a pager")
+@click.pass_context
+@validate_auth
+def pr_diff(ctx, pr_id, files, exclude, stat, summary, top, depth, no_pager):
+    """View the diff of a pull request.
+
+    The diff is downloaded, parsed and rendered one hunk at a time, so output
+    starts immediately and memory use doesn't grow with the size of the diff.
+    With --file/--exclude only the selected files' diffs are downloaded.
+    """
+    from .commands import diff_pr, iter_diff_pr
+
+    try:
+        workspace, repo = _resolve_repo(ctx)
+        if stat or summary:
+            diffstat = diff_pr(_api(), workspace, repo, pr_id, file=files, stat=True, exclude=exclude)
+            if summary:
+                from .commands import summarize_diffstat
+                result = summarize_diffstat(diffstat["values"], top=top, depth=depth)
+                if ctx.obj["output_json"]:
+                    _echo_json(ctx, result)
+                else:
+                    _print_diffstat_summary(result)
+            elif ctx.obj["output_json"]:
+                _echo_json(ctx, diffstat)
+            else:
+                _print_diffstat(diffstat.get("values", []))
+            return
+
+        if ctx.obj["output_json"]:
+            _echo_json(ctx, {"diff": diff_pr(_api(), workspace, repo, pr_id, file=files, exclude=exclude)})
+            return
+        if ctx.obj["output_ndjson"]:
+            from .utils.diff import Hunk
+            from .utils.render import write_ndjson
+            for event in iter_diff_pr(_api(), workspace, repo, pr_id, files=files, exclude=exclude):
+                if isinstance(event, Hunk):
+                    write_ndjson({
+                        "path": event.path, "header": event.header,
+                        "old_start": event.old_start, "new_start": event.new_start, "lines": event.lines,
+                    })
+            return
+
+        from .utils.diff import render_diff
+        color = False if ctx.obj["no_color"] else None
+        if not no_pager and ctx.find_root().obj.get("client_pool") is not None and sys.stdout.isatty():
+            # A pager needs the client's terminal: hand the command back to it
+            from .daemon import NeedsTerminal
+            raise NeedsTerminal()
+        events = iter_diff_pr(_api(), workspace, repo, pr_id, files=files, exclude=exclude)
+        if no_pager:
+            for text in render_diff(events):
+                click.echo(text, nl=False, color=color)
+            return
+        click.echo_via_pager(render_diff(events), color=color)
+    except Exception as e:
+        error(f"Failed to get diff: {e}")
+        sys.exit(1)
+
+
+def _print_diffstat(entries):
+    """`bb pr diff --stat`: one line per changed file, git-style."""
+    width = max((len(_diffstat_path(e)) for e in entries), default=0)
+    added = removed = 0
+    for entry in entries:
+        added += entry.get("lines_added") or 0
+        removed += entry.get("lines_removed") or 0
+        click.echo(
+            f" {_diffstat_path(entry).ljust(width)} | "
+            + click.style(f"+{entry.get('lines_added') or 0}", fg="green") + " "
+            + click.style(f"-{entry.get('lines_removed') or 0}", fg="red")
+        )
+    click.echo(f" {len(entries)} files changed, {added} insertions(+), {removed} deletions(-)")
+
+
+def _print_diffstat_summary(summary):
+    """`bb pr diff --stat --summary`: totals, then directory rollups and the largest files."""
+    totals = summary["totals"]
+    click.echo(
+        f"{totals['files']} files changed, "
+        + click.style(f"+{totals['lines_added']}", fg="green") + " "
+        + click.style(f"-{totals['lines_removed']}", fg="red")
+        + f" ({', '.join(f'{n} {status}' for status, n in sorted(summary['statuses'].items()))}; "
+        f"{summary['binary']} binary)"
+    )
+    for title, rows in (("By directory", summary["directories"]), ("Largest files", summary["largest"])):
+        if not rows:
+            continue
+        click.echo(f"\n{title}:")
+        width = max(len(row["path"]) for row in rows)
+        for row in rows:
+            files = f"  {row['files']} files" if "files" in row else ""
+            click.echo(
+                f"  {row['path'].ljust(width)}  "
+                + click.style(f"+{row['lines_added']}", fg="green") + " "
+                + click.style(f"-{row['lines_removed']}", fg="red") + files
+            )
+
+
+def _diffstat_path(entry):
+    old = (entry.get("old") or {}).get("path")
+    new = (entry.get("new") or {}).get("path")
+    if old and new and old != new:
+        return f"{old} → {new}"
+    return new or old or ""
+
+
 @pr.command("review")
 @click.argument("pr_id", type=int)
 @click.option("--approve", "action", flag_value="approve", help="Approve the PR")
@@ -228,18 +732,21 @@ def pr_review(ctx, pr_id, action, body):
         workspace, repo = _resolve_repo(ctx)
         api = _api()
         if action == "approve":
+            from .commands import approve_pr
             result = approve_pr(api, workspace, repo, pr_id)
             success(f"✓ PR #{pr_id} approved")
         elif action == "unapprove":
+            from .commands import unapprove_pr
             result = unapprove_pr(api, workspace, repo, pr_id)
             success(f"✓ Approval removed from PR #{pr_id}")
         else:  # request_changes
+            from .commands import comment_pr
             text = body or "Requesting changes."
             result = comment_pr(api, workspace, repo, pr_id, message=f"[REQUEST_CHANGES] {text}")
             success(f"✓ Posted change-request comment on PR #{pr_id}")
 
         if ctx.obj["output_json"]:
-            click.echo(json.dumps(result, indent=2))
+            _echo_json(ctx, result)
     except Exception as e:
         error(f"Failed to review PR: {e}")
         sys.exit(1)
@@ -252,12 +759,14 @@ def pr_review(ctx, pr_id, action, body):
 @validate_auth
 def pr_close(ctx, pr_id, message):
     """Close (decline) a pull request without merging."""
+    from .commands import decline_pr
+
     try:
         workspace, repo = _resolve_repo(ctx)
         result = decline_pr(_api(), workspace, repo, pr_id, message=message)
         success(f"✓ PR #{pr_id} closed")
         if ctx.obj["output_json"]:
-            click.echo(json.dumps(result, indent=2))
+            _echo_json(ctx, result)
     except Exception as e:
         error(f"Failed to close PR: {e}")
         sys.exit(1)
@@ -278,6 +787,8 @@ def pr_close(ctx, pr_id, message):
 @validate_auth
 def pr_merge(ctx, pr_id, message, strategy, close_branch):
     """Merge a pull request."""
+    from .commands import merge_pr
+
     try:
         workspace, repo = _resolve_repo(ctx)
         result = merge_pr(
@@ -286,7 +797,7 @@ def pr_merge(ctx, pr_id, message, strategy, close_branch):
         )
         success(f"✓ PR #{pr_id} merged")
         if ctx.obj["output_json"]:
-            click.echo(json.dumps(result, indent=2))
+            _echo_json(ctx, result)
     except Exception as e:
         error(f"Failed to merge PR: {e}")
         sys.exit(1)
@@ -301,10 +812,18 @@ def pr_merge(ctx, pr_id, message, strategy, close_branch):
 @click.option("--from-line", type=int, help="Starting line for multi-line comment")
 @click.option("--to-line", type=int, help="Ending line for multi-line comment")
 @click.option("--reply-to", type=int, help="Reply to existing comment ID")
+@click.option("--no-validate", is_flag=True, help="Post inline comments without checking the lines are in the diff")
 @click.pass_context
 @validate_auth
-def pr_comment(ctx, pr_id, message, file, line, from_line, to_line, reply_to):
-    """Add a comment to a pull request."""
+def pr_comment(ctx, pr_id, message, file, line, from_line, to_line, reply_to, no_validate):
+    """Add a comment to a pull request.
+
+    Inline comments (--file with --line or --from-line/--to-line) are checked
+    against the file's diff first, so a line outside it fails with the
+    commentable ranges instead of posting a misplaced comment.
+    """
+    from .commands import comment_pr
+
     try:
         workspace, repo = _resolve_repo(ctx)
         if not message:
@@ -313,10 +832,11 @@ def pr_comment(ctx, pr_id, message, file, line, from_line, to_line, reply_to):
             _api(), workspace, repo, pr_id,
             message=message, file=file, line=line,
             from_line=from_line, to_line=to_line, reply_to=reply_to,
+            validate=not no_validate,
         )
         success(f"✓ Comment added to PR #{pr_id}")
         if ctx.obj["output_json"]:
-            click.echo(json.dumps(result, indent=2))
+            _echo_json(ctx, result)
     except Exception as e:
         error(f"Failed to add comment: {e}")
         sys.exit(1)
@@ -334,11 +854,21 @@ def run():
 @click.option("-b", "--branch", help="Filter by branch name")
 @click.option("--pr", "pr_id", type=int, help="Filter by PR ID (uses the PR's source branch)")
 @click.option("-L", "--limit", default=5, show_default=True, help="Number of pipelines to show")
-@click.option("-l", "--logs", is_flag=True, help="Show failure log tails for failed steps")
+@click.option(
+    "-l", "--logs",
+    type=int,
+    is_flag=False,
+    flag_value=50,
+    default=None,
+    metavar="[LINES]",
+    help="Show failure log tails for failed steps (last 50 lines unless LINES is given)",
+)
 @click.pass_context
 @validate_auth
 def run_list(ctx, branch, pr_id, limit, logs):
     """List recent pipeline runs."""
+    from .commands import get_pipeline_status
+
     try:
         workspace, repo = _resolve_repo(ctx)
 
@@ -348,13 +878,21 @@ def run_list(ctx, branch, pr_id, limit, logs):
 
         pipelines = get_pipeline_status(
             _api(), workspace, repo,
-            branch=branch, pr_id=pr_id, limit=limit,
+            branch=branch, pr_id=pr_id, limit=limit, log_lines=logs or 50,
         )
 
         if ctx.obj["output_json"]:
-            click.echo(json.dumps(pipelines, indent=2))
+            _echo_json(ctx, pipelines)
+            return
+
+        from .utils.render import is_terminal
+        if not is_terminal():
+            _print_pipelines_plain(pipelines, logs)
             return
 
+        from rich.table import Table
+
+        console = _console()
         if not pipelines:
             console.print("No pipelines found.", style="yellow")
             return
@@ -432,6 +970,40 @@ def run_list(ctx, branch, pr_id, limit, logs):
         sys.exit(1)
 
 
+def _print_pipelines_plain(pipelines, logs):
+    """`bb run list` for pipes and files: plain tables written row by row."""
+    from .utils.render import TableWriter
+
+    if not pipelines:
+        click.echo("No pipelines found.")
+        return
+
+    table = TableWriter([("#", 6), ("Branch", 30), ("State", 12), ("Result", 12), ("Duration", 8), ("Created", 19)])
+    for p in pipelines:
+        duration = f"{p['duration_in_seconds']}s" if p.get("duration_in_seconds") else "-"
+        table.add_row(
+            p["build_number"],
+            p.get("branch") or "-",
+            p.get("state") or "-",
+            p.get("result") or p.get("state") or "-",
+            duration,
+            (p.get("created_on") or "")[:19],
+        )
+
+    for p in pipelines:
+        if not p.get("steps"):
+            continue
+        click.echo(f"\nPipeline #{p['build_number']} steps:")
+        steps = TableWriter([("Step", 40), ("Result", 12), ("Duration", 8)])
+        for step in p["steps"]:
+            duration = f"{step['duration_in_seconds']}s" if step.get("duration_in_seconds") else "-"
+            steps.add_row(step.get("name") or "-", step.get("result") or step.get("state") or "-", duration)
+        if logs:
+            for step in p["steps"]:
+                if step.get("log_tail"):
+                    click.echo(f"\n--- Log tail: {step.get('name')} ---\n{step['log_tail']}")
+
+
 # ─── `bb auth` group ──────────────────────────────────────────────────
 
 
@@ -458,6 +1030,7 @@ def auth_login(repo_token, username, app_password, oauth_token, workspace):
             success("Configuration updated successfully")
             return
 
+        from .auth import load_config
         config = load_config()
         click.echo("Choose authentication method:")
         click.echo("1. Repository access token (recommended)")
@@ -485,6 +1058,8 @@ def auth_login(repo_token, username, app_password, oauth_token, workspace):
 @auth.command("status")
 def auth_status():
     """Show current authentication status."""
+    from .auth import is_authenticated, load_config
+
     try:
         cfg = load_config()
         display = json.loads(json.dumps(cfg))  # deep copy
@@ -517,10 +1092,259 @@ def auth_logout():
         sys.exit(1)
 
 
+# ─── `bb batch` ───────────────────────────────────────────────────────
+
+
+@cli.command("batch")
+@click.argument("source", default="-", metavar="[FILE]")
+@click.option("-j", "--concurrency", type=int, help="Operations in flight at once (default: api.max_workers)")
+@click.option("--stop-on-error", is_flag=True, help="Skip operations not yet started once one fails")
+@click.pass_context
+@validate_auth
+def batch(ctx, source, concurrency, stop_on_error):
+    """Run many operations from NDJSON (FILE or stdin) through one client.
+
+    One JSON object per line, e.g.:
+
+    \b
+      {"op": "pr.approve", "pr": 12}
+      {"op": "pr.comment", "pr": 12, "body": "LGTM"}
+      {"op": "pr.merge", "pr": 12, "strategy": "squash", "id": "m12"}
+      {"op": "pr.comment", "pr": 13, "body": "12 landed", "after": "m12"}
+
+    Ops: pr.approve, pr.unapprove, pr.comment, pr.merge, pr.decline (pr.close),
+    pr.view, pr.update, pr.diff, pr.activity, run.list. Operations on the same
+    PR run in input order; `after` waits for earlier ops by `id`. `repo` may
+    override the target (`workspace/name`). One NDJSON result is printed per
+    operation as it completes; the exit status is 1 if any failed or were skipped.
+    """
+    from .commands import parse_operations, run_batch
+    from .utils.render import write_ndjson
+
+    try:
+        if source == "-":
+            operations = parse_operations(sys.stdin.read().splitlines())
+        else:
+            with open(source, "r", encoding="utf-8") as f:
+                operations = parse_operations(f)
+
+        try:
+            workspace, repo = _resolve_repo(ctx)
+        except Exception:
+            # Every operation may name its own repo
+            workspace, repo = ctx.obj.get("workspace"), ctx.obj.get("repo")
+
+        results = run_batch(
+            _api(), workspace, repo, operations,
+            concurrency=concurrency, stop_on_error=stop_on_error,
+            on_result=lambda result: write_ndjson(result, flush=True),
+        )
+    except Exception as e:
+        error(f"Batch failed: {e}")
+        sys.exit(1)
+
+    if any(r["status"] != "ok" for r in results):
+        sys.exit(1)
+
+
+# ─── `bb sync` ────────────────────────────────────────────────────────
+
+
+@cli.command("sync")
+@click.option("--workspace-wide", is_flag=True,
+              help="Sync across the workspace (defaults.repos from config, else every repository)")
+@click.option("--repos", help="Comma-separated repositories to sync (name or workspace/name)")
+@click.option("--state", default="ALL", help="PR state to mirror on a first sync (OPEN, MERGED, ... or ALL)")
+@click.pass_context
+@validate_auth
+def sync(ctx, workspace_wide, repos, state):
+    """Update the local mirror of PRs, comments, activity and pipelines.
+
+    Only what changed since the previous sync is downloaded. `bb pr list` and
+    `bb pr view` answer from the mirror with --offline or --max-staleness.
+    """
+    from .commands import sync_repos
+
+    if not _config()["cache"].get("enabled", False):
+        error("The local mirror is only kept while caching is enabled (drop --no-cache or set cache.enabled)")
+        sys.exit(2)
+    try:
+        if repos or workspace_wide:
+            workspace = _resolve_workspace(ctx)
+            if repos:
+                targets = [r.strip() for r in repos.split(",") if r.strip()]
+            else:
+                targets = _config()["defaults"].get("repos") or None
+        else:
+            workspace, repo = _resolve_repo(ctx)
+            targets = [repo]
+
+        result = sync_repos(
+            _api(), workspace, targets,
+            state=None if state.upper() == "ALL" else state.upper(),
+        )
+    except Exception as e:
+        error(f"Sync failed: {e}")
+        sys.exit(1)
+
+    if ctx.obj["output_json"]:
+        _echo_json(ctx, result)
+    else:
+        from .utils.status import warning
+
+        for r in result["repos"]:
+            success(
+                f"{r['repo']}: {r['pullrequests']} pull requests, {r['comments']} comments, "
+                f"{r['activity']} activity entries, {r['pipelines']} pipelines"
+            )
+        for e in result["errors"]:
+            warning(f"{e['repo']}: {e['error']}")
+    if result["errors"]:
+        sys.exit(1)
+
+
+# ─── `bb cache` group ─────────────────────────────────────────────────
+
+
+@cli.group()
+def cache():
+    """Inspect or clear the on-disk response cache."""
+
+
+def _cache_stores():
+    from .cache import cache_stores
+    return cache_stores(_config())
+
+
+@cache.command("stats")
+@click.pass_context
+def cache_stats(ctx):
+    """Show cache size and entry counts."""
+    try:
+        stats = {name: store.stats() for name, store in _cache_stores().items()}
+        if ctx.obj["output_json"]:
+            _echo_json(ctx, stats)
+            return
+        from rich.table import Table
+
+        table = Table()
+        table.add_column("Cache", style="bold cyan")
+        table.add_column("Entries", justify="right")
+        table.add_column("Size", justify="right")
+        table.add_column("Least recently used", style="dim")
+        table.add_column("Directory", style="dim")
+        for name, s in stats.items():
+            table.add_row(
+                name,
+                str(s["entries"]),
+                f"{s['size_bytes'] / 1024 / 1024:.1f} / {s['max_size_bytes'] / 1024 / 1024:.0f} MB",
+                s["least_recently_used"] or "-",
+                s["directory"],
+            )
+        _console().print(table)
+    except Exception as e:
+        error(f"Failed to read cache stats: {e}")
+        sys.exit(1)
+
+
+@cache.command("clear")
+@click.pass_context
+def cache_clear(ctx):
+    """Delete all cached responses and diffs."""
+    try:
+        removed = sum(store.clear() for store in _cache_stores().values())
+        if ctx.obj["output_json"]:
+            _echo_json(ctx, {"removed": removed})
+            return
+        success(f"Removed {removed} cache entries")
+    except Exception as e:
+        error(f"Failed to clear cache: {e}")
+        sys.exit(1)
+
+
+# ─── `bb daemon` group ────────────────────────────────────────────────
+
+
+@cli.group()
+def daemon():
+    """Run a background daemon that keeps a warm API client.
+
+    While it runs, `bb` forwards commands to it over a per-user Unix socket,
+    skipping interpreter startup, config parsing and TLS handshakes. Set
+    BB_NO_DAEMON=1 to bypass it for a single invocation.
+    """
+
+
+@daemon.command("start")
+@click.option("--idle-timeout", type=int, default=1800, show_default=True,
+              help="Exit after this many seconds without a command")
+@click.option("--foreground", is_flag=True, help="Run in this process instead of detaching")
+@click.pass_context
+def daemon_start(ctx, idle_timeout, foreground):
+    """Start the daemon."""
+    from . import daemon as bb_daemon
+
+    status = bb_daemon.control("status")
+    if status is not None:
+        success(f"Daemon already running (pid {status['pid']})")
+        return
+    if foreground:
+        bb_daemon.Daemon(idle_timeout=idle_timeout).serve()
+        return
+    pid = bb_daemon.start_background(idle_timeout=idle_timeout)
+    if pid is None:
+        error("Daemon failed to start")
+        sys.exit(1)
+    if ctx.obj["output_json"]:
+        _echo_json(ctx, {"pid": pid, "socket": str(bb_daemon.SOCKET_PATH)})
+        return
+    success(f"Daemon started (pid {pid}, socket {bb_daemon.SOCKET_PATH})")
+
+
+@daemon.command("stop")
+@click.pass_context
+def daemon_stop(ctx):
+    """Stop the daemon."""
+    from . import daemon as bb_daemon
+
+    status = bb_daemon.control("stop")
+    if ctx.obj["output_json"]:
+        _echo_json(ctx, {"stopped": status is not None})
+        return
+    if status is None:
+        error("Daemon is not running")
+        sys.exit(1)
+    success(f"Daemon stopped (pid {status['pid']}, served {status['commands_served']} commands)")
+
+
+@daemon.command("status")
+@click.pass_context
+def daemon_status(ctx):
+    """Show whether the daemon is running."""
+    from . import daemon as bb_daemon
+
+    status = bb_daemon.control("status")
+    if ctx.obj["output_json"]:
+        _echo_json(ctx, status or {"running": False})
+        return
+    if status is None:
+        error("Daemon is not running")
+        sys.exit(1)
+    success(
+        f"Daemon running (pid {status['pid']}, up {status['uptime_seconds']:.0f}s, "
+        f"{status['commands_served']} commands served, {status['warm_clients']} warm clients)"
+    )
+
+
 # ─── Entry point ──────────────────────────────────────────────────────
 
 
 def main():
+    from .daemon import forward_to_daemon
+
+    code = forward_to_daemon(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
     try:
         cli()
     except KeyboardInterrupt:
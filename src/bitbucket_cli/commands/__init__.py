@@ -1,33 +1,68 @@
 """
 ABOUTME: Command module initialization with high-level PR operation functions
-ABOUTME: Provides organized imports for all CLI command implementations
+ABOUTME: Lazily loads each command implementation the first time it is looked up
 """
 
-from .create import create_pr
-from .list import list_prs
-from .show import show_pr
-from .approve import approve_pr, unapprove_pr
-from .decline import decline_pr
-from .merge import merge_pr
-from .comment import comment_pr
-from .update import update_pr
-from .diff import diff_pr
-from .activity import activity_pr
-from .review import review_pr
-from .pipelines import get_pipeline_status
-
-__all__ = [
-    "create_pr",
-    "list_prs",
-    "show_pr",
-    "approve_pr",
-    "unapprove_pr",
-    "decline_pr",
-    "merge_pr",
-    "comment_pr",
-    "update_pr",
-    "diff_pr",
-    "activity_pr",
-    "review_pr",
-    "get_pipeline_status",
-]
\ No newline at end of file
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .create import create_pr
+    from .list import list_prs, iter_prs, list_prs_multi
+    from .show import show_pr, iter_pr_comments
+    from .approve import approve_pr, unapprove_pr
+    from .decline import decline_pr
+    from .merge import merge_pr
+    from .comment import comment_pr
+    from .update import update_pr
+    from .diff import diff_pr, iter_diff_pr, diff_index, summarize_diffstat
+    from .activity import activity_pr
+    from .review import review_pr
+    from .pipelines import get_pipeline_status
+    from .batch import run_batch, parse_operations
+    from .search import search_prs
+    from .sync import sync_repos, open_mirror
+
+# Command name → implementing module. `bb pr review --approve` should only pay
+# for approve.py, not for every command's dependencies.
+COMMAND_REGISTRY = {
+    "create_pr": ".create",
+    "list_prs": ".list",
+    "iter_prs": ".list",
+    "list_prs_multi": ".list",
+    "show_pr": ".show",
+    "iter_pr_comments": ".show",
+    "approve_pr": ".approve",
+    "unapprove_pr": ".approve",
+    "decline_pr": ".decline",
+    "merge_pr": ".merge",
+    "comment_pr": ".comment",
+    "update_pr": ".update",
+    "diff_pr": ".diff",
+    "iter_diff_pr": ".diff",
+    "diff_index": ".diff",
+    "summarize_diffstat": ".diff",
+    "activity_pr": ".activity",
+    "review_pr": ".review",
+    "get_pipeline_status": ".pipelines",
+    "run_batch": ".batch",
+    "parse_operations": ".batch",
+    "search_prs": ".search",
+    "sync_repos": ".sync",
+    "open_mirror": ".sync",
+}
+
+__all__ = list(COMMAND_REGISTRY)
+
+
+def __getattr__(name: str) -> Any:
+    module = COMMAND_REGISTRY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(COMMAND_REGISTRY))
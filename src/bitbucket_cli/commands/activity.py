@@ -27,10 +27,5 @@ def activity_pr(
     Returns:
         List of activity data
     """
-    activities = api.get_activity(workspace, repo, pr_id)
-    
-    # Limit results if specified
-    if limit and len(activities) > limit:
-        activities = activities[:limit]
-    
-    return activities
\ No newline at end of file
+    # Activity comes newest first, so the budget stops paging once enough has arrived
+    return api.get_activity(workspace, repo, pr_id, max_items=limit or None)
\ No newline at end of file
@@ -0,0 +1,299 @@
+"""
+ABOUTME: Batch mode running many NDJSON-described PR and pipeline operations through one API client
+ABOUTME: Orders operations per PR and by explicit dependencies, runs independent ones concurrently
+"""
+
+import json
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..api import BitbucketAPI
+from ..exceptions import ValidationError
+
+
+def _approve(api: BitbucketAPI, ws: str, repo: str, op: Dict[str, Any]) -> Any:
+    from .approve import approve_pr
+    return approve_pr(api, ws, repo, _pr_id(op))
+
+
+def _unapprove(api: BitbucketAPI, ws: str, repo: str, op: Dict[str, Any]) -> Any:
+    from .approve import unapprove_pr
+    return unapprove_pr(api, ws, repo, _pr_id(op))
+
+
+def _comment(api: BitbucketAPI, ws: str, repo: str, op: Dict[str, Any]) -> Any:
+    from .comment import comment_pr
+    message = op.get("body") or op.get("message")
+    if not message:
+        raise ValidationError("pr.comment requires 'body'")
+    return comment_pr(
+        api, ws, repo, _pr_id(op),
+        message=message,
+        file=op.get("file"),
+        line=op.get("line"),
+        from_line=op.get("from_line"),
+        to_line=op.get("to_line"),
+        reply_to=op.get("reply_to"),
+        validate=bool(op.get("validate", True)),
+    )
+
+
+def _merge(api: BitbucketAPI, ws: str, repo: str, op: Dict[str, Any]) -> Any:
+    from .merge import merge_pr
+    return merge_pr(
+        api, ws, repo, _pr_id(op),
+        message=op.get("message"),
+        strategy=op.get("strategy", "merge_commit"),
+        close_branch=bool(op.get("close_branch", False)),
+    )
+
+
+def _decline(api: BitbucketAPI, ws: str, repo: str, op: Dict[str, Any]) -> Any:
+    from .decline import decline_pr
+    return decline_pr(api, ws, repo, _pr_id(op), message=op.get("message"))
+
+
+def _view(api: BitbucketAPI, ws: str, repo: str, op: Dict[str, Any]) -> Any:
+    from .show import show_pr
+    return show_pr(api, ws, repo, _pr_id(op), include_comments=bool(op.get("comments", False)))
+
+
+def _update(api: BitbucketAPI, ws: str, repo: str, op: Dict[str, Any]) -> Any:
+    from .update import update_pr
+    return update_pr(
+        api, ws, repo, _pr_id(op),
+        title=op.get("title"),
+        description=op.get("description") or op.get("body"),
+        add_reviewer=op.get("add_reviewer"),
+        remove_reviewer=op.get("remove_reviewer"),
+        dest=op.get("dest"),
+    )
+
+
+def _diff(api: BitbucketAPI, ws: str, repo: str, op: Dict[str, Any]) -> Any:
+    from .diff import diff_pr
+    return diff_pr(
+        api, ws, repo, _pr_id(op),
+        file=op.get("file"), stat=bool(op.get("stat", False)), exclude=op.get("exclude"),
+    )
+
+
+def _activity(api: BitbucketAPI, ws: str, repo: str, op: Dict[str, Any]) -> Any:
+    from .activity import activity_pr
+    return activity_pr(api, ws, repo, _pr_id(op), limit=op.get("limit", 20))
+
+
+def _run_list(api: BitbucketAPI, ws: str, repo: str, op: Dict[str, Any]) -> Any:
+    from .pipelines import get_pipeline_status
+    if not op.get("branch") and op.get("pr") is None:
+        raise ValidationError("run.list requires 'branch' or 'pr'")
+    return get_pipeline_status(
+        api, ws, repo,
+        branch=op.get("branch"),
+        pr_id=op.get("pr"),
+        limit=op.get("limit", 5),
+        log_lines=op.get("logs") or 50,
+    )
+
+
+# Operation name → handler(api, workspace, repo, op)
+OPERATIONS: Dict[str, Callable[[BitbucketAPI, str, str, Dict[str, Any]], Any]] = {
+    "pr.approve": _approve,
+    "pr.unapprove": _unapprove,
+    "pr.comment": _comment,
+    "pr.merge": _merge,
+    "pr.decline": _decline,
+    "pr.close": _decline,
+    "pr.view": _view,
+    "pr.update": _update,
+    "pr.diff": _diff,
+    "pr.activity": _activity,
+    "run.list": _run_list,
+}
+
+
+def _pr_id(op: Dict[str, Any]) -> int:
+    try:
+        return int(op["pr"])
+    except (KeyError, TypeError, ValueError):
+        raise ValidationError(f"{op.get('op')} requires an integer 'pr'")
+
+
+def parse_operations(lines: Iterable[str]) -> List[Dict[str, Any]]:
+    """
+    Parse NDJSON operation lines, skipping blank lines and ``#`` comments.
+
+    Lines that aren't valid JSON objects become ``{"op": None, "_error": ...}``
+    entries so they still get a result in output order.
+    """
+    operations = []
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            op = json.loads(line)
+            if not isinstance(op, dict):
+                raise ValueError("operation must be a JSON object")
+        except ValueError as e:
+            op = {"op": None, "_error": f"line {number}: {e}"}
+        operations.append(op)
+    return operations
+
+
+def _plan(
+    operations: List[Dict[str, Any]],
+    workspace: str,
+    repo: str
+) -> Tuple[List[Dict[str, Any]], List[List[int]], List[Optional[str]]]:
+    """
+    Resolve each operation's target repo and dependencies.
+
+    Operations on the same PR run in input order; ``after`` (an id or list of ids
+    of earlier operations) adds explicit dependencies.
+
+    Returns:
+        (resolved targets, dependency indexes, validation errors) per operation
+    """
+    targets: List[Dict[str, Any]] = []
+    deps: List[List[int]] = []
+    errors: List[Optional[str]] = []
+    ids: Dict[str, int] = {}
+    last_on_pr: Dict[Tuple[str, str, Any], int] = {}
+
+    for index, op in enumerate(operations):
+        op_ws, op_repo = op.get("workspace") or workspace, op.get("repo") or repo
+        if op_repo and "/" in op_repo:
+            op_ws, _, op_repo = op_repo.partition("/")
+        targets.append({"workspace": op_ws, "repo": op_repo})
+
+        error = op.get("_error")
+        if error is None and op.get("op") not in OPERATIONS:
+            error = f"unknown op {op.get('op')!r} (expected one of: {', '.join(OPERATIONS)})"
+        if error is None and not (op_ws and op_repo):
+            error = "no workspace/repo (pass -R or set 'repo' on the operation)"
+
+        op_deps = []
+        after = op.get("after")
+        for ref in ([] if after is None else after if isinstance(after, list) else [after]):
+            if str(ref) not in ids:
+                error = error or f"'after' refers to unknown or later operation {ref!r}"
+            else:
+                op_deps.append(ids[str(ref)])
+
+        if op.get("pr") is not None:
+            key = (op_ws, op_repo, str(op["pr"]))
+            if key in last_on_pr:
+                op_deps.append(last_on_pr[key])
+            last_on_pr[key] = index
+
+        if op.get("id") is not None:
+            ids[str(op["id"])] = index
+
+        deps.append(sorted(set(op_deps)))
+        errors.append(error)
+
+    return targets, deps, errors
+
+
+def run_batch(
+    api: BitbucketAPI,
+    workspace: Optional[str],
+    repo: Optional[str],
+    operations: List[Dict[str, Any]],
+    concurrency: Optional[int] = None,
+    stop_on_error: bool = False,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run batch operations through one API client.
+
+    Independent operations run concurrently; an operation whose dependency failed
+    (or was skipped) is skipped. Results are reported as they complete.
+
+    Args:
+        api: BitbucketAPI instance
+        workspace: Default Bitbucket workspace name
+        repo: Default repository name
+        operations: Parsed operations (see parse_operations)
+        concurrency: Maximum operations in flight (defaults to the API's max_workers)
+        stop_on_error: Skip every operation not yet started once one fails
+        on_result: Called with each result as soon as it is known
+
+    Returns:
+        Results in input order, each with index, id, op, pr, status
+        ("ok", "error" or "skipped") and result or error
+    """
+    targets, deps, errors = _plan(operations, workspace or "", repo or "")
+    results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+    dependents: Dict[int, List[int]] = {}
+    for index, op_deps in enumerate(deps):
+        for dep in op_deps:
+            dependents.setdefault(dep, []).append(index)
+
+    def finish(index: int, status: str, **fields: Any) -> None:
+        op = operations[index]
+        result = {"index": index, "id": op.get("id"), "op": op.get("op"), "pr": op.get("pr"), "status": status}
+        result.update(fields)
+        results[index] = result
+        if on_result is not None:
+            on_result(result)
+
+    def execute(index: int) -> Any:
+        op = operations[index]
+        return OPERATIONS[op["op"]](api, targets[index]["workspace"], targets[index]["repo"], op)
+
+    remaining = {index: len(op_deps) for index, op_deps in enumerate(deps)}
+    ready = deque(index for index, count in remaining.items() if count == 0)
+    failed = False
+    running: Dict[Future, Tuple[int, float]] = {}
+
+    def settle(index: int, ok: bool) -> None:
+        """Release or skip the operations waiting on ``index``."""
+        for dependent in dependents.get(index, []):
+            if results[dependent] is not None:
+                continue
+            if not ok:
+                finish(dependent, "skipped", error=f"dependency {index} did not succeed")
+                settle(dependent, False)
+                continue
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                ready.append(dependent)
+
+    limit = max(1, concurrency or api.max_workers)
+    with ThreadPoolExecutor(max_workers=limit) as executor:
+        while ready or running:
+            while ready and len(running) < limit:
+                index = ready.popleft()
+                if results[index] is not None:
+                    continue
+                if errors[index] is not None:
+                    finish(index, "error", error=errors[index])
+                    failed = True
+                    settle(index, False)
+                elif failed and stop_on_error:
+                    finish(index, "skipped", error="an earlier operation failed")
+                    settle(index, False)
+                else:
+                    running[executor.submit(execute, index)] = (index, time.perf_counter())
+
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, started = running.pop(future)
+                elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+                try:
+                    value = future.result()
+                except Exception as e:
+                    failed = True
+                    finish(index, "error", error=str(e), error_type=type(e).__name__, elapsed_ms=elapsed_ms)
+                    settle(index, False)
+                else:
+                    finish(index, "ok", result=value, elapsed_ms=elapsed_ms)
+                    settle(index, True)
+
+    return [r for r in results if r is not None]
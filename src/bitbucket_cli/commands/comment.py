@@ -1,10 +1,11 @@
 """
 ABOUTME: Add comments to pull requests with support for inline comments on specific lines
-ABOUTME: Handles both general PR comments and file-specific inline comments with line numbers
+ABOUTME: Handles both general PR comments and file-specific inline comments, checked against the diff
 """
 
 from typing import Dict, Any, Optional
 from ..api import BitbucketAPI
+from ..exceptions import ValidationError
 
 
 def comment_pr(
@@ -17,7 +18,8 @@ def comment_pr(
     line: Optional[int] = None,
     from_line: Optional[int] = None,
     to_line: Optional[int] = None,
-    reply_to: Optional[int] = None
+    reply_to: Optional[int] = None,
+    validate: bool = True
 ) -> Dict[str, Any]:
     """
     Add a comment to a pull request.
@@ -33,10 +35,17 @@ def comment_pr(
         from_line: Starting line for multi-line comment
         to_line: Ending line for multi-line comment
         reply_to: Reply to existing comment ID
+        validate: Check that an inline comment's file and lines are part of the
+            diff before posting it
         
     Returns:
         Comment result data
+        
+    Raises:
+        ValidationError: The inline position is not in the diff
     """
+    if file and validate and not reply_to:
+        validate_inline_position(api, workspace, repo, pr_id, file, line, from_line, to_line)
     return api.add_comment(
         workspace, repo, pr_id, message,
         file=file,
@@ -44,4 +53,36 @@ def comment_pr(
         from_line=from_line,
         to_line=to_line,
         reply_to=reply_to
-    )
\ No newline at end of file
+    )
+
+
+def validate_inline_position(
+    api: BitbucketAPI,
+    workspace: str,
+    repo: str,
+    pr_id: int,
+    file: str,
+    line: Optional[int] = None,
+    from_line: Optional[int] = None,
+    to_line: Optional[int] = None
+) -> None:
+    """
+    Check an inline comment position against the PR diff, downloading only that file's diff.
+    
+    Raises:
+        ValidationError: The file is not changed, or a line is not shown in its diff
+    """
+    from .diff import diff_index
+    
+    line_map = diff_index(api, workspace, repo, pr_id, files=[file]).get(file)
+    if line_map is None:
+        raise ValidationError(f"{file} is not changed in PR #{pr_id}")
+    
+    lines = [from_line, to_line] if from_line and to_line else [line]
+    for number in lines:
+        if number and not line_map.has_new_line(number):
+            ranges = ", ".join(f"{a}-{b}" if a != b else str(a) for a, b in line_map.new_ranges())
+            raise ValidationError(
+                f"Line {number} of {file} is not part of the diff of PR #{pr_id}"
+                + (f" (commentable lines: {ranges})" if ranges else "")
+            )
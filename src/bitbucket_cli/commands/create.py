@@ -8,6 +8,8 @@ import webbrowser
 from pathlib import Path
 
 from ..api import BitbucketAPI
+from ..async_api import AsyncBitbucketAPI, run_async_command
+from ..users import resolve_users_async
 from ..utils.git import get_current_branch
 from ..utils.output import success, info, warning
 from ..exceptions import ValidationError
@@ -73,30 +75,27 @@ def create_pr(
         import click
         description = click.prompt("PR Description (optional)", default="", show_default=False)
     
-    # Parse and resolve reviewers
-    reviewer_list = []
-    if reviewers:
-        reviewer_names = [r.strip() for r in reviewers.split(",")]
-        reviewer_list = _resolve_reviewers(api, reviewer_names)
-    
-    # Add default reviewers from config
+    # Parse reviewers, then add default reviewers from config
+    reviewer_names = [r.strip() for r in reviewers.split(",")] if reviewers else []
     config_reviewers = api.config["defaults"].get("reviewers", [])
-    if config_reviewers:
-        config_reviewer_list = _resolve_reviewers(api, config_reviewers)
-        reviewer_list.extend(config_reviewer_list)
-        
-        # Remove duplicates
-        seen_uuids = set()
-        unique_reviewers = []
-        for reviewer in reviewer_list:
-            uuid = reviewer.get("uuid")
-            if uuid and uuid not in seen_uuids:
-                unique_reviewers.append(reviewer)
-                seen_uuids.add(uuid)
-            elif not uuid and reviewer.get("username"):
-                unique_reviewers.append(reviewer)
-        
-        reviewer_list = unique_reviewers
+    
+    # Resolve everyone in one pass — known users come from the local directory
+    reviewer_list = []
+    if reviewer_names or config_reviewers:
+        reviewer_list = _resolve_reviewers(api, reviewer_names + list(config_reviewers))
+    
+    # Remove duplicates
+    seen_uuids = set()
+    unique_reviewers = []
+    for reviewer in reviewer_list:
+        uuid = reviewer.get("uuid")
+        if uuid and uuid not in seen_uuids:
+            unique_reviewers.append(reviewer)
+            seen_uuids.add(uuid)
+        elif not uuid and reviewer.get("username"):
+            unique_reviewers.append(reviewer)
+    
+    reviewer_list = unique_reviewers
     
     # Create the pull request
     pr_data = api.create_pull_request(
@@ -144,16 +143,22 @@ def _load_template(template_path: str, title: Optional[str], description: Option
 
 def _resolve_reviewers(api: BitbucketAPI, reviewer_names: List[str]) -> List[Dict[str, Any]]:
     """Resolve reviewer usernames to proper API format."""
-    reviewers = []
+    return run_async_command(api, _resolve_reviewers_async, reviewer_names)
+
+
+async def _resolve_reviewers_async(api: AsyncBitbucketAPI, reviewer_names: List[str]) -> List[Dict[str, Any]]:
+    """Resolve reviewer usernames concurrently, keeping the input order."""
+    users = await resolve_users_async(api, reviewer_names)
     
-    for username in reviewer_names:
-        try:
-            user_data = api.get_user(username)
-            reviewers.append({"uuid": user_data["uuid"]})
-            info(f"Added reviewer: {user_data.get('display_name', username)}")
-        except Exception:
+    reviewers = []
+    for username in dict.fromkeys(reviewer_names):
+        user_data = users.get(username)
+        if user_data is None or not user_data.get("uuid"):
             warning(f"Could not find user '{username}', using username fallback")
             reviewers.append({"username": username})
+        else:
+            reviewers.append({"uuid": user_data["uuid"]})
+            info(f"Added reviewer: {user_data.get('display_name') or username}")
     
     return reviewers
 
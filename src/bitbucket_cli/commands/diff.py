@@ -1,10 +1,20 @@
 """
 ABOUTME: View pull request diff and diffstat information
-ABOUTME: Retrieves and displays code changes for PR review
+ABOUTME: Retrieves and displays code changes for PR review, whole or limited to selected files
 """
 
-from typing import Dict, Any, Optional
+import asyncio
+import fnmatch
+import heapq
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence, Union
 from ..api import BitbucketAPI
+from ..async_api import AsyncBitbucketAPI, run_async_command
+from ..exceptions import BitbucketAPIError
+from ..utils.diff import DiffIndex, FileHeader, Hunk, iter_lines, parse_diff
+
+# Characters of ``path=`` query string per path-filtered diff request; keeps URLs
+# well under common proxy limits while covering dozens of files per request
+PATH_QUERY_BUDGET = 4000
 
 
 def diff_pr(
@@ -12,24 +22,253 @@ def diff_pr(
     workspace: str,
     repo: str,
     pr_id: int,
-    file: Optional[str] = None,
-    stat: bool = False
+    file: Optional[Union[str, Sequence[str]]] = None,
+    stat: bool = False,
+    exclude: Optional[Sequence[str]] = None
 ) -> Any:
     """
     View diff for a pull request.
-    
+
     Args:
         api: BitbucketAPI instance
         workspace: Bitbucket workspace name
         repo: Repository name
         pr_id: Pull request ID
-        file: Specific file to show diff for
+        file: Path or glob (or several) of the files to show
         stat: Show diffstat only
-        
+        exclude: Globs of files to leave out
+
     Returns:
         Diff data (text or diffstat)
     """
+    files = [file] if isinstance(file, str) else file
     if stat:
-        return api.get_diffstat(workspace, repo, pr_id)
-    else:
-        return api.get_diff(workspace, repo, pr_id)
\ No newline at end of file
+        diffstat = api.get_diffstat(workspace, repo, pr_id)
+        if files or exclude:
+            values = select_diffstat(diffstat["values"], files, exclude)
+            return {"values": values, "size": len(values)}
+        return diffstat
+    if files or exclude:
+        return "".join(path_diffs(api, workspace, repo, pr_id, files, exclude))
+    return api.get_diff(workspace, repo, pr_id)
+
+
+def iter_diff_pr(
+    api: BitbucketAPI,
+    workspace: str,
+    repo: str,
+    pr_id: int,
+    files: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None
+) -> Iterator[Union[FileHeader, Hunk]]:
+    """
+    Stream a pull request's diff as parsed file headers and hunks.
+
+    The whole diff is downloaded in chunks and parsed as it arrives, so memory use
+    stays constant however large it is. With ``files`` or ``exclude``, only the
+    matching files' diffs are downloaded (see path_diffs).
+
+    Args:
+        api: BitbucketAPI instance
+        workspace: Bitbucket workspace name
+        repo: Repository name
+        pr_id: Pull request ID
+        files: Paths or globs of the files to show
+        exclude: Globs of files to leave out
+
+    Yields:
+        FileHeader for each file, followed by that file's Hunks
+    """
+    if files or exclude:
+        texts = path_diffs(api, workspace, repo, pr_id, files, exclude)
+        # Split exactly as the streamed branch does: str.splitlines would also break
+        # on form feeds and other separators inside diff lines, skewing line numbers
+        return parse_diff(line for text in texts for line in iter_lines([text.encode("utf-8")]))
+    return parse_diff(iter_lines(api.iter_diff(workspace, repo, pr_id)))
+
+
+def diff_index(
+    api: BitbucketAPI,
+    workspace: str,
+    repo: str,
+    pr_id: int,
+    files: Optional[Sequence[str]] = None
+) -> DiffIndex:
+    """
+    Build the line-number index of a pull request's diff (or just of ``files``).
+
+    Answers "is new line N of this path in the diff, and which old line is it?"
+    locally, e.g. to check an inline comment's position before posting it.
+    """
+    return DiffIndex.build(iter_diff_pr(api, workspace, repo, pr_id, files=files))
+
+
+def path_diffs(
+    api: BitbucketAPI,
+    workspace: str,
+    repo: str,
+    pr_id: int,
+    files: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None
+) -> List[str]:
+    """
+    Download the diffs of just the files matching ``files`` and not ``exclude``.
+
+    The diffstat names the changed files; the matching paths are then requested
+    from the path-filtered diff endpoint in batches, concurrently, so reviewing one
+    file of a huge PR costs kilobytes instead of the whole diff.
+
+    Returns:
+        Diff texts, one per batch, in diffstat order
+    """
+    return run_async_command(api, path_diffs_async, workspace, repo, pr_id, files, exclude)
+
+
+async def path_diffs_async(
+    api: AsyncBitbucketAPI,
+    workspace: str,
+    repo: str,
+    pr_id: int,
+    files: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None
+) -> List[str]:
+    """Async variant of path_diffs."""
+    # The diffstat's cache lookup reuses the commit pair of this PR fetch
+    pr = await api.get_pull_request(workspace, repo, pr_id)
+    diffstat = await api.get_diffstat(workspace, repo, pr_id)
+    selected = select_diffstat(diffstat["values"], files, exclude)
+    if not selected:
+        return []
+
+    source = (pr.get("source", {}).get("commit") or {}).get("hash")
+    destination = (pr.get("destination", {}).get("commit") or {}).get("hash")
+    if not source or not destination:
+        raise BitbucketAPIError(f"PR #{pr_id} has no source/destination commits to diff")
+
+    paths: List[str] = []
+    for entry in selected:
+        for side in ("new", "old"):
+            path = (entry.get(side) or {}).get("path")
+            if path and path not in paths:
+                paths.append(path)
+    return list(await asyncio.gather(*(
+        api.get_path_diff(workspace, repo, source, destination, batch) for batch in _path_batches(paths)
+    )))
+
+
+def summarize_diffstat(
+    entries: Iterable[Dict[str, Any]],
+    top: int = 10,
+    depth: int = 1
+) -> Dict[str, Any]:
+    """
+    Roll diffstat entries up into totals, in a single pass.
+
+    Args:
+        entries: Diffstat entries (``values`` of get_diffstat)
+        top: How many of the largest files (by lines added + removed) to list
+        depth: Leading path components that name a directory in the rollup
+
+    Returns:
+        Dict with "totals" (files, lines added/removed), "statuses" (files per
+        status), "binary" (files without line counts: binary files and mode-only
+        changes), "renamed", "directories" (per-directory totals, largest first)
+        and "largest" (the ``top`` largest files)
+    """
+    totals = {"files": 0, "lines_added": 0, "lines_removed": 0}
+    statuses: Dict[str, int] = {}
+    directories: Dict[str, Dict[str, int]] = {}
+    largest: List[Any] = []  # min-heap of (changed, order, entry summary)
+    binary = renamed = 0
+
+    for order, entry in enumerate(entries):
+        path = _diffstat_path(entry)
+        added = entry.get("lines_added") or 0
+        removed = entry.get("lines_removed") or 0
+        status = entry.get("status") or "modified"
+
+        totals["files"] += 1
+        totals["lines_added"] += added
+        totals["lines_removed"] += removed
+        statuses[status] = statuses.get(status, 0) + 1
+        if status == "renamed":
+            renamed += 1
+        elif not added and not removed:
+            binary += 1
+
+        directory = "/".join(path.split("/")[:-1][:depth]) or "."
+        rollup = directories.get(directory)
+        if rollup is None:
+            rollup = directories[directory] = {"files": 0, "lines_added": 0, "lines_removed": 0}
+        rollup["files"] += 1
+        rollup["lines_added"] += added
+        rollup["lines_removed"] += removed
+
+        if top > 0:
+            item = (added + removed, -order, {"path": path, "status": status, "lines_added": added, "lines_removed": removed})
+            if len(largest) < top:
+                heapq.heappush(largest, item)
+            elif item[:2] > largest[0][:2]:
+                heapq.heapreplace(largest, item)
+
+    return {
+        "totals": totals,
+        "statuses": statuses,
+        "binary": binary,
+        "renamed": renamed,
+        "directories": [
+            dict(rollup, path=name)
+            for name, rollup in sorted(
+                directories.items(), key=lambda kv: -(kv[1]["lines_added"] + kv[1]["lines_removed"])
+            )
+        ],
+        "largest": [summary for _, _, summary in sorted(largest, key=lambda item: item[:2], reverse=True)],
+    }
+
+
+def select_diffstat(
+    entries: Iterable[Dict[str, Any]],
+    files: Optional[Sequence[str]] = None,
+    exclude: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Diffstat entries whose old or new path matches ``files`` and neither matches ``exclude``.
+
+    Patterns are fnmatch globs over the whole path (``*`` also crosses ``/``); a
+    pattern ending in ``/`` selects everything under that directory.
+    """
+    selected = []
+    for entry in entries:
+        paths = [p for p in ((entry.get("new") or {}).get("path"), (entry.get("old") or {}).get("path")) if p]
+        if files and not any(_matches(p, pattern) for p in paths for pattern in files):
+            continue
+        if exclude and any(_matches(p, pattern) for p in paths for pattern in exclude):
+            continue
+        selected.append(entry)
+    return selected
+
+
+def _diffstat_path(entry: Dict[str, Any]) -> str:
+    """A diffstat entry's path after the change (before it, for deleted files)."""
+    return (entry.get("new") or {}).get("path") or (entry.get("old") or {}).get("path") or ""
+
+
+def _matches(path: str, pattern: str) -> bool:
+    if pattern.endswith("/"):
+        return path.startswith(pattern)
+    return path == pattern or fnmatch.fnmatchcase(path, pattern)
+
+
+def _path_batches(paths: List[str]) -> Iterator[List[str]]:
+    """Split paths into groups whose ``path=`` query strings fit PATH_QUERY_BUDGET."""
+    batch: List[str] = []
+    size = 0
+    for path in paths:
+        cost = len(path) + len("&path=")
+        if batch and size + cost > PATH_QUERY_BUDGET:
+            yield batch
+            batch, size = [], 0
+        batch.append(path)
+        size += cost
+    if batch:
+        yield batch
@@ -1,10 +1,25 @@
 """
 ABOUTME: List pull requests command with filtering, pagination, and output formatting
-ABOUTME: Supports state filtering, author/reviewer filters, and both JSON and table output
+ABOUTME: Supports state filtering, author/reviewer filters, multi-repo fan-out, JSON and table output
 """
 
-from typing import List, Dict, Any, Optional
+import asyncio
+import heapq
+import itertools
+from typing import Iterator, List, Dict, Any, Optional
 from ..api import BitbucketAPI
+from ..async_api import AsyncBitbucketAPI, run_async_command
+
+# Everything the pull request tables render; pass as ``fields=`` so table views
+# don't download descriptions, rendered HTML and links they never show
+PULL_REQUEST_LIST_FIELDS = ",".join(
+    f"values.{field}"
+    for field in (
+        "id", "title", "state", "created_on", "updated_on",
+        "author.display_name", "author.nickname", "author.username", "author.uuid",
+        "destination.repository.full_name",
+    )
+)
 
 
 def list_prs(
@@ -14,8 +29,9 @@ def list_prs(
     state: str = "OPEN",
     author: Optional[str] = None,
     reviewer: Optional[str] = None,
-    limit: int = 25,
-    fetch_all: bool = False
+    limit: Optional[int] = 25,
+    fetch_all: bool = False,
+    **filters: Any
 ) -> List[Dict[str, Any]]:
     """
     List pull requests with filtering options.
@@ -27,8 +43,10 @@ def list_prs(
         state: PR state filter (OPEN, MERGED, DECLINED, SUPERSEDED)
         author: Filter by author username
         reviewer: Filter by reviewer username
-        limit: Number of results per page
-        fetch_all: Whether to fetch all pages
+        limit: Maximum number of pull requests; only the pages needed are fetched
+        fetch_all: Whether to fetch all pages (up to ``limit`` if set)
+        **filters: Further server-side filters, sort and fields (see
+            BitbucketAPI.list_pull_requests)
         
     Returns:
         List of pull request data
@@ -41,5 +59,135 @@ def list_prs(
         author=author,
         reviewer=reviewer,
         limit=limit,
-        fetch_all=fetch_all
-    )
\ No newline at end of file
+        fetch_all=fetch_all,
+        **filters
+    )
+
+
+def iter_prs(
+    api: BitbucketAPI,
+    workspace: str,
+    repo: str,
+    state: str = "OPEN",
+    author: Optional[str] = None,
+    reviewer: Optional[str] = None,
+    limit: Optional[int] = None,
+    **filters: Any
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream pull requests across all pages as each page arrives.
+    
+    Args:
+        api: BitbucketAPI instance
+        workspace: Bitbucket workspace name
+        repo: Repository name
+        state: PR state filter (OPEN, MERGED, DECLINED, SUPERSEDED)
+        author: Filter by author username
+        reviewer: Filter by reviewer username
+        limit: Maximum number of pull requests (None for all)
+        **filters: Further server-side filters, sort and fields (see
+            BitbucketAPI.list_pull_requests)
+        
+    Yields:
+        Pull request data
+    """
+    return api.iter_pull_requests(
+        workspace=workspace,
+        repo=repo,
+        state=state,
+        author=author,
+        reviewer=reviewer,
+        limit=limit,
+        **filters
+    )
+
+
+def list_prs_multi(
+    api: BitbucketAPI,
+    workspace: str,
+    repos: Optional[List[str]] = None,
+    state: str = "OPEN",
+    author: Optional[str] = None,
+    reviewer: Optional[str] = None,
+    limit: Optional[int] = 25,
+    fetch_all: bool = False,
+    **filters: Any
+) -> Dict[str, Any]:
+    """
+    List pull requests across several repositories, newest activity first.
+    
+    Args:
+        api: BitbucketAPI instance
+        workspace: Bitbucket workspace name
+        repos: Repository names ("repo" or "workspace/repo"); every repository in
+            the workspace when omitted
+        state: PR state filter (OPEN, MERGED, DECLINED, SUPERSEDED)
+        author: Filter by author username
+        reviewer: Filter by reviewer username
+        limit: Maximum number of pull requests to return (None with fetch_all for all)
+        fetch_all: Page through every repository's matches (up to ``limit`` each if set)
+        **filters: Further server-side filters and fields (see
+            BitbucketAPI.list_pull_requests); the sort is always -updated_on
+        
+    Returns:
+        Dict with "repos" (the repositories queried), "pullrequests" (merged by
+        updated_on, descending) and "errors" (one {"repo", "error"} entry per
+        repository that failed)
+    """
+    return run_async_command(
+        api, list_prs_multi_async, workspace, repos,
+        state=state, author=author, reviewer=reviewer, limit=limit, fetch_all=fetch_all,
+        **filters
+    )
+
+
+async def list_prs_multi_async(
+    api: AsyncBitbucketAPI,
+    workspace: str,
+    repos: Optional[List[str]] = None,
+    state: str = "OPEN",
+    author: Optional[str] = None,
+    reviewer: Optional[str] = None,
+    limit: Optional[int] = 25,
+    fetch_all: bool = False,
+    **filters: Any
+) -> Dict[str, Any]:
+    """
+    Async variant of list_prs_multi.
+    
+    Every repository is queried concurrently on the client's bounded pool; a
+    failing repository is reported in "errors" without affecting the others.
+    """
+    if repos is None:
+        repos = [r["full_name"] for r in await api.list_repositories(workspace)]
+    targets = [r if "/" in r else f"{workspace}/{r}" for r in repos]
+
+    async def fetch(target: str) -> List[Dict[str, Any]]:
+        ws, _, name = target.partition("/")
+        # Each repository's list comes back newest first, so the lists can be merged lazily
+        return await api.list_pull_requests(
+            workspace=ws,
+            repo=name,
+            state=state,
+            author=author,
+            reviewer=reviewer,
+            limit=limit,
+            fetch_all=fetch_all,
+            **dict(filters, sort="-updated_on"),
+        )
+
+    results = await asyncio.gather(*(fetch(t) for t in targets), return_exceptions=True)
+
+    pr_lists = []
+    errors = []
+    for target, result in zip(targets, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            errors.append({"repo": target, "error": str(result)})
+        else:
+            pr_lists.append(result)
+
+    merged = heapq.merge(*pr_lists, key=lambda pr: pr.get("updated_on") or "", reverse=True)
+    pullrequests = list(itertools.islice(merged, limit)) if limit else list(merged)
+    return {"repos": targets, "pullrequests": pullrequests, "errors": errors}
@@ -1,9 +1,11 @@
 # ABOUTME: Pipeline status command for checking CI build results by branch or PR
 # ABOUTME: Fetches pipeline state, step-level results, and failure log excerpts
 
+import asyncio
 from typing import Any, Dict, List, Optional
 
 from ..api import BitbucketAPI
+from ..async_api import AsyncBitbucketAPI, run_async_command
 
 
 def get_pipeline_status(
@@ -13,6 +15,7 @@ def get_pipeline_status(
     branch: Optional[str] = None,
     pr_id: Optional[int] = None,
     limit: int = 5,
+    log_lines: int = 50,
 ) -> List[Dict[str, Any]]:
     """
     Retrieve pipeline status for a branch or pull request.
@@ -24,60 +27,115 @@ def get_pipeline_status(
         branch: Filter pipelines by branch name
         pr_id: Pull request ID — source branch is resolved automatically
         limit: Maximum number of pipelines to return
+        log_lines: Number of log lines to keep for each failed step
+
+    Returns:
+        List of pipeline dicts with state, steps, and optional log tails
+    """
+    return run_async_command(
+        api, get_pipeline_status_async, workspace, repo,
+        branch=branch, pr_id=pr_id, limit=limit, log_lines=log_lines,
+    )
+
+
+async def get_pipeline_status_async(
+    api: AsyncBitbucketAPI,
+    workspace: str,
+    repo: str,
+    branch: Optional[str] = None,
+    pr_id: Optional[int] = None,
+    limit: int = 5,
+    log_lines: int = 50,
+) -> List[Dict[str, Any]]:
+    """
+    Async variant of get_pipeline_status.
+
+    Step listings for all pipelines run concurrently on the client's bounded pool,
+    and each failed step's log download starts as soon as the step is seen.
+
+    Args:
+        api: AsyncBitbucketAPI instance
+        workspace: Bitbucket workspace name
+        repo: Repository name
+        branch: Filter pipelines by branch name
+        pr_id: Pull request ID — source branch is resolved automatically
+        limit: Maximum number of pipelines to return
+        log_lines: Number of log lines to keep for each failed step
 
     Returns:
         List of pipeline dicts with state, steps, and optional log tails
     """
     # If a PR ID is supplied, resolve its source branch and use that as the filter
     if pr_id is not None:
-        pr = api.get_pull_request(workspace, repo, pr_id)
+        pr = await api.get_pull_request(workspace, repo, pr_id)
         branch = pr["source"]["branch"]["name"]
 
-    response = api.list_pipelines(workspace, repo, branch=branch, limit=limit)
+    response = await api.list_pipelines(workspace, repo, branch=branch, limit=limit)
     raw_pipelines = response.get("values", [])
 
-    pipelines = []
-    for pipeline in raw_pipelines:
-        pipeline_uuid = pipeline["uuid"]
-
-        raw_steps = api.get_pipeline_steps(workspace, repo, pipeline_uuid)
-
-        steps = []
-        for step in raw_steps:
-            step_state = step.get("state", {})
-            step_result_name = step_state.get("result", {}).get("name")
-
-            step_entry: Dict[str, Any] = {
-                "name": step.get("name"),
-                "state": step_state.get("name"),
-                "result": step_result_name,
-                "duration_in_seconds": step.get("duration_in_seconds"),
-            }
-
-            if step_result_name == "FAILED":
-                step_uuid = step["uuid"]
-                log_text = api.get_step_log(workspace, repo, pipeline_uuid, step_uuid)
-                log_lines = log_text.splitlines()
-                step_entry["log_tail"] = "\n".join(log_lines[-50:])
-
-            steps.append(step_entry)
-
-        pipeline_state = pipeline.get("state", {})
-        pipelines.append(
-            {
-                "uuid": pipeline["uuid"],
-                "build_number": pipeline["build_number"],
-                "state": pipeline_state.get("name"),
-                "result": pipeline_state.get("result", {}).get("name"),
-                # Branch name is in ref_name for branch pushes, source for PR-triggered pipelines
-                "branch": (
-                    pipeline.get("target", {}).get("ref_name")
-                    or pipeline.get("target", {}).get("source")
-                ),
-                "created_on": pipeline.get("created_on"),
-                "duration_in_seconds": pipeline.get("duration_in_seconds"),
-                "steps": steps,
-            }
+    # gather() returns results in argument order, so output order is unchanged
+    return list(
+        await asyncio.gather(
+            *(
+                _collect_pipeline(api, workspace, repo, pipeline, log_lines)
+                for pipeline in raw_pipelines
+            )
         )
+    )
+
+
+async def _collect_pipeline(
+    api: AsyncBitbucketAPI,
+    workspace: str,
+    repo: str,
+    pipeline: Dict[str, Any],
+    log_lines: int,
+) -> Dict[str, Any]:
+    """Fetch steps (and failure log tails) for one pipeline."""
+    pipeline_uuid = pipeline["uuid"]
+
+    steps = []
+    log_tasks: List["asyncio.Task[str]"] = []
+    failed_entries: List[Dict[str, Any]] = []
+    async for step in api.iter_pipeline_steps(workspace, repo, pipeline_uuid):
+        step_state = step.get("state", {})
+        step_result_name = step_state.get("result", {}).get("name")
+
+        step_entry: Dict[str, Any] = {
+            "name": step.get("name"),
+            "state": step_state.get("name"),
+            "result": step_result_name,
+            "duration_in_seconds": step.get("duration_in_seconds"),
+        }
+
+        if step_result_name == "FAILED":
+            # Start the log download now rather than after the step listing finishes
+            log_tasks.append(
+                asyncio.create_task(
+                    api.get_step_log_tail(
+                        workspace, repo, pipeline_uuid, step["uuid"], lines=log_lines
+                    )
+                )
+            )
+            failed_entries.append(step_entry)
+
+        steps.append(step_entry)
+
+    for step_entry, log_tail in zip(failed_entries, await asyncio.gather(*log_tasks)):
+        step_entry["log_tail"] = log_tail
 
-    return pipelines
+    pipeline_state = pipeline.get("state", {})
+    return {
+        "uuid": pipeline["uuid"],
+        "build_number": pipeline["build_number"],
+        "state": pipeline_state.get("name"),
+        "result": pipeline_state.get("result", {}).get("name"),
+        # Branch name is in ref_name for branch pushes, source for PR-triggered pipelines
+        "branch": (
+            pipeline.get("target", {}).get("ref_name")
+            or pipeline.get("target", {}).get("source")
+        ),
+        "created_on": pipeline.get("created_on"),
+        "duration_in_seconds": pipeline.get("duration_in_seconds"),
+        "steps": steps,
+    }
@@ -0,0 +1,163 @@
+"""
+ABOUTME: Pull request search across a workspace backed by the local SQLite index
+ABOUTME: Refreshes the index incrementally from user-scoped or per-repository listings, then queries it
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from ..api import BitbucketAPI
+from ..async_api import AsyncBitbucketAPI, run_async_command
+from ..store import PullRequestIndex
+from ..users import resolve_users_async
+from .sync import listing_params, newest, sync_repo_pull_requests
+
+
+def search_prs(
+    api: BitbucketAPI,
+    workspace: str,
+    author: Optional[str] = None,
+    reviewer: Optional[str] = None,
+    branch: Optional[str] = None,
+    state: Optional[str] = "OPEN",
+    repos: Optional[List[str]] = None,
+    refresh: bool = True,
+    limit: Optional[int] = None,
+    index: Optional[PullRequestIndex] = None
+) -> Dict[str, Any]:
+    """
+    Search pull requests in a workspace by author, reviewer, source branch and state.
+
+    Args:
+        api: BitbucketAPI instance
+        workspace: Bitbucket workspace name
+        author: Author nickname, username or "@me"
+        reviewer: Reviewer nickname, username or "@me"
+        branch: Source branch name
+        state: PR state (OPEN, MERGED, DECLINED, SUPERSEDED), or None for any
+        repos: Repositories to search ("repo" or "workspace/repo"); defaults to
+            defaults.repos from config, else every repository in the workspace
+        refresh: Bring the index up to date before querying
+        limit: Maximum number of results
+        index: PullRequestIndex to use (defaults to one built from the config)
+
+    Returns:
+        Dict with "pullrequests" (most recently updated first) and "errors"
+        (one {"scope", "error"} entry per listing that failed to refresh)
+    """
+    return run_async_command(
+        api, search_prs_async, workspace,
+        author=author, reviewer=reviewer, branch=branch, state=state,
+        repos=repos, refresh=refresh, limit=limit, index=index,
+    )
+
+
+async def search_prs_async(
+    api: AsyncBitbucketAPI,
+    workspace: str,
+    author: Optional[str] = None,
+    reviewer: Optional[str] = None,
+    branch: Optional[str] = None,
+    state: Optional[str] = "OPEN",
+    repos: Optional[List[str]] = None,
+    refresh: bool = True,
+    limit: Optional[int] = None,
+    index: Optional[PullRequestIndex] = None
+) -> Dict[str, Any]:
+    """
+    Async variant of search_prs.
+
+    An author search refreshes from the workspace's user-scoped listing (one
+    paginated stream regardless of repository count); other searches refresh
+    every repository concurrently. Either way only PRs with ``updated_on`` at or
+    after the scope's high-water mark are fetched once a scope has synced.
+    """
+    if index is None:
+        index = PullRequestIndex.from_config(api.config)
+    state = state.upper() if state else None
+
+    author_user = await _resolve_user(api, author)
+    reviewer_user = await _resolve_user(api, reviewer)
+
+    targets = None
+    if repos:
+        targets = [r if "/" in r else f"{workspace}/{r}" for r in repos]
+
+    errors: List[Dict[str, str]] = []
+    if refresh:
+        if author_user and (author_user.get("uuid") or author_user.get("account_id")) and not targets:
+            errors.extend(await _sync_user(api, index, workspace, author_user, state))
+        else:
+            if targets is None:
+                configured = api.config.get("defaults", {}).get("repos") or None
+                if configured:
+                    targets = [r if "/" in r else f"{workspace}/{r}" for r in configured]
+            errors.extend(await _sync_repos(api, index, workspace, targets, state))
+
+    pullrequests = index.search(
+        workspace=workspace,
+        repos=targets,
+        author=author_user,
+        reviewer=reviewer_user,
+        branch=branch,
+        state=state,
+        limit=limit,
+    )
+    return {"pullrequests": pullrequests, "errors": errors}
+
+
+async def _resolve_user(api: AsyncBitbucketAPI, name: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Turn a name (or "@me") into a user entry; unknown names still match by name."""
+    if not name:
+        return None
+    if name == "@me":
+        return await api.get_current_user()
+    users = await resolve_users_async(api, [name])
+    return users.get(name) or {"nickname": name}
+
+
+async def _sync_user(
+    api: AsyncBitbucketAPI,
+    index: PullRequestIndex,
+    workspace: str,
+    user: Dict[str, Any],
+    state: Optional[str]
+) -> List[Dict[str, str]]:
+    """Refresh the index from the user's workspace-wide pull request listing."""
+    user_id = user.get("uuid") or user.get("account_id")
+    scope = f"user:{workspace}:{user_id}:{state or 'ALL'}"
+    try:
+        prs = [pr async for pr in api.iter_workspace_pull_requests(
+            workspace, user_id, **listing_params(index, scope, state)
+        )]
+    except Exception as e:
+        return [{"scope": f"{workspace} (author {user.get('nickname') or user_id})", "error": str(e)}]
+    index.upsert_pull_requests(prs)
+    index.mark_synced(scope, newest(prs, index.high_water(scope)))
+    return []
+
+
+async def _sync_repos(
+    api: AsyncBitbucketAPI,
+    index: PullRequestIndex,
+    workspace: str,
+    targets: Optional[List[str]],
+    state: Optional[str]
+) -> List[Dict[str, str]]:
+    """Refresh the index from each repository's pull request listing, concurrently."""
+    if targets is None:
+        try:
+            targets = [r["full_name"] for r in await api.list_repositories(workspace)]
+        except Exception as e:
+            return [{"scope": workspace, "error": str(e)}]
+
+    results = await asyncio.gather(
+        *(sync_repo_pull_requests(api, index, t, state) for t in targets), return_exceptions=True
+    )
+    errors = []
+    for target, result in zip(targets, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            errors.append({"scope": target, "error": str(result)})
+    return errors
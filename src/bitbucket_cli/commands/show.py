@@ -3,7 +3,7 @@ ABOUTME: Show pull request details command with optional comment inclusion
 ABOUTME: Displays comprehensive PR information and can open in web browser
 """
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional
 import webbrowser
 from ..api import BitbucketAPI
 
@@ -39,4 +39,20 @@ def show_pr(
     if web and pr_data.get("links", {}).get("html", {}).get("href"):
         webbrowser.open(pr_data["links"]["html"]["href"])
     
-    return pr_data
\ No newline at end of file
+    return pr_data
+
+
+def iter_pr_comments(api: BitbucketAPI, workspace: str, repo: str, pr_id: int) -> Iterator[Dict[str, Any]]:
+    """
+    Stream comments for a pull request as each page arrives.
+    
+    Args:
+        api: BitbucketAPI instance
+        workspace: Bitbucket workspace name
+        repo: Repository name
+        pr_id: Pull request ID
+        
+    Yields:
+        Comment data
+    """
+    return api.iter_comments(workspace, repo, pr_id)
@@ -0,0 +1,293 @@
+"""
+ABOUTME: Incremental sync of pull requests, comments, activity and pipelines into the local mirror
+ABOUTME: Fetches only entities updated after each scope's high-water mark; serves --offline reads
+"""
+
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..api import BitbucketAPI
+from ..async_api import AsyncBitbucketAPI, run_async_command
+from ..exceptions import NotFoundError
+from ..store import PullRequestIndex
+
+ALL_STATES = ["OPEN", "MERGED", "DECLINED", "SUPERSEDED"]
+
+# Reviewers are left out of list responses unless asked for
+INDEX_FIELDS = "+values.reviewers"
+
+# Recent pipelines re-listed on each sync so running ones pick up their final state
+PIPELINE_WINDOW = 50
+
+
+def sync_repos(
+    api: BitbucketAPI,
+    workspace: str,
+    repos: Optional[List[str]] = None,
+    state: Optional[str] = None,
+    index: Optional[PullRequestIndex] = None
+) -> Dict[str, Any]:
+    """
+    Bring the local mirror of one or more repositories up to date.
+
+    Args:
+        api: BitbucketAPI instance
+        workspace: Bitbucket workspace name
+        repos: Repositories ("repo" or "workspace/repo"); every repository in the
+            workspace when omitted
+        state: Only mirror PRs in this state on the first sync (None for all)
+        index: PullRequestIndex to write to (defaults to one built from the config,
+            which is only kept on disk while caching is enabled)
+
+    Returns:
+        Dict with "repos" (per-repository counts of pull requests, comments,
+        activity entries and pipelines written) and "errors"
+    """
+    return run_async_command(api, sync_repos_async, workspace, repos, state=state, index=index)
+
+
+async def sync_repos_async(
+    api: AsyncBitbucketAPI,
+    workspace: str,
+    repos: Optional[List[str]] = None,
+    state: Optional[str] = None,
+    index: Optional[PullRequestIndex] = None
+) -> Dict[str, Any]:
+    """Async variant of sync_repos; repositories sync concurrently."""
+    if index is None:
+        index = PullRequestIndex.from_config(api.config)
+    if repos is None:
+        repos = [r["full_name"] for r in await api.list_repositories(workspace)]
+    targets = [r if "/" in r else f"{workspace}/{r}" for r in repos]
+
+    results = await asyncio.gather(*(_sync_repo(api, index, t, state) for t in targets), return_exceptions=True)
+    synced = []
+    errors = []
+    for target, result in zip(targets, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            errors.append({"repo": target, "error": str(result)})
+        else:
+            synced.append(dict(result, repo=target))
+    return {"repos": synced, "errors": errors}
+
+
+def mirror_scope(target: str, state: Optional[str] = None) -> str:
+    """Sync scope recording when a repository's mirror of ``state`` PRs (None: all) was last refreshed."""
+    return f"mirror:{target}:{state or 'ALL'}"
+
+
+def _last_sync(index: PullRequestIndex, target: str, state: Optional[str]) -> Tuple[Optional[float], Optional[str]]:
+    """
+    When the mirror last synced the pull requests a read of ``state`` needs.
+
+    A sync of every state covers any read; a single-state sync covers reads of
+    that state, and reads that take whatever the mirror has (``state`` None).
+
+    Returns:
+        (synced_at, the state that sync mirrored or None for all), or (None, None)
+    """
+    if state is None:
+        candidates: List[Optional[str]] = [None, *ALL_STATES]
+    elif state.upper() == "ALL":
+        candidates = [None]
+    else:
+        candidates = [None, state.upper()]
+    synced = [(index.synced_at(mirror_scope(target, c)), c) for c in candidates]
+    return max(((at, c) for at, c in synced if at is not None), key=lambda pair: pair[0], default=(None, None))
+
+
+def mirror_pull_request_scope(target: str, state: Optional[str]) -> str:
+    """
+    Sync scope of the pull requests whose comments and activity the mirror holds.
+
+    Kept apart from the ``repo:`` scopes ``bb pr search`` refreshes: a search only
+    indexes the pull requests, so sharing its high-water mark would make the next
+    sync skip the details of everything the search had already seen.
+    """
+    return f"mirror-prs:{target}:{state or 'ALL'}"
+
+
+def open_mirror(
+    api: BitbucketAPI,
+    workspace: str,
+    repo: str,
+    offline: bool = False,
+    max_staleness: Optional[float] = None,
+    index: Optional[PullRequestIndex] = None,
+    state: Optional[str] = None
+) -> PullRequestIndex:
+    """
+    Return the mirror for a repository, syncing it first if it is too old.
+
+    Freshness is judged by the last sync that covered ``state``, so after
+    ``bb sync --state OPEN`` reads of open PRs use that sync's age.
+
+    Args:
+        api: BitbucketAPI instance
+        workspace: Bitbucket workspace name
+        repo: Repository name
+        offline: Never contact Bitbucket; fail if the repository was never synced
+        max_staleness: Seconds since the last sync after which the mirror is refreshed
+            (refreshed every time when None)
+        index: PullRequestIndex to use (defaults to one built from the config)
+        state: PR state the read lists ("ALL" for every state); None when any
+            synced state will do, e.g. to view one PR
+
+    Raises:
+        NotFoundError: The repository has never been synced and can't be now
+    """
+    if index is None:
+        index = PullRequestIndex.from_config(api.config)
+    target = f"{workspace}/{repo}"
+    synced_at, synced_state = _last_sync(index, target, state)
+    if offline:
+        if index.path is None:
+            raise NotFoundError("The local mirror is only kept while caching is enabled (see --no-cache)")
+        if synced_at is None:
+            if state is None or state.upper() == "ALL":
+                raise NotFoundError(f"{target} has not been synced yet; run `bb sync` first")
+            raise NotFoundError(f"{target} has no {state.upper()} pull requests synced; run `bb sync` first")
+        return index
+    if synced_at is None or max_staleness is None or time.time() - synced_at > max_staleness:
+        if synced_at is None and state is not None and state.upper() != "ALL":
+            synced_state = state.upper()
+        # Refresh the scope the read is judged by
+        result = sync_repos(api, workspace, [target], state=synced_state, index=index)
+        # A failed refresh still leaves an older mirror usable
+        if result["errors"] and synced_at is None:
+            raise NotFoundError(f"Could not sync {target}: {result['errors'][0]['error']}")
+    return index
+
+
+def listing_params(index: PullRequestIndex, scope: str, state: Optional[str]) -> Dict[str, Any]:
+    """
+    Parameters for refreshing a scope's pull request listing.
+
+    The first sync lists the requested state; later syncs list every state since
+    the high-water mark so PRs that were merged or declined leave the state they
+    were indexed under.
+    """
+    high_water = index.high_water(scope)
+    params: Dict[str, Any] = {"sort": "-updated_on", "fields": INDEX_FIELDS, "pagelen": 50}
+    if high_water:
+        params.update(state=ALL_STATES, updated_since=high_water)
+    else:
+        params["state"] = [state] if state else ALL_STATES
+    return params
+
+
+def newest(items: List[Dict[str, Any]], current: Optional[str], field: str = "updated_on") -> Optional[str]:
+    """The later of ``current`` and the newest ``field`` among ``items``."""
+    return max([i[field] for i in items if i.get(field)] + ([current] if current else []), default=None)
+
+
+async def sync_repo_pull_requests(
+    api: AsyncBitbucketAPI,
+    index: PullRequestIndex,
+    target: str,
+    state: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Refresh a repository's pull requests in the index.
+
+    Returns:
+        The pull requests that changed since the previous sync
+    """
+    scope = f"repo:{target}:{state or 'ALL'}"
+    prs = await fetch_repo_pull_requests(api, index, target, scope, state)
+    index.mark_synced(scope, newest(prs, index.high_water(scope)))
+    return prs
+
+
+async def fetch_repo_pull_requests(
+    api: AsyncBitbucketAPI,
+    index: PullRequestIndex,
+    target: str,
+    scope: str,
+    state: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Write a repository's pull requests changed since ``scope``'s high-water mark to the index.
+
+    The mark itself is left alone, so a caller with more to fetch for these pull
+    requests advances it only once that has succeeded too.
+    """
+    workspace, _, repo = target.partition("/")
+    prs = await api.list_pull_requests(
+        workspace=workspace, repo=repo, fetch_all=True, **listing_params(index, scope, state)
+    )
+    index.upsert_pull_requests(prs)
+    return prs
+
+
+async def _sync_repo(
+    api: AsyncBitbucketAPI,
+    index: PullRequestIndex,
+    target: str,
+    state: Optional[str]
+) -> Dict[str, int]:
+    """Sync one repository: changed PRs, then their comments and activity, then pipelines."""
+    workspace, _, repo = target.partition("/")
+    scope = mirror_pull_request_scope(target, state)
+    prs = await fetch_repo_pull_requests(api, index, target, scope, state)
+
+    counts = await asyncio.gather(*(_sync_pr_details(api, index, workspace, repo, pr["id"]) for pr in prs))
+    # Only now are these PRs fully mirrored; had a detail sync failed, the next
+    # sync would list them again
+    index.mark_synced(scope, newest(prs, index.high_water(scope)))
+    try:
+        response = await api.list_pipelines(workspace, repo, limit=PIPELINE_WINDOW)
+        pipelines = index.upsert_pipelines(workspace, repo, response.get("values", []))
+    except NotFoundError:
+        pipelines = 0  # Pipelines not enabled for this repository
+
+    index.mark_synced(mirror_scope(target, state), None)
+    return {
+        "pullrequests": len(prs),
+        "comments": sum(c for c, _ in counts),
+        "activity": sum(a for _, a in counts),
+        "pipelines": pipelines,
+    }
+
+
+async def _sync_pr_details(
+    api: AsyncBitbucketAPI,
+    index: PullRequestIndex,
+    workspace: str,
+    repo: str,
+    pr_id: int
+) -> Tuple[int, int]:
+    """Fetch comments and activity newer than what the mirror holds for one PR."""
+    scope = f"comments:{workspace}/{repo}/{pr_id}"
+    high_water = index.high_water(scope)
+    comments = [c async for c in api.iter_comments(workspace, repo, pr_id, updated_since=high_water)]
+    index.upsert_comments(workspace, repo, pr_id, comments)
+    index.mark_synced(scope, newest(comments, high_water))
+
+    # Activity has no server-side filter, but it is returned newest first: stop at
+    # the first entry the mirror already has
+    latest = index.latest_activity(workspace, repo, pr_id)
+    entries = []
+    async for entry in api.iter_activity(workspace, repo, pr_id):
+        when = _activity_time(entry)
+        if latest is not None and when is not None and when <= latest:
+            break
+        entries.append((when, entry))
+    index.add_activity(workspace, repo, pr_id, entries)
+    return len(comments), len(entries)
+
+
+def _activity_time(entry: Dict[str, Any]) -> Optional[str]:
+    """When an activity entry (update, approval or comment) happened."""
+    if "update" in entry:
+        return entry["update"].get("date")
+    if "approval" in entry:
+        return entry["approval"].get("date")
+    if "changes_requested" in entry:
+        return entry["changes_requested"].get("date")
+    if "comment" in entry:
+        return entry["comment"].get("updated_on") or entry["comment"].get("created_on")
+    return None
@@ -5,6 +5,7 @@ ABOUTME: Allows modification of existing PR details through Bitbucket API
 
 from typing import Dict, Any, Optional
 from ..api import BitbucketAPI
+from ..users import resolve_users
 
 
 def update_pr(
@@ -41,15 +42,24 @@ def update_pr(
     # Handle reviewer changes
     reviewers = pr_data.get("reviewers", [])
     
+    # Resolve both names in one pass — known users come from the local directory
+    names = [name for name in (add_reviewer, remove_reviewer) if name]
+    users = resolve_users(api, names) if names else {}
+    
     if add_reviewer:
-        try:
-            user_data = api.get_user(add_reviewer)
+        user_data = users.get(add_reviewer)
+        if user_data and user_data.get("uuid"):
             reviewers.append({"uuid": user_data["uuid"]})
-        except:
+        else:
             reviewers.append({"username": add_reviewer})
     
     if remove_reviewer:
-        reviewers = [r for r in reviewers if r.get("username") != remove_reviewer]
+        removed_uuid = (users.get(remove_reviewer) or {}).get("uuid")
+        reviewers = [
+            r for r in reviewers
+            if remove_reviewer not in (r.get("username"), r.get("nickname"))
+            and not (removed_uuid and r.get("uuid") == removed_uuid)
+        ]
     
     return api.update_pull_request(
         workspace, repo, pr_id,
@@ -0,0 +1,574 @@
+"""
+ABOUTME: Optional background daemon that runs `bb` commands with a warm API client and connection pool
+ABOUTME: Listens on a per-user Unix socket; the `bb` entry point forwards commands to it when it's running
+"""
+
+import json
+import os
+import socket
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Same directory as auth.CONFIG_DIR, spelled out to keep the forwarding client's imports minimal
+DAEMON_DIR = Path.home() / ".bitbucket-cli"
+SOCKET_PATH = DAEMON_DIR / "daemon.sock"
+PID_FILE = DAEMON_DIR / "daemon.pid"
+
+# Exit after this long without a request
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+# Command groups that always run in the calling process: they manage the daemon
+# itself, prompt for secrets, or read the caller's stdin. Reading stdin in the
+# daemon falls back to a local re-run, which would repeat whatever the command
+# had already done, so stdin readers must never be forwarded.
+LOCAL_GROUPS = frozenset({"auth", "daemon", "batch"})
+
+# Commands that prompt unless given these options (each tuple lists the aliases
+# of one option). They may print before prompting, after which the daemon can
+# no longer hand them back, so without the options they run locally too.
+PROMPTING_COMMANDS: Dict[Tuple[str, str], Tuple[Tuple[str, ...], ...]] = {
+    ("pr", "create"): (("-t", "--title"), ("-b", "--body", "-d", "--description")),
+    ("pr", "comment"): (("-b", "--body", "-m", "--message"),),
+}
+
+# Global options that take a value, so the group name can be found in argv
+_VALUE_OPTIONS = frozenset({"-w", "--workspace", "-R", "--repo", "--trace-file"})
+
+# Environment forwarded from the client for the duration of one command
+_FORWARDED_ENV = ("NO_COLOR", "FORCE_COLOR", "TERM", "COLUMNS", "LINES", "GIT_DIR", "GIT_WORK_TREE")
+_FORWARDED_ENV_PREFIXES = ("BITBUCKET_",)
+
+# Frame kinds on the wire: 1 byte kind, 4 byte big-endian length, payload
+_STDOUT = b"o"
+_STDERR = b"e"
+_EXIT = b"x"
+_FALLBACK = b"f"
+_HEADER = struct.Struct("!cI")
+
+
+def _send_frame(sock: socket.socket, kind: bytes, payload: bytes = b"") -> None:
+    sock.sendall(_HEADER.pack(kind, len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def _recv_frame(sock: socket.socket) -> Tuple[Optional[bytes], bytes]:
+    header = _recv_exact(sock, _HEADER.size)
+    if header is None:
+        return None, b""
+    kind, size = _HEADER.unpack(header)
+    payload = _recv_exact(sock, size) if size else b""
+    return kind, payload or b""
+
+
+# ─── Client ───────────────────────────────────────────────────────────
+
+
+def _group_index(argv: List[str]) -> Optional[int]:
+    """Index of the first positional argument (the command group), skipping global options."""
+    skip_value = False
+    for index, arg in enumerate(argv):
+        if skip_value:
+            skip_value = False
+        elif arg in _VALUE_OPTIONS:
+            skip_value = True
+        elif not arg.startswith("-"):
+            return index
+    return None
+
+
+def _option_given(args: List[str], names: Tuple[str, ...]) -> bool:
+    """Whether any alias in ``names`` is passed a non-empty value (``-t X``, ``-tX``, ``--title=X``)."""
+    for index, arg in enumerate(args):
+        for name in names:
+            if arg == name:
+                if index + 1 < len(args) and args[index + 1]:
+                    return True
+            elif name.startswith("--"):
+                if arg.startswith(name + "=") and len(arg) > len(name) + 1:
+                    return True
+            elif arg.startswith(name) and not arg.startswith("--") and len(arg) > len(name):
+                return True
+    return False
+
+
+def runs_locally(argv: List[str]) -> bool:
+    """Whether a command must run in the calling process rather than the daemon."""
+    index = _group_index(argv)
+    if index is None:
+        return False
+    group = argv[index]
+    if group in LOCAL_GROUPS:
+        return True
+    rest = argv[index + 1:]
+    if not rest or rest[0].startswith("-"):
+        return False
+    required = PROMPTING_COMMANDS.get((group, rest[0]))
+    return required is not None and not all(_option_given(rest[1:], names) for names in required)
+
+
+def _connect(timeout: Optional[float] = None) -> Optional[socket.socket]:
+    """Connect to the daemon socket, or return None if no daemon is listening."""
+    if not SOCKET_PATH.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(SOCKET_PATH))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def _client_env() -> Dict[str, str]:
+    env = {
+        key: value for key, value in os.environ.items()
+        if key in _FORWARDED_ENV or key.startswith(_FORWARDED_ENV_PREFIXES)
+    }
+    if sys.stdout.isatty() and "COLUMNS" not in env:
+        try:
+            size = os.get_terminal_size(sys.stdout.fileno())
+            env["COLUMNS"], env["LINES"] = str(size.columns), str(size.lines)
+        except OSError:
+            pass
+    return env
+
+
+def forward_to_daemon(argv: List[str]) -> Optional[int]:
+    """
+    Run a command in the daemon if one is running.
+
+    Returns:
+        The command's exit code, or None when the caller should run it locally
+        (no daemon, BB_NO_DAEMON set, a local-only command, or the command needs a terminal)
+    """
+    if os.environ.get("BB_NO_DAEMON") or runs_locally(argv):
+        return None
+
+    sock = _connect()
+    if sock is None:
+        return None
+
+    request = {
+        "argv": argv,
+        "cwd": os.getcwd(),
+        "env": _client_env(),
+        "isatty": {
+            "stdin": sys.stdin is not None and sys.stdin.isatty(),
+            "stdout": sys.stdout.isatty(),
+            "stderr": sys.stderr.isatty(),
+        },
+    }
+    with sock:
+        try:
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        except OSError:
+            return None
+
+        while True:
+            try:
+                kind, payload = _recv_frame(sock)
+            except OSError:
+                kind = None
+            if kind is None:
+                sys.stderr.write("bb: lost connection to daemon\n")
+                return 1
+            if kind == _STDOUT:
+                sys.stdout.buffer.write(payload)
+                sys.stdout.buffer.flush()
+            elif kind == _STDERR:
+                sys.stderr.buffer.write(payload)
+                sys.stderr.buffer.flush()
+            elif kind == _EXIT:
+                return int(json.loads(payload)["code"])
+            elif kind == _FALLBACK:
+                return None
+
+
+def control(action: str, timeout: float = 5.0) -> Optional[Dict[str, Any]]:
+    """Send a control request ("status" or "stop"); None when no daemon is running."""
+    sock = _connect(timeout)
+    if sock is None:
+        return None
+    with sock:
+        sock.sendall(json.dumps({"control": action}).encode("utf-8") + b"\n")
+        kind, payload = _recv_frame(sock)
+    if kind != _EXIT:
+        return None
+    return json.loads(payload)
+
+
+def start_background(idle_timeout: int = DEFAULT_IDLE_TIMEOUT, wait: float = 5.0) -> Optional[int]:
+    """
+    Spawn a detached daemon and wait until it accepts connections.
+
+    Returns:
+        The daemon's PID, or None if it didn't come up in time
+    """
+    import subprocess
+
+    subprocess.Popen(
+        [sys.executable, "-m", "bitbucket_cli.daemon", "--idle-timeout", str(idle_timeout)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+    deadline = time.monotonic() + wait
+    while time.monotonic() < deadline:
+        status = control("status", timeout=1.0)
+        if status is not None:
+            return status["pid"]
+        time.sleep(0.05)
+    return None
+
+
+# ─── Server ───────────────────────────────────────────────────────────
+
+
+class NeedsTerminal(BaseException):
+    """
+    Raised inside the daemon when a command tries to read stdin.
+
+    Derives from BaseException so command-level ``except Exception`` handlers
+    don't swallow it; the client then reruns the command locally.
+    """
+
+
+class _FrameWriter:
+    """
+    Text stream that forwards writes to the client as frames.
+
+    Complete lines are sent immediately; a trailing partial line (such as a prompt)
+    is held until its newline or the end of the command, so a command that stops
+    to prompt can still be handed back to the client untouched.
+    """
+
+    encoding = "utf-8"
+    errors = "replace"
+
+    def __init__(self, sock: socket.socket, kind: bytes, tty: bool):
+        self._sock = sock
+        self._kind = kind
+        self._tty = tty
+        self._pending = ""
+        self.sent = False
+        self.buffer = _BinaryFrameWriter(self)
+
+    def write(self, text: str) -> int:
+        self._pending += text
+        if "\n" in self._pending:
+            complete, _, self._pending = self._pending.rpartition("\n")
+            self._send(complete + "\n")
+        return len(text)
+
+    def writelines(self, lines: List[str]) -> None:
+        for line in lines:
+            self.write(line)
+
+    def _send(self, text: str) -> None:
+        _send_frame(self._sock, self._kind, text.encode(self.encoding, self.errors))
+        self.sent = True
+
+    def finish(self) -> None:
+        """Send any held partial line."""
+        if self._pending:
+            pending, self._pending = self._pending, ""
+            self._send(pending)
+
+    def discard(self) -> None:
+        self._pending = ""
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return self._tty
+
+    def writable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return False
+
+    def fileno(self) -> int:
+        raise OSError("daemon output stream has no file descriptor")
+
+
+class _BinaryFrameWriter:
+    """``.buffer`` of a _FrameWriter, for callers that write bytes."""
+
+    def __init__(self, text_writer: _FrameWriter):
+        self._text = text_writer
+
+    def write(self, data: bytes) -> int:
+        self._text.write(data.decode(self._text.encoding, self._text.errors))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return self._text.isatty()
+
+
+class _NoStdin:
+    """stdin replacement that sends interactive commands back to the client."""
+
+    encoding = "utf-8"
+
+    def __init__(self, tty: bool):
+        self._tty = tty
+
+    def read(self, *args: Any) -> str:
+        raise NeedsTerminal()
+
+    readline = read
+    readlines = read
+
+    def __iter__(self):
+        raise NeedsTerminal()
+
+    def isatty(self) -> bool:
+        return self._tty
+
+    def fileno(self) -> int:
+        raise OSError("daemon stdin has no file descriptor")
+
+
+class ClientPool:
+    """
+    Warm BitbucketAPI clients keyed by configuration and credentials.
+
+    Clients keep their sessions (keep-alive connections), schedulers and caches
+    between commands; a changed config or token gets its own client.
+    """
+
+    def __init__(self, max_clients: int = 4):
+        self.max_clients = max_clients
+        self._clients: Dict[str, Any] = {}
+
+    def get(self, config: Dict[str, Any]) -> Any:
+        """Return the warm client for this config, creating it on first use."""
+        import hashlib
+        from .api import BitbucketAPI
+
+        credentials = sorted((k, v) for k, v in os.environ.items() if k.startswith(_FORWARDED_ENV_PREFIXES))
+        key = hashlib.sha256(json.dumps([config, credentials], sort_keys=True, default=str).encode()).hexdigest()
+
+        api = self._clients.pop(key, None)
+        if api is None:
+            api = BitbucketAPI(config)
+            if len(self._clients) >= self.max_clients:
+                # Drop the least recently used client
+                oldest = next(iter(self._clients))
+                self._clients.pop(oldest).session.close()
+        self._clients[key] = api
+        return api
+
+    def release(self) -> None:
+        """Detach per-command state (trace hooks, remembered PR commits) from every client."""
+        for api in self._clients.values():
+            api.hooks.clear()
+            api.commit_pairs.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+class Daemon:
+    """Serves one command at a time on the Unix socket until stopped or idle."""
+
+    def __init__(self, idle_timeout: int = DEFAULT_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.pool = ClientPool()
+        self.started = time.time()
+        self.served = 0
+        self.running = False
+        self._in_command = False
+
+    def serve(self) -> None:
+        """Bind the socket and handle requests until stopped or idle for idle_timeout."""
+        DAEMON_DIR.mkdir(parents=True, exist_ok=True, mode=0o700)
+        if SOCKET_PATH.exists():
+            if control("status", timeout=1.0) is not None:
+                raise RuntimeError(f"daemon already running on {SOCKET_PATH}")
+            SOCKET_PATH.unlink()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)  # Socket is readable and writable by this user only
+        try:
+            server.bind(str(SOCKET_PATH))
+        finally:
+            os.umask(old_umask)
+        server.listen(16)
+        server.settimeout(self.idle_timeout)
+        PID_FILE.write_text(str(os.getpid()))
+
+        # Warm the imports every command needs
+        from . import cli  # noqa: F401
+        from .api import BitbucketAPI  # noqa: F401
+
+        self.running = True
+        try:
+            while self.running:
+                try:
+                    conn, _ = server.accept()
+                except socket.timeout:
+                    break
+                # Connections are handled one at a time, on this thread: _run_command
+                # swaps process-wide state (cwd, os.environ, sys.std*) for each command
+                with conn:
+                    conn.settimeout(None)
+                    try:
+                        self._handle(conn)
+                    except OSError:
+                        pass  # Client went away mid-command
+        finally:
+            server.close()
+            for path in (SOCKET_PATH, PID_FILE):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def _handle(self, conn: socket.socket) -> None:
+        line = b""
+        while not line.endswith(b"\n"):
+            chunk = conn.recv(65536)
+            if not chunk:
+                return
+            line += chunk
+        request = json.loads(line)
+
+        if "control" in request:
+            _send_frame(conn, _EXIT, json.dumps(self._control(request["control"])).encode())
+            return
+
+        code, fallback = self._run_command(conn, request)
+        self.served += 1
+        if fallback:
+            _send_frame(conn, _FALLBACK)
+        else:
+            _send_frame(conn, _EXIT, json.dumps({"code": code}).encode())
+
+    def _control(self, action: str) -> Dict[str, Any]:
+        if action == "stop":
+            self.running = False
+        return {
+            "code": 0,
+            "pid": os.getpid(),
+            "socket": str(SOCKET_PATH),
+            "uptime_seconds": round(time.time() - self.started, 1),
+            "commands_served": self.served,
+            "warm_clients": len(self.pool),
+            "idle_timeout_seconds": self.idle_timeout,
+            "running": self.running,
+        }
+
+    def _run_command(self, conn: socket.socket, request: Dict[str, Any]) -> Tuple[int, bool]:
+        """
+        Run one CLI invocation with the client's cwd, env and terminal. Returns (exit code, fallback).
+
+        The cwd, environment and standard streams are process-wide, so commands
+        must run strictly one after another (as serve does).
+        """
+        import click
+        from . import cli
+
+        if self._in_command:
+            raise RuntimeError("daemon commands must run one at a time")
+        self._in_command = True
+
+        isatty = request.get("isatty", {})
+        stdout = _FrameWriter(conn, _STDOUT, bool(isatty.get("stdout")))
+        stderr = _FrameWriter(conn, _STDERR, bool(isatty.get("stderr")))
+
+        saved_streams = (sys.stdin, sys.stdout, sys.stderr)
+        saved_env = dict(os.environ)
+        saved_cwd = os.getcwd()
+        code = 0
+        try:
+            os.chdir(request["cwd"])
+            for key in list(os.environ):
+                if key in _FORWARDED_ENV or key.startswith(_FORWARDED_ENV_PREFIXES):
+                    del os.environ[key]
+            os.environ.update(request.get("env", {}))
+            sys.stdin = _NoStdin(bool(isatty.get("stdin")))  # type: ignore[assignment]
+            sys.stdout = stdout  # type: ignore[assignment]
+            sys.stderr = stderr  # type: ignore[assignment]
+            self._reset_consoles()
+
+            try:
+                cli.cli.main(
+                    args=request["argv"],
+                    prog_name="bb",
+                    standalone_mode=True,
+                    obj={"client_pool": self.pool},
+                )
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+                if isinstance(e.code, str):
+                    stderr.write(e.code + "\n")
+            except NeedsTerminal:
+                if not stdout.sent and not stderr.sent:
+                    stdout.discard()
+                    stderr.discard()
+                    return 0, True
+                stdout.discard()  # The unanswered prompt
+                stderr.write("\nbb: this command needs interactive input; rerun with BB_NO_DAEMON=1\n")
+                code = 1
+            except KeyboardInterrupt:
+                code = 130
+            except Exception as e:
+                click.echo(f"bb daemon: {type(e).__name__}: {e}", err=True)
+                code = 1
+            stdout.finish()
+            stderr.finish()
+            return code, False
+        finally:
+            sys.stdin, sys.stdout, sys.stderr = saved_streams
+            os.environ.clear()
+            os.environ.update(saved_env)
+            try:
+                os.chdir(saved_cwd)
+            except OSError:
+                pass
+            self.pool.release()
+            self._in_command = False
+
+    @staticmethod
+    def _reset_consoles() -> None:
+        """Rebuild rich consoles so color and width follow this client's terminal."""
+        for name in ("bitbucket_cli.utils.output", "bitbucket_cli.utils.format"):
+            module = sys.modules.get(name)
+            if module is not None:
+                from rich.console import Console
+                module.console = Console()  # type: ignore[attr-defined]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the daemon in the foreground (used by `bb daemon start`)."""
+    import argparse
+
+    parser = argparse.ArgumentParser(prog="python -m bitbucket_cli.daemon")
+    parser.add_argument("--idle-timeout", type=int, default=DEFAULT_IDLE_TIMEOUT)
+    args = parser.parse_args(argv)
+    Daemon(idle_timeout=args.idle_timeout).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+ABOUTME: Token-bucket request scheduler shared by every call a BitbucketAPI client makes
+ABOUTME: Adapts its rate to 429s, Retry-After and Bitbucket rate-limit headers, and plans jittered retries
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+from .exceptions import ConfigurationError
+
+
+# Statuses worth retrying; 429 means the request was rejected before being processed
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Methods that are safe to repeat no matter how far the previous attempt got
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class RequestScheduler:
+    """
+    Token bucket pacing requests across all threads sharing one client.
+
+    The bucket refills at ``rate`` requests per second up to ``burst`` tokens. The
+    rate halves when the server answers 429 (or warns it is near its limit) and
+    creeps back up towards ``max_rate`` as requests succeed. ``Retry-After`` and
+    ``X-RateLimit-Reset`` block all callers until the server's window reopens.
+    """
+
+    def __init__(self, rate: float = 10.0, burst: int = 20, min_rate: float = 0.5,
+                 backoff_base: float = 0.5, backoff_cap: float = 30.0):
+        if not rate > 0:
+            raise ValueError(f"rate must be positive, got {rate!r}")
+        self.max_rate = float(rate)
+        self.min_rate = min(float(min_rate), self.max_rate)
+        self.rate = self.max_rate
+        self.burst = max(1, int(burst))
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+
+        self._requests = 0
+        self._retries = 0
+        self._rate_limited = 0
+        self._throttle_waits = 0
+        self._throttle_seconds = 0.0
+        self._retry_seconds = 0.0
+        self._last_limit_headers: Dict[str, str] = {}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "RequestScheduler":
+        """
+        Build a scheduler from the ``api`` config section.
+
+        Raises:
+            ConfigurationError: ``rate_limit`` or ``burst`` isn't a positive number
+        """
+        api_config = config.get("api", {})
+        settings = {"rate_limit": api_config.get("rate_limit", 10.0), "burst": api_config.get("burst", 20)}
+        for key, value in settings.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or not value > 0:
+                raise ConfigurationError(f"api.{key} must be a positive number, got {value!r}")
+        return cls(rate=settings["rate_limit"], burst=settings["burst"])
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._last_refill
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def acquire(self) -> float:
+        """
+        Block until the caller may send a request.
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Reserve a token now; a negative balance is paid for by waiting
+            self._tokens -= 1
+            wait = max(self._blocked_until - now, -self._tokens / self.rate, 0.0)
+            self._requests += 1
+            if wait > 0:
+                self._throttle_waits += 1
+                self._throttle_seconds += wait
+
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def record_response(self, status_code: int, headers: Mapping[str, str]) -> None:
+        """Adapt the request rate to a response's status and rate-limit headers."""
+        limit_headers = {k: v for k, v in headers.items() if k.lower().startswith("x-ratelimit")}
+        lowered = {k.lower(): v for k, v in limit_headers.items()}
+
+        with self._lock:
+            if limit_headers:
+                self._last_limit_headers = limit_headers
+
+            now = time.monotonic()
+            if status_code == 429:
+                self._rate_limited += 1
+                self.rate = max(self.min_rate, self.rate / 2)
+                delay = parse_retry_after(headers.get("Retry-After"))
+                if delay is not None:
+                    self._blocked_until = max(self._blocked_until, now + delay)
+            elif lowered.get("x-ratelimit-nearlimit", "").lower() == "true":
+                # Bitbucket warns when less than 20% of the window's budget is left
+                self.rate = max(self.min_rate, self.rate * 0.75)
+            elif status_code < 400:
+                # Additive increase back towards the configured ceiling
+                self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+            remaining = lowered.get("x-ratelimit-remaining")
+            reset = lowered.get("x-ratelimit-reset")
+            if remaining is not None and reset is not None:
+                try:
+                    if int(remaining) <= 0:
+                        wait = max(0.0, float(reset) - time.time())
+                        self._blocked_until = max(self._blocked_until, now + wait)
+                except ValueError:
+                    pass
+
+    def retry_delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        """
+        Seconds to wait before retry number ``attempt`` (0-based).
+
+        Honors ``Retry-After`` when present, otherwise uses full-jitter exponential backoff.
+        """
+        if headers is not None:
+            delay = parse_retry_after(headers.get("Retry-After"))
+            if delay is not None:
+                return min(delay, self.backoff_cap)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** attempt)))
+
+    def record_retry(self, delay: float) -> None:
+        """Count a retry and the time it will spend sleeping."""
+        with self._lock:
+            self._retries += 1
+            self._retry_seconds += delay
+
+    def stats(self) -> Dict[str, Any]:
+        """Budget and throttling counters for this client."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "requests": self._requests,
+                "retries": self._retries,
+                "rate_limited": self._rate_limited,
+                "throttle_waits": self._throttle_waits,
+                "throttle_seconds": round(self._throttle_seconds, 3),
+                "retry_seconds": round(self._retry_seconds, 3),
+                "rate_per_second": round(self.rate, 3),
+                "max_rate_per_second": self.max_rate,
+                "tokens_available": round(max(self._tokens, 0.0), 3),
+                "blocked_for_seconds": round(max(0.0, self._blocked_until - time.monotonic()), 3),
+                "last_rate_limit_headers": dict(self._last_limit_headers),
+            }
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,371 @@
+"""
+ABOUTME: Local SQLite mirror of pull requests, comments, activity and pipelines for instant queries
+ABOUTME: Tracks an updated_on high-water mark per sync scope so refreshes only fetch what changed
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .auth import CONFIG_DIR
+
+
+INDEX_FILE = CONFIG_DIR / "index.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pullrequests (
+    workspace TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    title TEXT,
+    state TEXT,
+    author_uuid TEXT,
+    author_name TEXT,
+    source_branch TEXT,
+    destination_branch TEXT,
+    created_on TEXT,
+    updated_on TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (workspace, repo, id)
+);
+CREATE INDEX IF NOT EXISTS pullrequests_updated ON pullrequests (updated_on);
+CREATE INDEX IF NOT EXISTS pullrequests_author ON pullrequests (author_uuid);
+CREATE INDEX IF NOT EXISTS pullrequests_source ON pullrequests (source_branch);
+
+CREATE TABLE IF NOT EXISTS pr_reviewers (
+    workspace TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    pr_id INTEGER NOT NULL,
+    uuid TEXT,
+    name TEXT,
+    PRIMARY KEY (workspace, repo, pr_id, uuid)
+);
+CREATE INDEX IF NOT EXISTS pr_reviewers_uuid ON pr_reviewers (uuid);
+
+CREATE TABLE IF NOT EXISTS pr_comments (
+    workspace TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    pr_id INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    created_on TEXT,
+    updated_on TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (workspace, repo, pr_id, id)
+);
+
+CREATE TABLE IF NOT EXISTS pr_activity (
+    workspace TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    pr_id INTEGER NOT NULL,
+    occurred_on TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pr_activity_pr ON pr_activity (workspace, repo, pr_id, occurred_on);
+
+CREATE TABLE IF NOT EXISTS pipelines (
+    workspace TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    uuid TEXT NOT NULL,
+    build_number INTEGER,
+    created_on TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (workspace, repo, uuid)
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope TEXT PRIMARY KEY,
+    high_water TEXT,
+    synced_at REAL
+);
+"""
+
+
+def _user_names(user: Optional[Dict[str, Any]]) -> str:
+    """
+    Every spelling of a user (nickname, username, display name, account id),
+    lowercased and newline-delimited so searches match whole names only.
+    """
+    user = user or {}
+    names = (user.get(k) for k in ("nickname", "username", "display_name", "account_id"))
+    return "\n" + "".join(f"{n.lower()}\n" for n in names if n)
+
+
+class PullRequestIndex:
+    """
+    SQLite index of pull request objects keyed by workspace, repo and id, plus
+    the comments, activity and pipeline summaries mirrored by ``bb sync``.
+
+    Full API objects are kept as JSON alongside the columns searches filter on,
+    so results look exactly like API responses. With ``path=None`` the index
+    lives in memory only; every command builds it with from_config, so it is
+    persisted exactly when the other caches are.
+    """
+
+    def __init__(self, path: Optional[Path] = INDEX_FILE):
+        self.path = Path(path) if path else None
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "PullRequestIndex":
+        """Persist the index on disk unless caching is disabled."""
+        if config.get("cache", {}).get("enabled", False):
+            return cls()
+        return cls(path=None)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path is not None:
+                self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+            conn = sqlite3.connect(str(self.path) if self.path else ":memory:", check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            if self.path is not None:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self.path.chmod(0o600)
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def upsert_pull_requests(self, prs: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert or replace pull requests, along with their reviewers.
+
+        The repository comes from each PR's ``destination.repository.full_name``.
+
+        Returns:
+            Number of pull requests written
+        """
+        count = 0
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for pr in prs:
+                    full_name = (((pr.get("destination") or {}).get("repository") or {}).get("full_name") or "")
+                    workspace, _, repo = full_name.partition("/")
+                    if not repo or pr.get("id") is None:
+                        continue
+                    author = pr.get("author") or {}
+                    conn.execute(
+                        "INSERT OR REPLACE INTO pullrequests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            workspace, repo, pr["id"], pr.get("title"), pr.get("state"),
+                            author.get("uuid"), _user_names(author),
+                            ((pr.get("source") or {}).get("branch") or {}).get("name"),
+                            ((pr.get("destination") or {}).get("branch") or {}).get("name"),
+                            pr.get("created_on"), pr.get("updated_on"), json.dumps(pr),
+                        ),
+                    )
+                    # Reviewers are only present when requested; don't wipe known ones otherwise
+                    if "reviewers" in pr:
+                        conn.execute(
+                            "DELETE FROM pr_reviewers WHERE workspace = ? AND repo = ? AND pr_id = ?",
+                            (workspace, repo, pr["id"]),
+                        )
+                        conn.executemany(
+                            "INSERT OR REPLACE INTO pr_reviewers VALUES (?, ?, ?, ?, ?)",
+                            [
+                                (workspace, repo, pr["id"], r.get("uuid") or _user_names(r), _user_names(r))
+                                for r in pr["reviewers"] or []
+                            ],
+                        )
+                    count += 1
+        return count
+
+    def upsert_comments(self, workspace: str, repo: str, pr_id: int, comments: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace a pull request's comments; returns how many were written."""
+        rows = [
+            (workspace, repo, pr_id, c["id"], c.get("created_on"), c.get("updated_on"), json.dumps(c))
+            for c in comments
+            if c.get("id") is not None
+        ]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO pr_comments VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def add_activity(self, workspace: str, repo: str, pr_id: int, entries: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Append (occurred_on, entry) activity rows; returns how many were written."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO pr_activity VALUES (?, ?, ?, ?, ?)",
+                    [(workspace, repo, pr_id, when, json.dumps(entry)) for when, entry in entries],
+                )
+        return len(entries)
+
+    def upsert_pipelines(self, workspace: str, repo: str, pipelines: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace pipeline summaries; returns how many were written."""
+        rows = [
+            (workspace, repo, p["uuid"], p.get("build_number"), p.get("created_on"), json.dumps(p))
+            for p in pipelines
+            if p.get("uuid")
+        ]
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO pipelines VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def get_pull_request(self, workspace: str, repo: str, pr_id: int) -> Optional[Dict[str, Any]]:
+        """A mirrored pull request, or None."""
+        return self._one(
+            "SELECT data FROM pullrequests WHERE workspace = ? AND repo = ? AND id = ?",
+            (workspace, repo, pr_id),
+        )
+
+    def comments(self, workspace: str, repo: str, pr_id: int) -> List[Dict[str, Any]]:
+        """Mirrored comments for a pull request, oldest first (API order)."""
+        return self._all(
+            "SELECT data FROM pr_comments WHERE workspace = ? AND repo = ? AND pr_id = ? ORDER BY created_on, id",
+            (workspace, repo, pr_id),
+        )
+
+    def activity(self, workspace: str, repo: str, pr_id: int) -> List[Dict[str, Any]]:
+        """Mirrored activity for a pull request, newest first (API order)."""
+        return self._all(
+            "SELECT data FROM pr_activity WHERE workspace = ? AND repo = ? AND pr_id = ? "
+            "ORDER BY occurred_on DESC, rowid",
+            (workspace, repo, pr_id),
+        )
+
+    def latest_activity(self, workspace: str, repo: str, pr_id: int) -> Optional[str]:
+        """Timestamp of the newest mirrored activity entry for a pull request."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT max(occurred_on) AS latest FROM pr_activity WHERE workspace = ? AND repo = ? AND pr_id = ?",
+                (workspace, repo, pr_id),
+            ).fetchone()
+        return row["latest"]
+
+    def pipelines(self, workspace: str, repo: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Mirrored pipeline summaries, newest first."""
+        sql = "SELECT data FROM pipelines WHERE workspace = ? AND repo = ? ORDER BY created_on DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self._all(sql, (workspace, repo))
+
+    def _one(self, sql: str, args: tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection().execute(sql, args).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def _all(self, sql: str, args: tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._connection().execute(sql, args).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def high_water(self, scope: str) -> Optional[str]:
+        """The newest ``updated_on`` seen for a sync scope, or None if never synced."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT high_water FROM sync_state WHERE scope = ?", (scope,)
+            ).fetchone()
+        return (row["high_water"] or None) if row else None
+
+    def synced_at(self, scope: str) -> Optional[float]:
+        """When a sync scope last completed (epoch seconds), or None."""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT synced_at FROM sync_state WHERE scope = ?", (scope,)
+            ).fetchone()
+        return row["synced_at"] if row else None
+
+    def mark_synced(self, scope: str, high_water: Optional[str]) -> None:
+        """Record a completed sync; the high-water mark never moves backwards."""
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT INTO sync_state VALUES (?, ?, ?) ON CONFLICT(scope) DO UPDATE SET "
+                    "high_water = max(coalesce(high_water, ''), coalesce(excluded.high_water, '')), "
+                    "synced_at = excluded.synced_at",
+                    (scope, high_water, time.time()),
+                )
+
+    def search(
+        self,
+        workspace: Optional[str] = None,
+        repos: Optional[List[str]] = None,
+        author: Optional[Dict[str, Any]] = None,
+        reviewer: Optional[Dict[str, Any]] = None,
+        branch: Optional[str] = None,
+        state: Optional[str] = None,
+        limit: Optional[int] = None,
+        destination_branch: Optional[str] = None,
+        title_contains: Optional[str] = None,
+        updated_since: Optional[str] = None,
+        updated_before: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query indexed pull requests, most recently updated first.
+
+        ``author`` and ``reviewer`` are user entries ({"uuid", "nickname", ...});
+        a user matches by uuid or by any known name. ``branch`` is the source
+        branch; the remaining filters mirror those of list_pull_requests
+        (``title_contains`` ignores case, dates are ISO 8601).
+
+        Returns:
+            Pull request objects as the API returned them
+        """
+        clauses: List[str] = []
+        args: List[Any] = []
+        if workspace:
+            clauses.append("p.workspace = ?")
+            args.append(workspace)
+        if repos:
+            clauses.append(f"(p.workspace || '/' || p.repo) IN ({', '.join('?' * len(repos))})")
+            args.extend(repos)
+        if author:
+            clauses.append("(p.author_uuid = ? OR instr(p.author_name, ?) > 0)")
+            args.extend([author.get("uuid") or "", _user_key(author)])
+        if reviewer:
+            clauses.append(
+                "EXISTS (SELECT 1 FROM pr_reviewers r WHERE r.workspace = p.workspace AND r.repo = p.repo "
+                "AND r.pr_id = p.id AND (r.uuid = ? OR instr(r.name, ?) > 0))"
+            )
+            args.extend([reviewer.get("uuid") or "", _user_key(reviewer)])
+        if branch:
+            clauses.append("p.source_branch = ?")
+            args.append(branch)
+        if state:
+            clauses.append("p.state = ?")
+            args.append(state.upper())
+        if destination_branch:
+            clauses.append("p.destination_branch = ?")
+            args.append(destination_branch)
+        if title_contains:
+            clauses.append("instr(lower(p.title), ?) > 0")
+            args.append(title_contains.lower())
+        if updated_since:
+            clauses.append("p.updated_on >= ?")
+            args.append(updated_since)
+        if updated_before:
+            clauses.append("p.updated_on < ?")
+            args.append(updated_before)
+
+        sql = "SELECT p.data FROM pullrequests p"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY p.updated_on DESC"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        return self._all(sql, tuple(args))
+
+
+def _user_key(user: Dict[str, Any]) -> str:
+    """A delimited name to match against stored user names; never matches when the user has none."""
+    names = _user_names(user).strip("\n").split("\n")
+    return f"\n{names[0]}\n" if names[0] else "\0"
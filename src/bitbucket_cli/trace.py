@@ -0,0 +1,237 @@
+"""
+ABOUTME: Request-level timing instrumentation: connection phase timers and a trace recorder
+ABOUTME: Renders per-request waterfalls and Chrome trace-event JSON for `bb --trace`
+"""
+
+import json
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# Phase timings for the request currently being sent on this thread (None when not tracing)
+_active = threading.local()
+
+
+def begin_phases() -> Dict[str, float]:
+    """Start collecting connection phase timings for the calling thread."""
+    phases: Dict[str, float] = {}
+    _active.phases = phases
+    return phases
+
+
+def end_phases() -> None:
+    """Stop collecting connection phase timings for the calling thread."""
+    _active.phases = None
+
+
+def _current_phases() -> Optional[Dict[str, float]]:
+    return getattr(_active, "phases", None)
+
+
+class _TimedConnectionMixin:
+    """Records DNS and TCP connect time when a new connection is opened."""
+
+    def _new_conn(self):  # type: ignore[no-untyped-def]
+        phases = _current_phases()
+        if phases is None:
+            return super()._new_conn()  # type: ignore[misc]
+
+        # Resolve once up front purely to time DNS; the connect below resolves again,
+        # normally from the resolver's cache. Only happens while tracing.
+        start = time.perf_counter()
+        try:
+            socket.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)  # type: ignore[attr-defined]
+        except OSError:
+            pass
+        resolved = time.perf_counter()
+        sock = super()._new_conn()  # type: ignore[misc]
+        phases["dns"] = resolved - start
+        phases["connect"] = time.perf_counter() - resolved
+        return sock
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self) -> None:
+        phases = _current_phases()
+        start = time.perf_counter()
+        super().connect()
+        if phases is not None:
+            elapsed = time.perf_counter() - start
+            phases["tls"] = max(0.0, elapsed - phases.get("dns", 0.0) - phases.get("connect", 0.0))
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimingHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections report DNS/connect/TLS timings while tracing."""
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class RequestTracer:
+    """
+    Collects request records emitted by BitbucketAPI hooks.
+
+    Register with ``api.add_hook(tracer)``. Records carry wall-clock start time,
+    duration, phase timings, bytes, status, retries and cache outcome.
+    """
+
+    def __init__(self) -> None:
+        self.records: List[Dict[str, Any]] = []
+        self.started = time.time()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def finish(self) -> None:
+        """Mark the end of the traced command."""
+        self.finished = time.time()
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate counts and time split between network and everything else."""
+        records = sorted(self.records, key=lambda r: r["start"])
+        end = self.finished or time.time()
+        network = _union_seconds([(r["start"], r["start"] + r["duration"]) for r in records])
+        return {
+            "requests": len(records),
+            "wall_seconds": round(end - self.started, 4),
+            "network_seconds": round(network, 4),
+            "other_seconds": round(max(0.0, end - self.started - network), 4),
+            "bytes": sum(r.get("bytes") or 0 for r in records),
+            "retries": sum(r.get("retries", 0) for r in records),
+            "cache_hits": sum(1 for r in records if r.get("cache") in ("hit", "revalidated")),
+            "cache_misses": sum(1 for r in records if r.get("cache") == "miss"),
+        }
+
+    def waterfall(self, width: int = 32) -> str:
+        """Render a plain-text waterfall of every request plus a summary line."""
+        records = sorted(self.records, key=lambda r: r["start"])
+        end = self.finished or time.time()
+        span = max(end - self.started, 1e-6)
+
+        lines = [f"{'start':>8} {'dur':>8} {'status':>6} {'cache':>11} {'bytes':>9}  {'timeline':<{width}}  request"]
+        for r in records:
+            offset = r["start"] - self.started
+            first = int(offset / span * width)
+            length = max(1, int(r["duration"] / span * width))
+            bar = (" " * first + "█" * length)[:width]
+            phases = r.get("phases", {})
+            phase_text = " ".join(
+                f"{name}={phases[name] * 1000:.0f}ms"
+                for name in ("queue", "dns", "connect", "tls", "ttfb", "download")
+                if phases.get(name)
+            )
+            retries = f" retries={r['retries']}" if r.get("retries") else ""
+            lines.append(
+                f"{offset * 1000:7.0f}ms {r['duration'] * 1000:6.0f}ms {str(r.get('status') or '-'):>6} "
+                f"{r.get('cache') or '-':>11} {r.get('bytes') or 0:>9}  {bar:<{width}}  "
+                f"{r['method']} {r['path']}{retries}"
+                + (f"\n{'':>49}{phase_text}" if phase_text else "")
+            )
+
+        s = self.summary()
+        lines.append(
+            f"{s['requests']} requests in {s['wall_seconds'] * 1000:.0f}ms — "
+            f"network {s['network_seconds'] * 1000:.0f}ms, other (pagination/rendering/CPU) "
+            f"{s['other_seconds'] * 1000:.0f}ms, {s['bytes']} bytes, "
+            f"{s['cache_hits']} cache hits, {s['cache_misses']} misses, {s['retries']} retries"
+        )
+        return "\n".join(lines)
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Build a Chrome trace-event document (load in chrome://tracing or Perfetto)."""
+        def us(seconds: float) -> int:
+            return int(seconds * 1_000_000)
+
+        end = self.finished or time.time()
+        events: List[Dict[str, Any]] = [
+            {
+                "name": "bb",
+                "cat": "command",
+                "ph": "X",
+                "ts": 0,
+                "dur": us(end - self.started),
+                "pid": 1,
+                "tid": 0,
+            }
+        ]
+        # Number threads by first appearance; raw thread idents are unreadable in viewers
+        tids: Dict[int, int] = {}
+        for r in sorted(self.records, key=lambda r: r["start"]):
+            start = r["start"] - self.started
+            tid = tids.setdefault(r.get("thread", 0), len(tids) + 1)
+            args = {k: v for k, v in r.items() if k not in ("start", "duration", "phases", "thread")}
+            args.update({f"{k}_ms": round(v * 1000, 3) for k, v in r.get("phases", {}).items()})
+            events.append({
+                "name": f"{r['method']} {r['path']}",
+                "cat": "http",
+                "ph": "X",
+                "ts": us(start),
+                "dur": us(r["duration"]),
+                "pid": 1,
+                "tid": tid,
+                "args": args,
+            })
+            # Phases laid end to end inside the request span
+            cursor = start
+            for name in ("queue", "dns", "connect", "tls", "ttfb", "download"):
+                value = r.get("phases", {}).get(name)
+                if not value:
+                    continue
+                events.append({
+                    "name": name,
+                    "cat": "phase",
+                    "ph": "X",
+                    "ts": us(cursor),
+                    "dur": us(value),
+                    "pid": 1,
+                    "tid": tid,
+                })
+                cursor += value
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str) -> None:
+        """Write the Chrome trace-event JSON to ``path``."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+
+
+def _union_seconds(intervals: List[tuple]) -> float:
+    """Total length covered by possibly overlapping intervals."""
+    total = 0.0
+    current_start: Optional[float] = None
+    current_end = 0.0
+    for start, end in sorted(intervals):
+        if current_start is None or start > current_end:
+            if current_start is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_start is not None:
+        total += current_end - current_start
+    return total
@@ -0,0 +1,181 @@
+"""
+ABOUTME: Persistent user directory mapping usernames and nicknames to Bitbucket identities
+ABOUTME: Memoizes user lookups with TTL and negative caching, resolving misses concurrently
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from .auth import CONFIG_DIR
+from .exceptions import NotFoundError
+
+if TYPE_CHECKING:
+    from .api import BitbucketAPI
+    from .async_api import AsyncBitbucketAPI
+
+
+USER_DIRECTORY_FILE = CONFIG_DIR / "users.json"
+
+# Resolved users rarely change; unknown names are retried sooner in case of typos fixed upstream
+USER_TTL = 7 * 24 * 60 * 60
+MISSING_USER_TTL = 60 * 60
+
+USER_FIELDS = ("uuid", "account_id", "display_name", "nickname")
+
+
+class UserDirectory:
+    """
+    Local directory of username/nickname → uuid, account_id and display name.
+
+    Entries expire after ``ttl`` seconds; names the API reported as unknown are
+    remembered for ``missing_ttl`` seconds so they aren't looked up on every run.
+    With ``path=None`` the directory lives in memory only.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = USER_DIRECTORY_FILE,
+        ttl: int = USER_TTL,
+        missing_ttl: int = MISSING_USER_TTL
+    ):
+        self.path = Path(path) if path else None
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "UserDirectory":
+        """Persist the directory on disk unless caching is disabled."""
+        if config.get("cache", {}).get("enabled", False):
+            return cls()
+        return cls(path=None)
+
+    @staticmethod
+    def _key(name: str) -> str:
+        return name.strip().lower()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path is not None:
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        self._entries = json.load(f)
+                except (OSError, ValueError):
+                    pass
+        return self._entries
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached entry for a name, or None if it must be resolved.
+
+        Entries for unknown users carry ``"missing": True``.
+        """
+        with self._lock:
+            entry = self._load().get(self._key(name))
+        if entry is None:
+            return None
+        ttl = self.missing_ttl if entry.get("missing") else self.ttl
+        if time.time() - entry.get("resolved_at", 0) >= ttl:
+            return None
+        return entry
+
+    def remember(self, name: str, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Record a resolved user and return the stored entry."""
+        entry = {field: user_data.get(field) for field in USER_FIELDS}
+        entry["resolved_at"] = time.time()
+        with self._lock:
+            entries = self._load()
+            entries[self._key(name)] = entry
+            # Index by nickname too so either spelling hits next time
+            if user_data.get("nickname"):
+                entries[self._key(user_data["nickname"])] = entry
+            self._dirty = True
+        return entry
+
+    def remember_missing(self, name: str) -> None:
+        """Record that the API does not know this name."""
+        with self._lock:
+            self._load()[self._key(name)] = {"missing": True, "resolved_at": time.time()}
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write pending changes to disk."""
+        with self._lock:
+            if not self._dirty or self.path is None:
+                return
+            data = json.dumps(self._load()).encode("utf-8")
+            self._dirty = False
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True, mode=0o700)
+            fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # The directory is only an optimization
+
+
+async def resolve_users_async(
+    api: "AsyncBitbucketAPI",
+    names: List[str],
+    directory: Optional[UserDirectory] = None
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Resolve usernames/nicknames to user entries in one concurrent pass.
+
+    Names found in the directory cost nothing; the rest are looked up concurrently
+    and recorded. Unknown users map to None.
+
+    Args:
+        api: AsyncBitbucketAPI instance
+        names: Usernames or nicknames to resolve
+        directory: UserDirectory to consult (defaults to one built from the config)
+
+    Returns:
+        Mapping of each requested name to its entry, or None if it couldn't be resolved
+    """
+    if directory is None:
+        directory = UserDirectory.from_config(api.config)
+
+    results: Dict[str, Optional[Dict[str, Any]]] = {}
+    misses = []
+    for name in dict.fromkeys(names):
+        entry = directory.lookup(name)
+        if entry is None:
+            misses.append(name)
+        else:
+            results[name] = None if entry.get("missing") else entry
+
+    if misses:
+        lookups = await asyncio.gather(
+            *(api.get_user(name) for name in misses),
+            return_exceptions=True
+        )
+        for name, user_data in zip(misses, lookups):
+            if isinstance(user_data, NotFoundError):
+                directory.remember_missing(name)
+                results[name] = None
+            elif isinstance(user_data, BaseException):
+                # Transient failure — don't cache it
+                results[name] = None
+            else:
+                results[name] = directory.remember(name, user_data)
+        directory.save()
+
+    return results
+
+
+def resolve_users(api: "BitbucketAPI", names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+    """Synchronous wrapper around resolve_users_async."""
+    from .async_api import run_async_command
+    return run_async_command(api, resolve_users_async, names)
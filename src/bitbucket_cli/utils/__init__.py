@@ -1,11 +1,32 @@
 """
 ABOUTME: Utility module initialization for common helper functions
-ABOUTME: Provides organized imports for git operations, output formatting, and configuration helpers
+ABOUTME: Provides lazily-loaded access to git operations, output formatting, and configuration helpers
 """
 
-from .git import get_current_branch, get_repository_info, is_git_repository
-from .output import success, error, warning, info, handle_output
-from .format import format_pull_request, format_comment, format_table
+import importlib
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    from .git import get_current_branch, get_repository_info, is_git_repository
+    from .status import success, error, warning, info
+    from .output import handle_output
+    from .format import format_pull_request, format_comment, format_table
+
+# Attribute → submodule; resolved on first access so importing one helper
+# doesn't drag in rich or GitPython
+_LAZY_ATTRS = {
+    "get_current_branch": ".git",
+    "get_repository_info": ".git",
+    "is_git_repository": ".git",
+    "success": ".status",
+    "error": ".status",
+    "warning": ".status",
+    "info": ".status",
+    "handle_output": ".output",
+    "format_pull_request": ".format",
+    "format_comment": ".format",
+    "format_table": ".format",
+}
 
 __all__ = [
     "get_current_branch",
@@ -19,4 +40,17 @@ __all__ = [
     "format_pull_request",
     "format_comment",
     "format_table",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -0,0 +1,29 @@
+"""
+ABOUTME: Parsing of user-supplied ISO 8601 dates and timestamps for query filters
+ABOUTME: Normalizes them to UTC so they compare correctly with Bitbucket's updated_on/created_on values
+"""
+
+from datetime import datetime, timezone
+
+
+def normalize_timestamp(value: str) -> str:
+    """
+    Parse an ISO 8601 date or timestamp and return it in UTC.
+
+    Values without a UTC offset are taken as UTC, matching Bitbucket. The result
+    looks like the API's own timestamps ("2024-01-01T00:00:00+00:00"), so it can
+    go straight into a BBQL query or be compared with mirrored values as a string.
+
+    Raises:
+        ValueError: ``value`` isn't an ISO 8601 date or timestamp
+    """
+    text = value.strip()
+    if text.endswith(("Z", "z")):
+        text = text[:-1] + "+00:00"  # fromisoformat only accepts "Z" from Python 3.11
+    try:
+        parsed = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"{value!r} is not an ISO 8601 date or timestamp (e.g. 2024-01-31 or 2024-01-31T09:00:00Z)")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc).isoformat()
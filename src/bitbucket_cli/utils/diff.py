@@ -0,0 +1,326 @@
+"""
+ABOUTME: Incremental parsing, indexing and rendering of unified (git) diffs
+ABOUTME: Turns a stream of diff bytes into file headers, hunks and per-file line-number tables
+"""
+
+import codecs
+import re
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import click
+
+HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)$")
+
+# Hunks longer than this are emitted in pieces so memory stays bounded on huge
+# generated files, whose whole content is often a single hunk
+MAX_HUNK_LINES = 1000
+
+
+class FileHeader:
+    """The header block of one file in a diff (``diff --git`` up to its first hunk)."""
+
+    __slots__ = ("old_path", "new_path", "lines", "binary")
+
+    def __init__(self, old_path: Optional[str], new_path: Optional[str], lines: List[str]):
+        self.old_path = old_path
+        self.new_path = new_path
+        self.lines = lines
+        self.binary = False
+
+    @property
+    def path(self) -> str:
+        """The file's path after the change (before it, for deleted files)."""
+        return self.new_path or self.old_path or ""
+
+    @property
+    def status(self) -> str:
+        if self.old_path is None:
+            return "added"
+        if self.new_path is None:
+            return "removed"
+        if self.old_path != self.new_path:
+            return "renamed"
+        return "modified"
+
+
+class Hunk:
+    """
+    A run of lines from one ``@@`` hunk.
+
+    ``old_start``/``new_start`` are the line numbers of the first line in ``lines``;
+    a hunk split at MAX_HUNK_LINES continues in pieces whose ``header`` is None.
+    """
+
+    __slots__ = ("path", "header", "old_start", "old_count", "new_start", "new_count", "section", "lines")
+
+    def __init__(self, path: str, header: Optional[str], old_start: int, old_count: int,
+                 new_start: int, new_count: int, section: str = ""):
+        self.path = path
+        self.header = header
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        self.section = section
+        self.lines: List[str] = []
+
+
+class FileLineMap:
+    """
+    Line-number tables for one file of a diff.
+
+    ``new_lines`` lists, in ascending order, every new-file line the diff shows
+    (added and context lines) and ``new_to_old`` the old-file line each one
+    corresponds to (0 for added lines); ``old_lines``/``old_to_new`` do the same
+    for removed and context lines. The tables are flat integer arrays, so lookups
+    are binary searches and a large file costs a few bytes per diff line.
+    """
+
+    __slots__ = ("path", "old_path", "status", "binary", "hunks",
+                 "new_lines", "new_to_old", "old_lines", "old_to_new")
+
+    def __init__(self, header: FileHeader):
+        self.path = header.path
+        self.old_path = header.old_path
+        self.status = header.status
+        self.binary = header.binary
+        self.hunks = array("i")  # (old_start, old_count, new_start, new_count) per hunk, flattened
+        self.new_lines = array("i")
+        self.new_to_old = array("i")
+        self.old_lines = array("i")
+        self.old_to_new = array("i")
+
+    def add(self, hunk: Hunk) -> None:
+        """Record a hunk (or hunk piece) of this file; hunks must arrive in diff order."""
+        if hunk.header is not None:
+            self.hunks.extend((hunk.old_start, hunk.old_count, hunk.new_start, hunk.new_count))
+        old_line, new_line = hunk.old_start, hunk.new_start
+        for line in hunk.lines:
+            marker = line[:1]
+            if marker == "+":
+                self.new_lines.append(new_line)
+                self.new_to_old.append(0)
+                new_line += 1
+            elif marker == "-":
+                self.old_lines.append(old_line)
+                self.old_to_new.append(0)
+                old_line += 1
+            elif marker != "\\":
+                self.new_lines.append(new_line)
+                self.new_to_old.append(old_line)
+                self.old_lines.append(old_line)
+                self.old_to_new.append(new_line)
+                old_line += 1
+                new_line += 1
+
+    def has_new_line(self, line: int) -> bool:
+        """Whether new-file ``line`` appears in the diff, i.e. can carry an inline comment."""
+        return _find(self.new_lines, line) >= 0
+
+    def has_old_line(self, line: int) -> bool:
+        """Whether old-file ``line`` appears in the diff (removed or context)."""
+        return _find(self.old_lines, line) >= 0
+
+    def old_line_for(self, line: int) -> Optional[int]:
+        """The old-file line new-file ``line`` corresponds to; None if it was added or isn't shown."""
+        i = _find(self.new_lines, line)
+        return (self.new_to_old[i] or None) if i >= 0 else None
+
+    def new_line_for(self, line: int) -> Optional[int]:
+        """The new-file line old-file ``line`` corresponds to; None if it was removed or isn't shown."""
+        i = _find(self.old_lines, line)
+        return (self.old_to_new[i] or None) if i >= 0 else None
+
+    def new_ranges(self) -> List[Tuple[int, int]]:
+        """First and last new-file line of each hunk, for messages about where comments can go."""
+        hunks = self.hunks
+        return [
+            (hunks[i + 2], hunks[i + 2] + hunks[i + 3] - 1)
+            for i in range(0, len(hunks), 4) if hunks[i + 3]
+        ]
+
+
+class DiffIndex:
+    """Parsed diff: one FileLineMap per changed file, looked up by new or old path."""
+
+    def __init__(self) -> None:
+        self.files: List[FileLineMap] = []
+        self._by_path: Dict[str, FileLineMap] = {}
+
+    @classmethod
+    def build(cls, events: Iterable[Union[FileHeader, Hunk]]) -> "DiffIndex":
+        """Index the output of parse_diff, consuming it as it streams."""
+        index = cls()
+        current: Optional[FileLineMap] = None
+        for event in events:
+            if isinstance(event, FileHeader):
+                current = FileLineMap(event)
+                index.files.append(current)
+                for path in (event.new_path, event.old_path):
+                    if path:
+                        index._by_path.setdefault(path, current)
+            elif current is not None:
+                current.add(event)
+        return index
+
+    def get(self, path: str) -> Optional[FileLineMap]:
+        """The line map of a changed file, by its new or (for renames and deletions) old path."""
+        return self._by_path.get(path)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._by_path
+
+
+def _find(table: array, value: int) -> int:
+    """Index of ``value`` in a sorted array, or -1."""
+    i = bisect_left(table, value)
+    return i if i < len(table) and table[i] == value else -1
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decode byte chunks as UTF-8 and yield complete lines (without the newline) as they arrive."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending: List[str] = []
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if "\n" not in text:
+            pending.append(text)
+            continue
+        first, *rest = text.split("\n")
+        pending.append(first)
+        yield "".join(pending)
+        yield from rest[:-1]
+        pending = [rest[-1]]
+    pending.append(decoder.decode(b"", final=True))
+    tail = "".join(pending)
+    if tail:
+        yield tail
+
+
+def parse_diff(lines: Iterable[str]) -> Iterator[Union[FileHeader, Hunk]]:
+    """
+    Parse a git diff incrementally.
+
+    Yields each file's FileHeader once its header block is complete, followed by
+    its Hunks in order. At most one hunk piece (MAX_HUNK_LINES lines) is held in
+    memory at a time.
+    """
+    header: Optional[FileHeader] = None  # Header still collecting lines
+    hunk: Optional[Hunk] = None
+    path = ""
+    old_line = new_line = 0
+
+    for line in lines:
+        if line.startswith("diff --git "):
+            if header is not None:
+                yield header
+            if hunk is not None:
+                yield hunk
+                hunk = None
+            old_path, new_path = _git_paths(line)
+            header = FileHeader(old_path, new_path, [line])
+            path = header.path
+            continue
+
+        if header is not None:
+            match = HUNK_HEADER.match(line) if line.startswith("@@") else None
+            if match is None:
+                header.lines.append(line)
+                _read_header_line(header, line)
+                path = header.path
+                continue
+            yield header
+            header = None
+
+        if line.startswith("@@"):
+            match = HUNK_HEADER.match(line)
+            if match is not None:
+                if hunk is not None:
+                    yield hunk
+                old_start, old_count, new_start, new_count, section = match.groups()
+                old_line, new_line = int(old_start), int(new_start)
+                hunk = Hunk(
+                    path, line, old_line, 1 if old_count is None else int(old_count),
+                    new_line, 1 if new_count is None else int(new_count), section,
+                )
+                continue
+
+        if hunk is None:
+            continue  # Preamble before the first file (e.g. commit message in a patch)
+
+        if len(hunk.lines) >= MAX_HUNK_LINES:
+            yield hunk
+            hunk = Hunk(path, None, old_line, hunk.old_count, new_line, hunk.new_count, hunk.section)
+        hunk.lines.append(line)
+        marker = line[:1]
+        if marker != "+" and marker != "\\":
+            old_line += 1
+        if marker != "-" and marker != "\\":
+            new_line += 1
+
+    if header is not None:
+        yield header
+    if hunk is not None:
+        yield hunk
+
+
+def _git_paths(line: str) -> tuple:
+    """Best-effort (old, new) paths from ``diff --git a/x b/y``; ---/+++ lines refine them."""
+    rest = line[len("diff --git "):]
+    if rest.startswith("a/") and " b/" in rest:
+        old, _, new = rest[2:].partition(" b/")
+        return old, new
+    return None, None
+
+
+def _read_header_line(header: FileHeader, line: str) -> None:
+    """Update a file header's paths and flags from one of its extended header lines."""
+    if line.startswith("--- "):
+        header.old_path = _strip_prefix(line[4:], "a/")
+    elif line.startswith("+++ "):
+        header.new_path = _strip_prefix(line[4:], "b/")
+    elif line.startswith("rename from "):
+        header.old_path = line[len("rename from "):]
+    elif line.startswith("rename to "):
+        header.new_path = line[len("rename to "):]
+    elif line.startswith("new file mode"):
+        header.old_path = None
+    elif line.startswith("deleted file mode"):
+        header.new_path = None
+    elif line.startswith("Binary files ") or line == "GIT binary patch":
+        header.binary = True
+
+
+def _strip_prefix(path: str, prefix: str) -> Optional[str]:
+    path = path.split("\t", 1)[0]
+    if path == "/dev/null":
+        return None
+    return path[len(prefix):] if path.startswith(prefix) else path
+
+
+def render_diff(events: Iterable[Union[FileHeader, Hunk]]) -> Iterator[str]:
+    """
+    Yield colored text for each file header and hunk piece as it is parsed.
+
+    Suited to ``click.echo_via_pager``, which writes each piece to the pager as it
+    is produced (and strips the colors when output isn't a terminal).
+    """
+    for event in events:
+        if isinstance(event, FileHeader):
+            yield "".join(click.style(line, bold=True) + "\n" for line in event.lines)
+            continue
+        out = []
+        if event.header is not None:
+            at, _, section = event.header.partition(" @@")
+            out.append(click.style(at + " @@", fg="cyan") + section + "\n")
+        for line in event.lines:
+            marker = line[:1]
+            if marker == "+":
+                out.append(click.style(line, fg="green") + "\n")
+            elif marker == "-":
+                out.append(click.style(line, fg="red") + "\n")
+            else:
+                out.append(line + "\n")
+        yield "".join(out)
@@ -1,32 +1,237 @@
 """
 ABOUTME: Git repository utilities for branch detection and repository information extraction
-ABOUTME: Provides functions to interact with Git repositories for CLI context detection
+ABOUTME: Reads .git HEAD/config directly for the hot path, falling back to GitPython for the rest
 """
 
 import os
 import re
 from pathlib import Path
-from typing import Dict, Optional
-from git import Repo, InvalidGitRepositoryError
+from typing import Dict, List, Optional, Tuple
 from ..exceptions import GitError
 
 
+def _open_repo(repo_path: Optional[str] = None):
+    """
+    Open a repository with GitPython.
+    
+    GitPython is imported on first use because importing it costs more than most
+    commands take to run. A missing repository raises GitError.
+    """
+    from git import Repo, InvalidGitRepositoryError, NoSuchPathError
+    
+    try:
+        return Repo(repo_path or None, search_parent_directories=True)
+    except (InvalidGitRepositoryError, NoSuchPathError):
+        raise GitError("Not in a Git repository")
+
+
+# ─── Native reader ────────────────────────────────────────────────────
+#
+# Repository detection runs on nearly every command, so the common case (branch
+# and remote URL) is answered by reading HEAD and config directly instead of
+# importing GitPython and spawning git. Anything the reader doesn't understand
+# (config includes, reftable, symlinked HEAD) returns None and callers fall back
+# to GitPython.
+
+# git_dir → (file signature, parsed repository state); reused by the daemon
+_repo_cache: Dict[str, Tuple[tuple, Dict]] = {}
+
+
+class _Unsupported(Exception):
+    """Layout the native reader doesn't handle; use GitPython instead."""
+
+
+def _find_git_dir(start: str) -> Tuple[str, Optional[str]]:
+    """
+    Locate the git directory for ``start``.
+    
+    Returns:
+        (git_dir, work_tree); work_tree is None for bare repositories
+    """
+    env_git_dir = os.environ.get("GIT_DIR")
+    if env_git_dir:
+        git_dir = os.path.abspath(env_git_dir)
+        if not os.path.isfile(os.path.join(git_dir, "HEAD")):
+            raise GitError("Not in a Git repository")
+        return git_dir, os.path.abspath(os.environ.get("GIT_WORK_TREE") or start)
+
+    current = os.path.abspath(start)
+    while True:
+        dot_git = os.path.join(current, ".git")
+        if os.path.isdir(dot_git):
+            return dot_git, current
+        if os.path.isfile(dot_git):
+            # Worktrees and submodules: ".git" is a file pointing at the real git dir
+            with open(dot_git, encoding="utf-8") as f:
+                content = f.read().strip()
+            if not content.startswith("gitdir:"):
+                raise _Unsupported(f"unrecognised .git file in {current}")
+            git_dir = content[len("gitdir:"):].strip()
+            return os.path.normpath(os.path.join(current, git_dir)), current
+        if all(os.path.exists(os.path.join(current, name)) for name in ("HEAD", "objects", "refs")):
+            return current, None
+        parent = os.path.dirname(current)
+        if parent == current:
+            raise GitError("Not in a Git repository")
+        current = parent
+
+
+def _signature(*paths: str) -> tuple:
+    """mtime/size of each path, so an edited HEAD or config invalidates the cache."""
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def _parse_config_value(raw: str) -> str:
+    """Unquote a git config value and drop a trailing comment."""
+    value: List[str] = []
+    quoted = False
+    i = 0
+    while i < len(raw):
+        ch = raw[i]
+        if ch == "\\" and i + 1 < len(raw):
+            value.append({"n": "\n", "t": "\t", "b": "\b"}.get(raw[i + 1], raw[i + 1]))
+            i += 2
+            continue
+        if ch == '"':
+            quoted = not quoted
+        elif ch in "#;" and not quoted:
+            break
+        else:
+            value.append(ch)
+        i += 1
+    return "".join(value).strip()
+
+
+def _parse_config(text: str) -> Dict[str, Dict[str, str]]:
+    """
+    Parse the subset of git config syntax needed for remotes.
+    
+    Returns:
+        Mapping of section ("remote.origin", "extensions", ...) to lowercase keys and
+        their last values
+    """
+    sections: Dict[str, Dict[str, str]] = {}
+    section: Optional[Dict[str, str]] = None
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+        if line.endswith("\\"):
+            raise _Unsupported("line continuation in config")
+        match = re.match(r'^\[\s*([A-Za-z0-9.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\](.*)$', line)
+        if match:
+            name, subsection, rest = match.groups()
+            name = name.lower()
+            if name in ("include", "includeif"):
+                raise _Unsupported("config includes")
+            if subsection is not None:
+                name += "." + re.sub(r'\\(.)', r'\1', subsection)
+            section = sections.setdefault(name, {})
+            line = rest.strip()
+            if not line:
+                continue
+        if section is None:
+            continue
+        key, sep, raw = line.partition("=")
+        # A bare key ("bare" with no "=") is boolean true; like git, the last value of a key wins
+        section[key.strip().lower()] = _parse_config_value(raw) if sep else "true"
+    return sections
+
+
+def _read_repository(repo_path: Optional[str] = None) -> Dict:
+    """
+    Read branch and remotes straight from the git directory, using the cache when
+    HEAD and config are unchanged.
+    
+    Raises:
+        GitError: Not inside a Git repository
+        _Unsupported: The layout needs GitPython
+    """
+    git_dir, work_tree = _find_git_dir(repo_path or os.getcwd())
+
+    # Linked worktrees keep HEAD locally but share config with the main repository
+    common_dir = git_dir
+    commondir_file = os.path.join(git_dir, "commondir")
+    if os.path.isfile(commondir_file):
+        with open(commondir_file, encoding="utf-8") as f:
+            common_dir = os.path.normpath(os.path.join(git_dir, f.read().strip()))
+
+    head_path = os.path.join(git_dir, "HEAD")
+    config_path = os.path.join(common_dir, "config")
+    signature = _signature(head_path, config_path)
+    cached = _repo_cache.get(git_dir)
+    if cached is not None and cached[0] == signature:
+        return dict(cached[1], root=work_tree)
+
+    if os.path.islink(head_path):
+        raise _Unsupported("symlinked HEAD")
+    with open(head_path, encoding="utf-8") as f:
+        head = f.read().strip()
+
+    try:
+        with open(config_path, encoding="utf-8") as f:
+            config = _parse_config(f.read())
+    except FileNotFoundError:
+        config = {}
+    if "refstorage" in config.get("extensions", {}):
+        raise _Unsupported("non-files ref storage")
+
+    if head.startswith("ref: "):
+        ref = head[len("ref: "):].strip()
+        if not ref.startswith("refs/heads/"):
+            raise _Unsupported(f"HEAD points at {ref}")
+        branch, detached = ref[len("refs/heads/"):], False
+    elif re.fullmatch(r"[0-9a-f]{40}|[0-9a-f]{64}", head):
+        branch, detached = head, True
+    else:
+        raise _Unsupported("unrecognised HEAD")
+
+    remotes = {
+        name[len("remote."):]: values["url"]
+        for name, values in config.items()
+        if name.startswith("remote.") and "url" in values
+    }
+    info = {"git_dir": git_dir, "branch": branch, "detached": detached, "remotes": remotes}
+    _repo_cache[git_dir] = (signature, info)
+    return dict(info, root=work_tree)
+
+
 def is_git_repository(path: Optional[str] = None) -> bool:
     """Check if the current directory (or specified path) is a Git repository."""
     try:
-        if path:
-            Repo(path)
-        else:
-            Repo()
+        _read_repository(path)
         return True
-    except InvalidGitRepositoryError:
+    except GitError:
+        return False
+    except (_Unsupported, OSError):
+        pass
+    try:
+        _open_repo(path)
+        return True
+    except GitError:
         return False
 
 
 def get_current_branch(repo_path: Optional[str] = None) -> str:
     """Get the current Git branch name."""
     try:
-        repo = Repo(repo_path) if repo_path else Repo()
+        info = _read_repository(repo_path)
+        # Return commit hash if in detached HEAD state
+        return info["branch"][:8] if info["detached"] else info["branch"]
+    except GitError:
+        raise
+    except (_Unsupported, OSError, UnicodeDecodeError):
+        pass
+
+    try:
+        repo = _open_repo(repo_path)
         
         if repo.head.is_detached:
             # Return commit hash if in detached HEAD state
@@ -34,12 +239,21 @@ def get_current_branch(repo_path: Optional[str] = None) -> str:
         
         return repo.active_branch.name
         
-    except InvalidGitRepositoryError:
-        raise GitError("Not in a Git repository")
+    except GitError:
+        raise
     except Exception as e:
         raise GitError(f"Failed to get current branch: {e}")
 
 
+def _pick_remote_url(remotes: Dict[str, str]) -> str:
+    """Prefer 'origin', otherwise the first remote."""
+    if "origin" in remotes:
+        return remotes["origin"]
+    if remotes:
+        return next(iter(remotes.values()))
+    raise GitError("No Git remotes found")
+
+
 def get_repository_info(repo_path: Optional[str] = None) -> Dict[str, str]:
     """
     Extract repository workspace and name from Git remote URL.
@@ -48,21 +262,19 @@ def get_repository_info(repo_path: Optional[str] = None) -> Dict[str, str]:
         Dict with 'workspace' and 'repo' keys
     """
     try:
-        repo = Repo(repo_path) if repo_path else Repo()
-        
-        # Try to get remote URL from 'origin'
-        if 'origin' in repo.remotes:
-            remote_url = repo.remotes.origin.url
-        elif repo.remotes:
-            # Use first available remote
-            remote_url = list(repo.remotes)[0].url
-        else:
-            raise GitError("No Git remotes found")
-        
+        return parse_git_remote_url(_pick_remote_url(_read_repository(repo_path)["remotes"]))
+    except GitError:
+        raise
+    except (_Unsupported, OSError, UnicodeDecodeError):
+        pass
+
+    try:
+        repo = _open_repo(repo_path)
+        remote_url = _pick_remote_url({remote.name: remote.url for remote in repo.remotes})
         return parse_git_remote_url(remote_url)
         
-    except InvalidGitRepositoryError:
-        raise GitError("Not in a Git repository")
+    except GitError:
+        raise
     except Exception as e:
         raise GitError(f"Failed to get repository info: {e}")
 
@@ -99,16 +311,18 @@ def parse_git_remote_url(remote_url: str) -> Dict[str, str]:
 def get_git_root(repo_path: Optional[str] = None) -> Path:
     """Get the root directory of the Git repository."""
     try:
-        repo = Repo(repo_path) if repo_path else Repo()
-        return Path(repo.working_dir)
-    except InvalidGitRepositoryError:
-        raise GitError("Not in a Git repository")
+        root = _read_repository(repo_path)["root"]
+        if root is not None:
+            return Path(root)
+    except (_Unsupported, OSError, UnicodeDecodeError):
+        pass
+    return Path(_open_repo(repo_path).working_dir)
 
 
 def get_remote_branches(repo_path: Optional[str] = None) -> list[str]:
     """Get list of remote branch names."""
     try:
-        repo = Repo(repo_path) if repo_path else Repo()
+        repo = _open_repo(repo_path)
         
         remote_branches = []
         for remote in repo.remotes:
@@ -120,8 +334,8 @@ def get_remote_branches(repo_path: Optional[str] = None) -> list[str]:
         
         return list(set(remote_branches))  # Remove duplicates
         
-    except InvalidGitRepositoryError:
-        raise GitError("Not in a Git repository")
+    except GitError:
+        raise
     except Exception as e:
         raise GitError(f"Failed to get remote branches: {e}")
 
@@ -129,11 +343,11 @@ def get_remote_branches(repo_path: Optional[str] = None) -> list[str]:
 def get_local_branches(repo_path: Optional[str] = None) -> list[str]:
     """Get list of local branch names."""
     try:
-        repo = Repo(repo_path) if repo_path else Repo()
+        repo = _open_repo(repo_path)
         return [branch.name for branch in repo.branches]
         
-    except InvalidGitRepositoryError:
-        raise GitError("Not in a Git repository")
+    except GitError:
+        raise
     except Exception as e:
         raise GitError(f"Failed to get local branches: {e}")
 
@@ -141,11 +355,11 @@ def get_local_branches(repo_path: Optional[str] = None) -> list[str]:
 def is_clean_working_directory(repo_path: Optional[str] = None) -> bool:
     """Check if the working directory is clean (no uncommitted changes)."""
     try:
-        repo = Repo(repo_path) if repo_path else Repo()
+        repo = _open_repo(repo_path)
         return not repo.is_dirty()
         
-    except InvalidGitRepositoryError:
-        raise GitError("Not in a Git repository")
+    except GitError:
+        raise
     except Exception as e:
         raise GitError(f"Failed to check working directory status: {e}")
 
@@ -153,7 +367,7 @@ def is_clean_working_directory(repo_path: Optional[str] = None) -> bool:
 def get_commit_info(commit_hash: Optional[str] = None, repo_path: Optional[str] = None) -> Dict[str, str]:
     """Get information about a specific commit (or HEAD if not specified)."""
     try:
-        repo = Repo(repo_path) if repo_path else Repo()
+        repo = _open_repo(repo_path)
         
         if commit_hash:
             commit = repo.commit(commit_hash)
@@ -168,7 +382,7 @@ def get_commit_info(commit_hash: Optional[str] = None, repo_path: Optional[str]
             "date": commit.committed_datetime.isoformat()
         }
         
-    except InvalidGitRepositoryError:
-        raise GitError("Not in a Git repository")
+    except GitError:
+        raise
     except Exception as e:
         raise GitError(f"Failed to get commit info: {e}")
\ No newline at end of file
@@ -5,34 +5,17 @@ ABOUTME: Provides consistent styling for success, error, warning, and info messa
 
 import json
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Optional
 from rich.console import Console
 from rich.panel import Panel
 from rich.table import Table
 from rich.text import Text
 from rich.syntax import Syntax
 
-console = Console()
-
-
-def success(message: str) -> None:
-    """Display a success message."""
-    console.print(f"✓ {message}", style="bold green")
-
-
-def error(message: str) -> None:
-    """Display an error message."""
-    console.print(f"✗ {message}", style="bold red")
-
-
-def warning(message: str) -> None:
-    """Display a warning message."""
-    console.print(f"⚠ {message}", style="bold yellow")
+from .render import is_terminal, write_json, write_pull_request_table
+from .status import error, info, success, warning
 
-
-def info(message: str) -> None:
-    """Display an info message."""
-    console.print(f"ℹ {message}", style="bold blue")
+console = Console()
 
 
 def handle_output(data: Any, json_output: bool = False, success_message: Optional[str] = None) -> None:
@@ -45,7 +28,8 @@ def handle_output(data: Any, json_output: bool = False, success_message: Optiona
         success_message: Optional success message for non-JSON output
     """
     if json_output:
-        console.print(json.dumps(data, indent=2, default=str))
+        # Straight to stdout: rich would parse [brackets] in the data as markup
+        write_json(data)
     else:
         if success_message:
             success(success_message)
@@ -165,6 +149,10 @@ def format_pull_request_output(pr_data: Dict[str, Any]) -> None:
 
 def format_pull_request_list(pr_list: list) -> None:
     """Format list of pull requests as a table."""
+    if not is_terminal():
+        write_pull_request_table(pr_list)
+        return
+    
     table = Table(title="Pull Requests")
     table.add_column("ID", style="cyan", width=8)
     table.add_column("Title", style="bold white", min_width=30)
@@ -190,6 +178,52 @@ def format_pull_request_list(pr_list: list) -> None:
     console.print(table)
 
 
+def stream_pull_request_list(pr_iter: Iterable[Dict[str, Any]]) -> int:
+    """
+    Render pull requests one row at a time as they arrive.
+    
+    Columns use fixed widths (the title takes the remaining console width) so rows
+    printed separately still line up.
+    
+    Returns:
+        Number of rows rendered
+    """
+    if not is_terminal():
+        count = write_pull_request_table(pr_iter)
+        if not count:
+            sys.stdout.write("No pull requests found.\n")
+        return count
+    
+    count = 0
+    for pr in pr_iter:
+        table = Table(box=None, show_header=count == 0, header_style="bold", padding=(0, 1), expand=True)
+        table.add_column("ID", style="cyan", width=6, no_wrap=True)
+        table.add_column("Title", style="bold", ratio=1, no_wrap=True, overflow="ellipsis")
+        table.add_column("Author", style="green", width=15, no_wrap=True, overflow="ellipsis")
+        table.add_column("State", style="magenta", width=10, no_wrap=True)
+        table.add_column("Created", style="dim", width=10, no_wrap=True)
+        
+        a = pr.get("author", {}) or {}
+        author_name = a.get("username") or a.get("nickname") or a.get("display_name") or "Unknown"
+        title = pr.get("title", "")
+        if len(title) > 50:
+            title = title[:50] + "..."
+        
+        table.add_row(
+            str(pr.get("id", "")),
+            title,
+            author_name,
+            pr.get("state", ""),
+            (pr.get("created_on") or "")[:10],
+        )
+        console.print(table)
+        count += 1
+    
+    if not count:
+        console.print("No pull requests found.", style="yellow")
+    return count
+
+
 def format_comment_output(comment_data: Dict[str, Any]) -> None:
     """Format single comment for detailed output."""
     user = comment_data.get("user", {})
@@ -269,7 +303,7 @@ def format_activity_output(activity_list: list) -> None:
 
 def print_json(data: Any) -> None:
     """Print data as formatted JSON."""
-    console.print(json.dumps(data, indent=2, default=str))
+    write_json(data)
 
 
 def confirm(message: str, default: bool = False) -> bool:
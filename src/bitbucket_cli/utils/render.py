@@ -0,0 +1,163 @@
+"""
+ABOUTME: Fast output backend: JSON/NDJSON and plain-text tables written straight to stdout
+ABOUTME: Serializes with orjson when installed (the `fast` extra); rich is left to interactive terminals
+"""
+
+import json
+import sys
+import textwrap
+from typing import Any, Dict, Iterable, List, Optional, Sequence, TextIO, Tuple
+
+try:
+    import orjson
+except ImportError:  # Optional: pip install "bitbucket-cli[fast]"
+    orjson = None  # type: ignore[assignment]
+
+
+def is_terminal(stream: Optional[TextIO] = None) -> bool:
+    """Whether output goes to an interactive terminal (the only place rich rendering pays off)."""
+    stream = stream or sys.stdout
+    try:
+        return stream.isatty()
+    except (AttributeError, ValueError):
+        return False
+
+
+def dumps(data: Any, indent: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 JSON bytes, laid out like ``json.dumps(indent=2)`` when ``indent``.
+
+    Values JSON can't represent are converted with str(), as everywhere else in bb.
+    """
+    if orjson is not None:
+        options = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(data, default=str, option=options)
+        except (orjson.JSONEncodeError, TypeError):
+            pass  # e.g. integers beyond 64 bits; the stdlib handles those
+    return json.dumps(data, indent=2 if indent else None, default=str, ensure_ascii=False).encode("utf-8")
+
+
+def _write(data: bytes, stream: Optional[TextIO] = None, flush: bool = False) -> None:
+    """
+    Write bytes to ``stream``'s binary buffer (stdout by default).
+
+    The buffer is only flushed when asked to or when the stream is line buffered
+    (a terminal), so piped output costs one write per buffer-full rather than a
+    syscall per row. Other writers to the same stream must flush their own text
+    first, as click.echo and rich do.
+    """
+    stream = stream or sys.stdout
+    buffer = getattr(stream, "buffer", None)
+    if buffer is not None:
+        buffer.write(data)
+        if flush or getattr(stream, "line_buffering", False):
+            buffer.flush()
+    else:
+        stream.write(data.decode("utf-8"))
+        if flush:
+            stream.flush()
+
+
+def write_json(data: Any, stream: Optional[TextIO] = None) -> None:
+    """Write indented JSON followed by a newline, bypassing any console markup."""
+    _write(dumps(data, indent=True) + b"\n", stream)
+
+
+def write_ndjson(data: Any, stream: Optional[TextIO] = None, flush: bool = False) -> None:
+    """
+    Write one compact JSON line.
+
+    Set ``flush`` when each line must reach a pipe as soon as it is written
+    (e.g. results that trickle in); lines to a terminal are always flushed.
+    """
+    _write(dumps(data) + b"\n", stream, flush)
+
+
+def write_json_array(items: Iterable[Any], stream: Optional[TextIO] = None) -> None:
+    """Write a JSON array item by item, matching the layout of write_json on the whole list."""
+    first = True
+    _write(b"[", stream)
+    for item in items:
+        text = textwrap.indent(dumps(item, indent=True).decode("utf-8"), "  ")
+        _write(("\n" if first else ",\n").encode() + text.encode("utf-8"), stream)
+        first = False
+    _write(b"]\n" if first else b"\n]\n", stream)
+
+
+class TableWriter:
+    """
+    Plain-text table that writes each row as soon as it is added.
+
+    Every column has a maximum width, so rows line up without measuring the data
+    first: shorter cells are padded and longer ones cut with "...". The header is
+    written before the first row. Nothing is styled, which suits pipes and files.
+    """
+
+    def __init__(self, columns: Sequence[Tuple[str, int]], stream: Optional[TextIO] = None, gap: int = 2):
+        """
+        Args:
+            columns: (header, maximum width) pairs
+            stream: Where to write (stdout by default)
+            gap: Spaces between columns
+        """
+        self.columns = list(columns)
+        self.stream = stream
+        self.gap = " " * gap
+        self.rows = 0
+
+    def _line(self, cells: Sequence[Any]) -> str:
+        parts: List[str] = []
+        last = len(self.columns) - 1
+        for i, ((_, width), cell) in enumerate(zip(self.columns, cells)):
+            text = "" if cell is None else str(cell).replace("\n", " ")
+            if len(text) > width:
+                text = text[:width - 3] + "..." if width > 3 else text[:width]
+            parts.append(text if i == last else text.ljust(width))
+        return self.gap.join(parts).rstrip() + "\n"
+
+    def add_row(self, *cells: Any) -> None:
+        """Write one row (the header too, if this is the first)."""
+        text = self._line(cells)
+        if self.rows == 0:
+            text = self._line([header for header, _ in self.columns]) + text
+        _write(text.encode("utf-8"), self.stream)
+        self.rows += 1
+
+
+def write_pull_request_table(
+    pr_iter: Iterable[Dict[str, Any]],
+    repo_column: bool = False,
+    date_field: str = "created_on"
+) -> int:
+    """
+    Write pull requests as a plain-text table, one row as each arrives.
+
+    Used instead of rich when stdout is a pipe or file: no markup parsing, no
+    styling and no table held in memory.
+
+    Args:
+        pr_iter: Pull requests to render
+        repo_column: Add a leading column with the destination repository
+        date_field: "created_on" or "updated_on", shown as the last column
+
+    Returns:
+        Number of rows written
+    """
+    columns = [("ID", 6), ("Title", 53), ("Author", 15), ("State", 10), (date_field.split("_")[0].title(), 10)]
+    if repo_column:
+        columns.insert(0, ("Repo", 30))
+    writer = TableWriter(columns)
+    for pr in pr_iter:
+        a = pr.get("author", {}) or {}
+        row = [
+            pr.get("id", ""),
+            pr.get("title", ""),
+            a.get("username") or a.get("nickname") or a.get("display_name") or "Unknown",
+            pr.get("state", ""),
+            (pr.get(date_field) or "")[:10],
+        ]
+        if repo_column:
+            row.insert(0, ((pr.get("destination") or {}).get("repository") or {}).get("full_name", ""))
+        writer.add_row(*row)
+    return writer.rows
@@ -0,0 +1,26 @@
+"""
+ABOUTME: Lightweight success/error/warning/info status lines printed through click
+ABOUTME: Keeps rich off the startup path for commands that only report a one-line result
+"""
+
+import click
+
+
+def success(message: str) -> None:
+    """Display a success message."""
+    click.secho(f"✓ {message}", fg="green", bold=True)
+
+
+def error(message: str) -> None:
+    """Display an error message."""
+    click.secho(f"✗ {message}", fg="red", bold=True)
+
+
+def warning(message: str) -> None:
+    """Display a warning message."""
+    click.secho(f"⚠ {message}", fg="yellow", bold=True)
+
+
+def info(message: str) -> None:
+    """Display an info message."""
+    click.secho(f"ℹ {message}", fg="blue", bold=True)
@@ -0,0 +1,29 @@
+"""
+ABOUTME: Pytest fixtures shared by the test suite
+ABOUTME: Provides an offline config and API client, keeping tests away from ~/.bitbucket-cli
+"""
+
+import copy
+
+import pytest
+
+from bitbucket_cli.api import BitbucketAPI
+from bitbucket_cli.auth import DEFAULT_CONFIG
+
+
+@pytest.fixture
+def config():
+    """Default config with caching off, a fake base URL and no throttling."""
+    cfg = copy.deepcopy(DEFAULT_CONFIG)
+    cfg["auth"]["repo_token"] = "test-token"
+    cfg["api"].update(base_url="https://api.bitbucket.test/2.0", retries=0, rate_limit=10000, burst=10000)
+    cfg["cache"]["enabled"] = False
+    return cfg
+
+
+@pytest.fixture
+def api(config):
+    """A BitbucketAPI without caches; tests replace ``session`` or ``get`` as needed."""
+    client = BitbucketAPI(config)
+    yield client
+    client.session.close()
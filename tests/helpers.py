@@ -0,0 +1,57 @@
+"""
+ABOUTME: Shared test doubles: canned HTTP responses and a scripted requests session
+ABOUTME: Lets BitbucketAPI run its real request path without touching the network
+"""
+
+import json
+import threading
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+
+def make_response(
+    status: int = 200,
+    body: Any = b"",
+    headers: Optional[Dict[str, str]] = None,
+    url: str = "https://api.bitbucket.test/2.0"
+) -> requests.Response:
+    """Build a fully-read requests.Response; dict/list bodies are sent as JSON."""
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body)
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    response = requests.Response()
+    response.status_code = status
+    response._content = body
+    response._content_consumed = True
+    response.headers.update(headers or {})
+    response.url = url
+    response.elapsed = timedelta(0)
+    return response
+
+
+class FakeSession:
+    """
+    Stand-in for requests.Session that answers from a handler function.
+
+    ``handler(method, url, kwargs)`` returns a Response; every call is recorded
+    in ``calls`` as (method, url, kwargs).
+    """
+
+    def __init__(self, handler: Callable[[str, str, Dict[str, Any]], requests.Response]):
+        self.handler = handler
+        self.calls: List[Tuple[str, str, Dict[str, Any]]] = []
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        with self._lock:
+            self.calls.append((method, url, kwargs))
+        return self.handler(method, url, kwargs)
+
+    def urls(self, method: str = "GET") -> List[str]:
+        return [url for m, url, _ in self.calls if m == method]
+
+    def close(self) -> None:
+        pass
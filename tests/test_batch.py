@@ -0,0 +1,163 @@
+"""
+ABOUTME: Tests for batch mode: NDJSON parsing, dependency planning and concurrent execution
+ABOUTME: Swaps the operation table for recording fakes so no requests are made
+"""
+
+import threading
+import time
+
+import pytest
+
+from bitbucket_cli.commands import batch
+from bitbucket_cli.commands.batch import _plan, parse_operations, run_batch
+
+
+# ─── Parsing ──────────────────────────────────────────────────────────
+
+
+def test_parse_skips_blank_lines_and_comments():
+    ops = parse_operations(['{"op": "pr.view", "pr": 1}', "", "   ", "# a comment", '{"op": "pr.approve", "pr": 2}'])
+
+    assert [op["pr"] for op in ops] == [1, 2]
+
+
+def test_parse_keeps_invalid_lines_as_errors_in_order():
+    ops = parse_operations(['{"op": "pr.view", "pr": 1}', "not json", "[1, 2]"])
+
+    assert ops[0]["op"] == "pr.view"
+    assert ops[1]["op"] is None and ops[1]["_error"].startswith("line 2:")
+    assert ops[2]["_error"] == "line 3: operation must be a JSON object"
+
+
+# ─── Planning ─────────────────────────────────────────────────────────
+
+
+def test_operations_on_the_same_pr_run_in_input_order():
+    ops = [
+        {"op": "pr.approve", "pr": 1},
+        {"op": "pr.approve", "pr": 2},
+        {"op": "pr.merge", "pr": 1},
+        {"op": "pr.comment", "pr": "1", "body": "done"},
+    ]
+
+    _, deps, errors = _plan(ops, "ws", "repo")
+
+    assert deps == [[], [], [0], [2]]
+    assert errors == [None] * 4
+
+
+def test_same_pr_number_in_different_repos_is_independent():
+    ops = [{"op": "pr.approve", "pr": 1}, {"op": "pr.approve", "pr": 1, "repo": "other/repo"}]
+
+    targets, deps, _ = _plan(ops, "ws", "repo")
+
+    assert targets[1] == {"workspace": "other", "repo": "repo"}
+    assert deps == [[], []]
+
+
+def test_after_adds_explicit_dependencies():
+    ops = [
+        {"id": "a", "op": "pr.approve", "pr": 1},
+        {"id": "b", "op": "pr.approve", "pr": 2},
+        {"op": "pr.merge", "pr": 3, "after": ["a", "b"]},
+        {"op": "pr.merge", "pr": 4, "after": "a"},
+    ]
+
+    _, deps, _ = _plan(ops, "ws", "repo")
+
+    assert deps[2] == [0, 1]
+    assert deps[3] == [0]
+
+
+def test_plan_reports_invalid_operations():
+    ops = [
+        {"op": "pr.explode", "pr": 1},
+        {"op": "pr.merge", "pr": 2, "after": "later"},
+        {"id": "later", "op": "pr.approve", "pr": 3},
+    ]
+
+    _, _, errors = _plan(ops, "ws", "repo")
+
+    assert errors[0].startswith("unknown op 'pr.explode'")
+    assert errors[1] == "'after' refers to unknown or later operation 'later'"
+    assert errors[2] is None
+    assert _plan([{"op": "pr.view", "pr": 1}], "", "")[2] == ["no workspace/repo (pass -R or set 'repo' on the operation)"]
+
+
+# ─── Execution ────────────────────────────────────────────────────────
+
+
+@pytest.fixture
+def operations(monkeypatch):
+    """Replace the operation table with fakes recording (op, pr) calls."""
+    calls = []
+    lock = threading.Lock()
+
+    def handler(name):
+        def run(api, ws, repo, op):
+            if op.get("sleep"):
+                time.sleep(op["sleep"])
+            with lock:
+                calls.append((name, op.get("pr")))
+            if op.get("fail"):
+                raise RuntimeError(f"{name} failed")
+            return {"op": name, "repo": f"{ws}/{repo}"}
+        return run
+
+    monkeypatch.setattr(batch, "OPERATIONS", {name: handler(name) for name in ("pr.approve", "pr.merge", "pr.view")})
+    return calls
+
+
+def test_results_come_back_in_input_order(api, operations):
+    ops = [{"op": "pr.view", "pr": 1, "sleep": 0.05}, {"op": "pr.view", "pr": 2}]
+    reported = []
+
+    results = run_batch(api, "ws", "repo", ops, on_result=reported.append)
+
+    assert [r["pr"] for r in results] == [1, 2]
+    assert [r["status"] for r in results] == ["ok", "ok"]
+    assert results[0]["result"] == {"op": "pr.view", "repo": "ws/repo"}
+    # Reported as they complete: the quick one first
+    assert [r["pr"] for r in reported] == [2, 1]
+
+
+def test_independent_operations_run_concurrently(api, operations):
+    ops = [{"op": "pr.view", "pr": n, "sleep": 0.1} for n in range(4)]
+
+    started = time.perf_counter()
+    run_batch(api, "ws", "repo", ops, concurrency=4)
+
+    assert time.perf_counter() - started < 0.3
+
+
+def test_failed_dependency_skips_its_dependents(api, operations):
+    ops = [
+        {"id": "a", "op": "pr.approve", "pr": 1, "fail": True},
+        {"op": "pr.merge", "pr": 1},
+        {"op": "pr.view", "pr": 2, "after": "a"},
+        {"op": "pr.view", "pr": 3},
+    ]
+
+    results = run_batch(api, "ws", "repo", ops)
+
+    assert [r["status"] for r in results] == ["error", "skipped", "skipped", "ok"]
+    assert results[0]["error"] == "pr.approve failed"
+    assert results[0]["error_type"] == "RuntimeError"
+    assert ("pr.merge", 1) not in operations
+
+
+def test_invalid_operation_is_reported_without_running(api, operations):
+    results = run_batch(api, "ws", "repo", parse_operations(["oops", '{"op": "pr.view", "pr": 1}']))
+
+    assert results[0]["status"] == "error"
+    assert results[1]["status"] == "ok"
+    assert operations == [("pr.view", 1)]
+
+
+def test_stop_on_error_skips_operations_not_yet_started(api, operations):
+    ops = [{"op": "pr.approve", "pr": 1, "fail": True}] + [{"op": "pr.view", "pr": n} for n in range(2, 6)]
+
+    results = run_batch(api, "ws", "repo", ops, concurrency=1, stop_on_error=True)
+
+    assert [r["status"] for r in results] == ["error"] + ["skipped"] * 4
+    assert operations == [("pr.approve", 1)]
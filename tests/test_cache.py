@@ -0,0 +1,216 @@
+"""
+ABOUTME: Tests for the on-disk response cache, the immutable diff store and their use by BitbucketAPI
+ABOUTME: Covers cache keys, LRU eviction, ETag revalidation and commit-pair addressed diffs
+"""
+
+import os
+
+import pytest
+
+from bitbucket_cli.api import BitbucketAPI
+from bitbucket_cli.cache import ImmutableCache, ResponseCache, endpoint_ttl
+
+from .helpers import FakeSession, make_response
+
+
+# ─── Keys ─────────────────────────────────────────────────────────────
+
+
+def test_response_key_ignores_param_order_and_none_values():
+    a = ResponseCache.make_key("GET", "https://x/2.0/pr", {"state": "OPEN", "pagelen": 50, "q": None}, "Bearer t")
+    b = ResponseCache.make_key("get", "https://x/2.0/pr", {"pagelen": 50, "state": "OPEN"}, "Bearer t")
+    assert a == b
+
+
+def test_response_key_separates_urls_params_and_credentials():
+    base = ResponseCache.make_key("GET", "https://x/2.0/pr", {"page": 1}, "Bearer t")
+    assert base != ResponseCache.make_key("GET", "https://x/2.0/pr", {"page": 2}, "Bearer t")
+    assert base != ResponseCache.make_key("GET", "https://x/2.0/prs", {"page": 1}, "Bearer t")
+    assert base != ResponseCache.make_key("GET", "https://x/2.0/pr", {"page": 1}, "Bearer other")
+
+
+def test_response_key_never_contains_the_credential():
+    key = ResponseCache.make_key("GET", "https://x/2.0/pr", None, "Bearer secret-token")
+    assert "secret" not in key
+
+
+def test_immutable_key_depends_on_every_part():
+    assert ImmutableCache.make_key("diff", "ws", "repo", "a", "b") != ImmutableCache.make_key("diff", "ws", "repo", "b", "a")
+    assert ImmutableCache.make_key("diff", "ws", "repo", "a", "b") != ImmutableCache.make_key("diffstat", "ws", "repo", "a", "b")
+
+
+def test_endpoint_ttls():
+    assert endpoint_ttl("/users/alice") > 0
+    assert endpoint_ttl("/user") > 0
+    assert endpoint_ttl("/repositories/ws/repo/pullrequests/1") == 0
+
+
+# ─── Disk store ───────────────────────────────────────────────────────
+
+
+def test_store_and_refresh_round_trip(tmp_path):
+    cache = ResponseCache(directory=tmp_path)
+    cache.store("k", "https://x", '{"a": 1}', {"ETag": '"v1"'})
+
+    entry = cache.get("k")
+    assert entry["body"] == '{"a": 1}'
+    assert entry["etag"] == '"v1"'
+    assert cache.get("missing") is None
+
+
+def test_lru_eviction_removes_least_recently_used_first(tmp_path):
+    cache = ImmutableCache(directory=tmp_path, max_bytes=11_000)
+    bodies = {name: os.urandom(3000) for name in "abc"}  # Incompressible: ~3 KB on disk each
+    for i, name in enumerate("abc"):
+        cache.put(name, bodies[name])
+        os.utime(cache._path(name), (1000 + i, 1000 + i))
+    # Reading "a" makes it the most recently used entry
+    assert cache.get("a") == bodies["a"]
+
+    cache.put("d", os.urandom(3000))
+
+    assert cache.get("b") is None
+    assert cache.get("a") == bodies["a"]
+    assert cache.get("c") == bodies["c"]
+    assert cache.stats()["size_bytes"] <= 11_000
+
+
+def test_clear_removes_every_entry(tmp_path):
+    cache = ImmutableCache(directory=tmp_path)
+    cache.put("a", b"x")
+    cache.put("b", b"y")
+
+    assert cache.clear() == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_tee_stores_only_complete_streams(tmp_path):
+    cache = ImmutableCache(directory=tmp_path)
+
+    assert b"".join(cache.tee("full", [b"ab", b"cd"])) == b"abcd"
+    with cache.open("full") as f:
+        assert f.read() == b"abcd"
+
+    partial = cache.tee("partial", iter([b"ab", b"cd"]))
+    next(partial)
+    partial.close()
+    assert cache.open("partial") is None
+
+    assert b"".join(cache.tee("rejected", [b"x"], keep=lambda: False)) == b"x"
+    assert cache.open("rejected") is None
+    assert not [p for p in tmp_path.iterdir() if p.suffix == ".tmp"]
+
+
+# ─── BitbucketAPI integration ─────────────────────────────────────────
+
+
+@pytest.fixture
+def cached_api(config, tmp_path):
+    config["cache"]["enabled"] = True
+    client = BitbucketAPI(config)
+    client.cache = ResponseCache(directory=tmp_path / "responses")
+    client.diff_cache = ImmutableCache(directory=tmp_path / "immutable")
+    return client
+
+
+def test_get_revalidates_with_etag_and_serves_304_from_cache(cached_api):
+    def handler(method, url, kwargs):
+        if kwargs["headers"].get("If-None-Match") == '"v1"':
+            return make_response(304, headers={"ETag": '"v1"'})
+        return make_response(200, {"id": 7}, headers={"ETag": '"v1"'})
+
+    cached_api.session = FakeSession(handler)
+
+    assert cached_api.get("/repositories/ws/repo/pullrequests/7") == {"id": 7}
+    assert cached_api.get("/repositories/ws/repo/pullrequests/7") == {"id": 7}
+    sent = [kwargs["headers"].get("If-None-Match") for _, _, kwargs in cached_api.session.calls]
+    assert sent == [None, '"v1"']
+
+
+def test_fresh_entries_are_served_without_a_request(cached_api):
+    cached_api.session = FakeSession(lambda m, u, k: make_response(200, {"nickname": "alice"}))
+
+    cached_api.get("/users/alice")
+    cached_api.get("/users/alice")
+
+    assert len(cached_api.session.calls) == 1
+
+
+def _pr_payload(source="aaa", destination="bbb"):
+    return {
+        "id": 1,
+        "source": {"commit": {"hash": source}},
+        "destination": {"commit": {"hash": destination}},
+    }
+
+
+def test_diff_is_cached_by_commit_pair(cached_api):
+    state = {"source": "aaa"}
+
+    def handler(method, url, kwargs):
+        if url.endswith("/diff"):
+            return make_response(200, f"diff of {state['source']}\n", headers={"Content-Type": "text/plain"})
+        return make_response(200, _pr_payload(state["source"]))
+
+    cached_api.session = FakeSession(handler)
+    assert cached_api.get_diff("ws", "repo", 1) == "diff of aaa\n"
+
+    # A fresh client (new command) hits the diff cache
+    second = BitbucketAPI(cached_api.config)
+    second.cache, second.diff_cache = cached_api.cache, cached_api.diff_cache
+    second.session = FakeSession(handler)
+    assert second.get_diff("ws", "repo", 1) == "diff of aaa\n"
+    assert not [u for u in second.session.urls() if u.endswith("/diff")]
+
+    # New commits on the PR address a different entry
+    state["source"] = "ccc"
+    third = BitbucketAPI(cached_api.config)
+    third.cache, third.diff_cache = cached_api.cache, cached_api.diff_cache
+    third.session = FakeSession(handler)
+    assert third.get_diff("ws", "repo", 1) == "diff of ccc\n"
+
+
+def test_diff_lookups_reuse_the_commit_pair(cached_api):
+    def handler(method, url, kwargs):
+        if url.endswith("/diffstat"):
+            return make_response(200, {"values": [{"status": "modified"}], "pagelen": 500, "size": 1, "page": 1})
+        if url.endswith("/diff"):
+            return make_response(200, "diff\n")
+        return make_response(200, _pr_payload())
+
+    cached_api.session = FakeSession(handler)
+    cached_api.get_diff("ws", "repo", 1)
+    cached_api.get_diffstat("ws", "repo", 1)
+    pr_fetches = len([u for u in cached_api.session.urls() if u.endswith("/pullrequests/1")])
+
+    cached_api.get_diff("ws", "repo", 1)
+    cached_api.get_diffstat("ws", "repo", 1)
+
+    # Warm lookups neither download again nor refetch the PR
+    assert len([u for u in cached_api.session.urls() if u.endswith("/pullrequests/1")]) == pr_fetches
+    assert len(cached_api.session.calls) == pr_fetches + 2
+
+
+def test_writes_forget_remembered_commit_pairs(cached_api):
+    cached_api.session = FakeSession(lambda m, u, k: make_response(200, _pr_payload()))
+    cached_api.get_pull_request("ws", "repo", 1)
+    assert cached_api.commit_pairs == {("ws", "repo", 1): ("aaa", "bbb")}
+
+    cached_api.post("/repositories/ws/repo/pullrequests/1/merge", json={})
+
+    assert cached_api.commit_pairs == {}
+
+
+def test_diff_body_is_not_kept_if_the_pr_moved_while_downloading(cached_api):
+    fetches = {"pr": 0}
+
+    def handler(method, url, kwargs):
+        if url.endswith("/diff"):
+            return make_response(200, "old diff\n")
+        fetches["pr"] += 1
+        return make_response(200, _pr_payload("aaa" if fetches["pr"] == 1 else "ddd"))
+
+    cached_api.session = FakeSession(handler)
+    cached_api.get_diff("ws", "repo", 1)
+
+    assert cached_api.diff_cache.stats()["entries"] == 0
@@ -0,0 +1,83 @@
+"""
+ABOUTME: Tests for loading config.yaml through the JSON snapshot that skips the YAML parser
+ABOUTME: Points the config paths at a temporary directory so ~/.bitbucket-cli is never touched
+"""
+
+import json
+
+import pytest
+
+from bitbucket_cli import auth
+from bitbucket_cli.auth import CONFIG_FILE, load_config
+
+
+@pytest.fixture
+def config_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(auth, "CONFIG_DIR", tmp_path)
+    monkeypatch.setattr(auth, "CONFIG_FILE", tmp_path / CONFIG_FILE.name)
+    monkeypatch.setattr(auth, "CONFIG_SNAPSHOT_FILE", tmp_path / "config.cache.json")
+    monkeypatch.setattr(auth, "_config_cache", None)
+    return tmp_path
+
+
+def write_config(config_dir, auth_lines):
+    (config_dir / "config.yaml").write_text("auth:\n" + "".join(f"  {line}\n" for line in auth_lines) + "api:\n  timeout: 5\n")
+
+
+def load_from_snapshot(monkeypatch):
+    """Load again as a new process would, failing if the YAML is parsed."""
+    monkeypatch.setattr(auth, "_config_cache", None)
+    monkeypatch.setattr(auth, "_write_snapshot", lambda *args: pytest.fail("snapshot was rewritten"))
+    return load_config()
+
+
+def test_snapshot_never_contains_secrets(config_dir):
+    write_config(config_dir, ["app_password: hunter2", "username: alice"])
+
+    assert load_config()["auth"]["app_password"] == "hunter2"
+
+    text = (config_dir / "config.cache.json").read_text()
+    snapshot = json.loads(text)
+    assert "hunter2" not in text
+    assert snapshot["config"]["auth"]["app_password"] is None
+    assert snapshot["config"]["auth"]["username"] == "alice"
+
+
+@pytest.mark.parametrize("line, value", [
+    ("repo_token: plain-token", "plain-token"),
+    ('app_password: "x"', "x"),
+    ("app_password: 'it''s secret'", "it's secret"),
+    ('oauth_token: "two words"  ', "two words"),
+])
+def test_secrets_are_read_back_without_parsing_the_yaml(config_dir, monkeypatch, line, value):
+    write_config(config_dir, [line])
+    field = line.partition(":")[0]
+    assert load_config()["auth"][field] == value
+
+    config = load_from_snapshot(monkeypatch)
+
+    assert config["auth"][field] == value
+    assert config["api"]["timeout"] == 5
+
+
+def test_unusual_secrets_fall_back_to_the_yaml(config_dir, monkeypatch):
+    write_config(config_dir, ['app_password: "tab\\there"'])
+    load_config()
+    monkeypatch.setattr(auth, "_config_cache", None)
+
+    assert load_config()["auth"]["app_password"] == "tab\there"
+
+
+def test_an_edited_secret_is_not_served_from_the_snapshot(config_dir, monkeypatch):
+    write_config(config_dir, ["app_password: old"])
+    load_config()
+    snapshot = (config_dir / "config.cache.json").read_text()
+
+    write_config(config_dir, ["app_password: new"])
+    # Same signature as the snapshot: only the secret's hash tells them apart
+    signature = auth._file_signature(config_dir / "config.yaml")
+    data = json.loads(snapshot)
+    data["source"] = list(signature)
+    (config_dir / "config.cache.json").write_text(json.dumps(data))
+
+    assert auth._read_snapshot(signature) is None
@@ -0,0 +1,175 @@
+"""
+ABOUTME: Tests for the daemon's wire protocol, local-only routing and stdin fallback
+ABOUTME: Runs commands through Daemon._run_command over a socketpair with a stand-in click CLI
+"""
+
+import json
+import os
+import socket
+import sys
+
+import click
+import pytest
+
+from bitbucket_cli import cli as cli_module
+from bitbucket_cli import daemon
+from bitbucket_cli.daemon import (
+    _EXIT,
+    _FALLBACK,
+    _STDERR,
+    _STDOUT,
+    Daemon,
+    _recv_frame,
+    _send_frame,
+    forward_to_daemon,
+    runs_locally,
+)
+
+
+@pytest.fixture
+def pair():
+    server, client = socket.socketpair()
+    client.settimeout(5)
+    yield server, client
+    server.close()
+    client.close()
+
+
+def frames(sock):
+    """Every frame sent so far, as (kind, text)."""
+    sock.setblocking(False)
+    received = []
+    try:
+        while True:
+            kind, payload = _recv_frame(sock)
+            if kind is None:
+                break
+            received.append((kind, payload.decode()))
+    except BlockingIOError:
+        pass
+    return received
+
+
+def test_frames_round_trip(pair):
+    server, client = pair
+    _send_frame(server, _STDOUT, b"hello\n")
+    _send_frame(server, _EXIT, json.dumps({"code": 3}).encode())
+    _send_frame(server, _FALLBACK)
+
+    assert _recv_frame(client) == (_STDOUT, b"hello\n")
+    assert json.loads(_recv_frame(client)[1]) == {"code": 3}
+    assert _recv_frame(client) == (_FALLBACK, b"")
+    server.close()
+    assert _recv_frame(client) == (None, b"")
+
+
+@pytest.mark.parametrize("argv, local", [
+    (["pr", "list"], False),
+    (["-R", "auth", "pr", "view", "1"], False),
+    (["auth", "login"], True),
+    (["--json", "batch"], True),
+    (["daemon", "status"], True),
+    (["pr", "create", "-t", "X"], True),
+    (["pr", "create", "-t", "X", "-d", ""], True),
+    (["pr", "create", "-t", "X", "-d", "why"], False),
+    (["pr", "create", "--title=X", "-bwhy"], False),
+    (["pr", "create", "--template", "t.md"], True),
+    (["pr", "comment", "5"], True),
+    (["pr", "comment", "5", "-m", "ok"], False),
+    (["-w", "ws", "pr", "comment", "5", "--body=ok"], False),
+    ([], False),
+])
+def test_runs_locally(argv, local):
+    assert runs_locally(argv) is local
+
+
+def test_prompting_commands_are_never_forwarded(monkeypatch):
+    monkeypatch.delenv("BB_NO_DAEMON", raising=False)
+
+    def connect(timeout=None):
+        raise AssertionError("should not contact the daemon")
+
+    monkeypatch.setattr(daemon, "_connect", connect)
+
+    assert forward_to_daemon(["pr", "create", "-t", "X"]) is None
+    assert forward_to_daemon(["pr", "comment", "5"]) is None
+
+
+@pytest.fixture
+def fake_cli(monkeypatch):
+    """Replace the real CLI with commands that print and prompt."""
+
+    @click.group()
+    def group():
+        pass
+
+    @group.command()
+    def hello():
+        click.echo("hello")
+        click.echo("oops", err=True)
+
+    @group.command()
+    def ask():
+        click.prompt("Name")
+
+    @group.command("status-then-ask")
+    def status_then_ask():
+        click.echo("Using current branch: main")
+        click.prompt("Title")
+
+    @group.command()
+    def fail():
+        raise SystemExit(4)
+
+    monkeypatch.setattr(cli_module, "cli", group)
+
+
+def run(pair, argv, tmp_path):
+    server, client = pair
+    code, fallback = Daemon()._run_command(server, {"argv": argv, "cwd": str(tmp_path), "env": {}, "isatty": {}})
+    return code, fallback, frames(client)
+
+
+def test_output_is_framed_per_stream(pair, fake_cli, tmp_path):
+    code, fallback, sent = run(pair, ["hello"], tmp_path)
+
+    assert (code, fallback) == (0, False)
+    assert sent == [(_STDOUT, "hello\n"), (_STDERR, "oops\n")]
+
+
+def test_exit_codes_are_returned(pair, fake_cli, tmp_path):
+    assert run(pair, ["fail"], tmp_path)[:2] == (4, False)
+
+
+def test_prompt_before_any_output_falls_back_silently(pair, fake_cli, tmp_path):
+    code, fallback, sent = run(pair, ["ask"], tmp_path)
+
+    assert fallback is True
+    assert sent == []
+
+
+def test_prompt_after_output_fails_without_a_dangling_prompt(pair, fake_cli, tmp_path):
+    code, fallback, sent = run(pair, ["status-then-ask"], tmp_path)
+
+    assert (code, fallback) == (1, False)
+    assert (_STDOUT, "Using current branch: main\n") in sent
+    assert not any("Title" in text for _, text in sent)
+    assert "rerun with BB_NO_DAEMON=1" in sent[-1][1]
+
+
+def test_process_state_is_restored(pair, fake_cli, tmp_path):
+    cwd, stdout = os.getcwd(), sys.stdout
+    server, _ = pair
+    Daemon()._run_command(server, {"argv": ["hello"], "cwd": str(tmp_path), "env": {"BITBUCKET_X": "1"}, "isatty": {}})
+
+    assert os.getcwd() == cwd
+    assert sys.stdout is stdout
+    assert "BITBUCKET_X" not in os.environ
+
+
+def test_commands_cannot_overlap(pair):
+    busy = Daemon()
+    busy._in_command = True
+
+    with pytest.raises(RuntimeError):
+        busy._run_command(pair[0], {"argv": [], "cwd": "/", "env": {}, "isatty": {}})
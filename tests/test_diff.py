@@ -0,0 +1,293 @@
+"""
+ABOUTME: Tests for streaming diff parsing, the per-file line index and diffstat summaries
+ABOUTME: Feeds hand-written unified diffs through iter_lines, parse_diff and DiffIndex
+"""
+
+import click
+import pytest
+
+from bitbucket_cli.commands.diff import PATH_QUERY_BUDGET, _path_batches, select_diffstat, summarize_diffstat
+from bitbucket_cli.utils import diff as diff_module
+from bitbucket_cli.utils.diff import DiffIndex, FileHeader, Hunk, iter_lines, parse_diff, render_diff
+
+DIFF = """\
+diff --git a/src/app.py b/src/app.py
+index 1111111..2222222 100644
+--- a/src/app.py
++++ b/src/app.py
+@@ -1,4 +1,5 @@ def main():
+ import os
+-import sys
++import sys, re
++import json
+
+ def main():
+@@ -20,3 +21,2 @@ class App:
+ a = 1
+-b = 2
+ c = 3
+diff --git a/docs/new.md b/docs/new.md
+new file mode 100644
+index 0000000..3333333
+--- /dev/null
++++ b/docs/new.md
+@@ -0,0 +1,2 @@
++# Title
++text
+\\ No newline at end of file
+diff --git a/old.txt b/old.txt
+deleted file mode 100644
+index 4444444..0000000
+--- a/old.txt
++++ /dev/null
+@@ -1 +0,0 @@
+-gone
+diff --git a/lib/a.py b/lib/b.py
+similarity index 90%
+rename from lib/a.py
+rename to lib/b.py
+index 5555555..6666666 100644
+--- a/lib/a.py
++++ b/lib/b.py
+@@ -3,1 +3,1 @@
+-x = 1
++x = 2
+diff --git a/logo.png b/logo.png
+index 7777777..8888888 100644
+Binary files a/logo.png and b/logo.png differ
+"""
+
+
+def chunks(text, size):
+    data = text.encode("utf-8")
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+# ─── Streaming ────────────────────────────────────────────────────────
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 4096])
+def test_iter_lines_reassembles_split_chunks(size):
+    text = "first line\nsecond – ünïcode ✓\n\nlast without newline"
+
+    assert list(iter_lines(chunks(text, size))) == text.split("\n")
+
+
+def test_iter_lines_drops_only_the_final_newline():
+    assert list(iter_lines([b"a\nb\n"])) == ["a", "b"]
+    assert list(iter_lines([b"", b"a", b"", b"\n"])) == ["a"]
+    assert list(iter_lines([])) == []
+
+
+def test_iter_lines_replaces_invalid_utf8():
+    assert list(iter_lines([b"ok\xff\n"])) == ["ok�"]
+
+
+def test_parsing_is_incremental():
+    consumed = []
+
+    def lines():
+        for line in DIFF.split("\n"):
+            consumed.append(line)
+            yield line
+
+    events = parse_diff(lines())
+    first = next(events)
+
+    assert isinstance(first, FileHeader) and first.path == "src/app.py"
+    # The first file's header is emitted on reaching its first hunk
+    assert len(consumed) == 5
+
+
+# ─── Parsing ──────────────────────────────────────────────────────────
+
+
+def parse(text=DIFF):
+    return list(parse_diff(iter_lines(chunks(text, 5))))
+
+
+def test_file_headers_and_statuses():
+    headers = [e for e in parse() if isinstance(e, FileHeader)]
+
+    assert [(h.path, h.status) for h in headers] == [
+        ("src/app.py", "modified"),
+        ("docs/new.md", "added"),
+        ("old.txt", "removed"),
+        ("lib/b.py", "renamed"),
+        ("logo.png", "modified"),
+    ]
+    assert headers[3].old_path == "lib/a.py"
+    assert [h.binary for h in headers] == [False, False, False, False, True]
+    assert headers[0].lines[0] == "diff --git a/src/app.py b/src/app.py"
+
+
+def test_hunks_carry_their_ranges_and_lines():
+    hunks = [e for e in parse() if isinstance(e, Hunk)]
+
+    first = hunks[0]
+    assert (first.path, first.old_start, first.old_count, first.new_start, first.new_count) == ("src/app.py", 1, 4, 1, 5)
+    assert first.section == "def main():"
+    assert first.lines == [" import os", "-import sys", "+import sys, re", "+import json", "", " def main():"]
+    assert (hunks[1].old_start, hunks[1].new_start) == (20, 21)
+    assert hunks[2].lines[-1] == "\\ No newline at end of file"
+    assert hunks[3].new_count == 0
+
+
+def test_long_hunks_are_split_into_pieces(monkeypatch):
+    monkeypatch.setattr(diff_module, "MAX_HUNK_LINES", 3)
+    body = "".join(f"+line {n}\n" for n in range(1, 9))
+    text = f"diff --git a/big b/big\n--- a/big\n+++ b/big\n@@ -0,0 +1,8 @@\n{body}"
+
+    pieces = [e for e in parse(text) if isinstance(e, Hunk)]
+
+    assert [len(p.lines) for p in pieces] == [3, 3, 2]
+    assert [p.header is not None for p in pieces] == [True, False, False]
+    assert [p.new_start for p in pieces] == [1, 4, 7]
+    big = DiffIndex.build(parse_diff(text.split("\n"))).get("big")
+    assert big.new_ranges() == [(1, 8)]
+    assert all(big.has_new_line(n) for n in range(1, 9))
+
+
+def test_preamble_before_the_first_file_is_ignored():
+    text = "From abc Mon Sep 17 00:00:00 2001\nSubject: [PATCH] x\n\n" + DIFF
+
+    assert len(parse(text)) == len(parse())
+
+
+def test_render_diff_reproduces_the_text():
+    rendered = click.unstyle("".join(render_diff(parse_diff(DIFF.split("\n")))))
+
+    assert rendered.rstrip("\n") == DIFF.rstrip("\n")
+
+
+# ─── Line index ───────────────────────────────────────────────────────
+
+
+@pytest.fixture(scope="module")
+def index():
+    return DiffIndex.build(parse_diff(iter_lines(chunks(DIFF, 11))))
+
+
+def test_index_lookup_by_new_and_old_path(index):
+    assert "src/app.py" in index
+    assert index.get("lib/a.py") is index.get("lib/b.py")
+    assert index.get("old.txt").status == "removed"
+    assert index.get("missing.py") is None
+    assert [f.path for f in index.files] == ["src/app.py", "docs/new.md", "old.txt", "lib/b.py", "logo.png"]
+
+
+def test_commentable_lines(index):
+    app = index.get("src/app.py")
+
+    assert [n for n in range(1, 30) if app.has_new_line(n)] == [1, 2, 3, 4, 5, 21, 22]
+    assert [n for n in range(1, 30) if app.has_old_line(n)] == [1, 2, 3, 4, 20, 21, 22]
+    assert app.new_ranges() == [(1, 5), (21, 22)]
+
+
+def test_line_mapping_between_old_and_new(index):
+    app = index.get("src/app.py")
+
+    assert app.old_line_for(1) == 1       # context
+    assert app.old_line_for(2) is None    # added
+    assert app.old_line_for(4) == 3       # context after the change
+    assert app.old_line_for(22) == 22
+    assert app.new_line_for(2) is None    # removed
+    assert app.new_line_for(4) == 5
+    assert app.new_line_for(21) is None
+    assert app.new_line_for(100) is None
+
+
+def test_added_removed_and_binary_files(index):
+    assert index.get("docs/new.md").new_ranges() == [(1, 2)]
+    assert index.get("old.txt").new_ranges() == []
+    assert index.get("old.txt").has_old_line(1)
+    assert index.get("logo.png").binary
+    assert index.get("logo.png").new_ranges() == []
+
+
+# ─── Diffstat ─────────────────────────────────────────────────────────
+
+
+def stat(status, new=None, old=None, added=0, removed=0):
+    return {
+        "status": status,
+        "new": {"path": new} if new else None,
+        "old": {"path": old} if old else None,
+        "lines_added": added,
+        "lines_removed": removed,
+    }
+
+
+DIFFSTAT = [
+    stat("modified", "src/app.py", "src/app.py", 10, 2),
+    stat("added", "src/util/new.py", added=40),
+    stat("removed", old="README.old", removed=5),
+    stat("renamed", "lib/b.py", "lib/a.py"),
+    stat("modified", "assets/logo.png", "assets/logo.png"),
+    stat("modified", "src/gen/big.py", "src/gen/big.py", 300, 300),
+]
+
+
+def test_summarize_totals_and_statuses():
+    summary = summarize_diffstat(DIFFSTAT)
+
+    assert summary["totals"] == {"files": 6, "lines_added": 350, "lines_removed": 307}
+    assert summary["statuses"] == {"modified": 3, "added": 1, "removed": 1, "renamed": 1}
+    assert summary["binary"] == 1
+    assert summary["renamed"] == 1
+
+
+def test_summarize_directories_and_largest():
+    summary = summarize_diffstat(DIFFSTAT, top=2)
+
+    assert [d["path"] for d in summary["directories"]] == ["src", ".", "lib", "assets"]
+    assert summary["directories"][0] == {"path": "src", "files": 3, "lines_added": 350, "lines_removed": 302}
+    assert [f["path"] for f in summary["largest"]] == ["src/gen/big.py", "src/util/new.py"]
+
+    deeper = summarize_diffstat(DIFFSTAT, depth=2)
+    assert {d["path"] for d in deeper["directories"]} >= {"src/gen", "src/util", "src"}
+    assert summarize_diffstat(DIFFSTAT, top=0)["largest"] == []
+
+
+def test_summarize_accepts_a_stream():
+    assert summarize_diffstat(iter(DIFFSTAT))["totals"]["files"] == 6
+
+
+def test_select_diffstat_patterns():
+    def paths(**kwargs):
+        return [e["new"]["path"] if e["new"] else e["old"]["path"] for e in select_diffstat(DIFFSTAT, **kwargs)]
+
+    assert paths(files=["src/"]) == ["src/app.py", "src/util/new.py", "src/gen/big.py"]
+    assert paths(files=["*.py"]) == ["src/app.py", "src/util/new.py", "lib/b.py", "src/gen/big.py"]
+    assert paths(files=["lib/a.py"]) == ["lib/b.py"]  # matched by its old path
+    assert paths(files=["src/"], exclude=["src/gen/"]) == ["src/app.py", "src/util/new.py"]
+    assert len(paths()) == len(DIFFSTAT)
+
+
+def test_path_batches_fit_the_query_budget():
+    paths = [f"some/fairly/long/directory/file_{n:04}.py" for n in range(500)]
+
+    batches = list(_path_batches(paths))
+
+    assert [p for batch in batches for p in batch] == paths
+    assert len(batches) > 1
+    assert all(sum(len(p) + len("&path=") for p in batch) <= PATH_QUERY_BUDGET for batch in batches)
+    assert list(_path_batches([])) == []
+
+
+def test_path_filtered_and_streamed_diffs_index_identically(api, monkeypatch):
+    from bitbucket_cli.commands import diff as diff_command
+
+    # A form feed, a lone CR and a Unicode line separator inside diff lines
+    text = (
+        "diff --git a/page.txt b/page.txt\n--- a/page.txt\n+++ b/page.txt\n"
+        "@@ -1,2 +1,3 @@\n one\x0cpage\n+two\rstill two\n three end\n"
+    )
+    monkeypatch.setattr(diff_command, "path_diffs", lambda *args: [text])
+    monkeypatch.setattr(api, "iter_diff", lambda *args: iter(chunks(text, 4)))
+
+    filtered = DiffIndex.build(diff_command.iter_diff_pr(api, "ws", "repo", 1, files=["page.txt"])).get("page.txt")
+    streamed = DiffIndex.build(diff_command.iter_diff_pr(api, "ws", "repo", 1)).get("page.txt")
+
+    assert list(filtered.new_lines) == list(streamed.new_lines) == [1, 2, 3]
+    assert list(filtered.old_lines) == list(streamed.old_lines) == [1, 2]
@@ -0,0 +1,62 @@
+"""
+ABOUTME: Tests for the BBQL query built from pr list filters and validation of its date options
+ABOUTME: Checks string values are quoted, dates normalized, and malformed input rejected before any request
+"""
+
+import pytest
+from click.testing import CliRunner
+
+from bitbucket_cli.api import BitbucketAPI
+from bitbucket_cli.cli import cli
+from bitbucket_cli.exceptions import ValidationError
+from bitbucket_cli.utils.dates import normalize_timestamp
+
+
+def query(**filters):
+    return BitbucketAPI._pull_request_params(**filters).get("q")
+
+
+def test_filters_are_joined_with_and():
+    assert query(source_branch="feat/x", destination_branch="main", draft=False) == (
+        'source.branch.name="feat/x" AND destination.branch.name="main" AND draft = false'
+    )
+
+
+def test_string_values_are_quoted_and_escaped():
+    assert query(title_contains='say "hi" \\o/') == 'title ~ "say \\"hi\\" \\\\o/"'
+    assert query(author='x" OR state="MERGED') == 'author.username="x\\" OR state=\\"MERGED"'
+
+
+def test_dates_are_normalized_to_utc():
+    assert query(updated_since="2024-01-31") == "updated_on >= 2024-01-31T00:00:00+00:00"
+    assert query(updated_before="2024-01-31T10:00:00+02:00") == "updated_on < 2024-01-31T08:00:00+00:00"
+    assert query(created_since="2024-01-31T10:00:00Z", created_before="2024-02-01") == (
+        "created_on >= 2024-01-31T10:00:00+00:00 AND created_on < 2024-02-01T00:00:00+00:00"
+    )
+
+
+@pytest.mark.parametrize("value", ['2024-01-01 OR state="MERGED"', "2024-13-01", "yesterday", " "])
+def test_malformed_dates_never_reach_the_query(value):
+    with pytest.raises(ValidationError):
+        query(updated_since=value)
+
+
+def test_other_params_pass_through():
+    params = BitbucketAPI._pull_request_params(state="OPEN", pagelen=50, sort="-updated_on", fields="values.id")
+
+    assert params == {"state": "OPEN", "pagelen": 50, "sort": "-updated_on", "fields": "values.id,next,page,pagelen,size"}
+    assert "q" not in params
+
+
+def test_normalized_timestamps_compare_with_api_values():
+    # Mirror searches compare as strings against Bitbucket's own timestamps
+    assert normalize_timestamp("2024-01-31T12:00:00.5+01:00") == "2024-01-31T11:00:00.500000+00:00"
+    assert normalize_timestamp("2024-01-31") < "2024-01-31T00:00:00.000001+00:00"
+
+
+@pytest.mark.parametrize("option", ["--updated-after", "--updated-before"])
+def test_cli_rejects_malformed_dates(option):
+    result = CliRunner().invoke(cli, ["pr", "list", option, '2024-01-01 OR state="MERGED"'])
+
+    assert result.exit_code == 2
+    assert "not an ISO 8601 date" in result.output
@@ -0,0 +1,193 @@
+"""
+ABOUTME: Tests for the native .git reader behind branch and repository detection
+ABOUTME: Builds minimal git directories by hand so no git binary is needed
+"""
+
+import pytest
+
+from bitbucket_cli.exceptions import GitError
+from bitbucket_cli.utils import git
+from bitbucket_cli.utils.git import (
+    _parse_config,
+    _read_repository,
+    _Unsupported,
+    get_current_branch,
+    get_git_root,
+    get_repository_info,
+    is_git_repository,
+    parse_git_remote_url,
+)
+
+ORIGIN = '[remote "origin"]\n\turl = git@bitbucket.org:team/service.git\n\tfetch = +refs/heads/*:refs/remotes/origin/*\n'
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    monkeypatch.delenv("GIT_WORK_TREE", raising=False)
+    git._repo_cache.clear()
+    yield
+    git._repo_cache.clear()
+
+
+def make_repo(root, head="ref: refs/heads/main", config=ORIGIN):
+    """Create a working tree with a minimal .git directory."""
+    git_dir = root / ".git"
+    (git_dir / "objects").mkdir(parents=True)
+    (git_dir / "refs" / "heads").mkdir(parents=True)
+    (git_dir / "HEAD").write_text(head + "\n")
+    (git_dir / "config").write_text(config)
+    return git_dir
+
+
+def test_reads_branch_and_remote(tmp_path):
+    make_repo(tmp_path)
+
+    assert get_current_branch(str(tmp_path)) == "main"
+    assert get_repository_info(str(tmp_path)) == {"workspace": "team", "repo": "service"}
+    assert get_git_root(str(tmp_path)) == tmp_path
+    assert is_git_repository(str(tmp_path))
+
+
+def test_finds_the_repository_from_a_subdirectory(tmp_path):
+    make_repo(tmp_path, head="ref: refs/heads/feature/login")
+    nested = tmp_path / "src" / "pkg"
+    nested.mkdir(parents=True)
+
+    assert get_current_branch(str(nested)) == "feature/login"
+    assert get_git_root(str(nested)) == tmp_path
+
+
+def test_detached_head_returns_the_short_hash(tmp_path):
+    make_repo(tmp_path, head="0123456789abcdef0123456789abcdef01234567")
+
+    assert get_current_branch(str(tmp_path)) == "01234567"
+
+
+def test_outside_a_repository(tmp_path):
+    assert not is_git_repository(str(tmp_path))
+    with pytest.raises(GitError):
+        get_current_branch(str(tmp_path))
+
+
+def test_prefers_origin_then_the_first_remote(tmp_path):
+    make_repo(tmp_path, config=(
+        '[remote "upstream"]\n\turl = https://bitbucket.org/upstream/service.git\n'
+        '[remote "origin"]\n\turl = https://me@bitbucket.org/me/service\n'
+    ))
+    assert get_repository_info(str(tmp_path)) == {"workspace": "me", "repo": "service"}
+
+    other = tmp_path / "other"
+    other.mkdir()
+    make_repo(other, config='[remote "fork"]\n\turl = https://bitbucket.org/fork/service.git\n')
+    assert get_repository_info(str(other)) == {"workspace": "fork", "repo": "service"}
+
+
+def test_no_remotes(tmp_path):
+    make_repo(tmp_path, config="[core]\n\tbare = false\n")
+
+    with pytest.raises(GitError, match="No Git remotes"):
+        get_repository_info(str(tmp_path))
+
+
+def test_edits_to_head_invalidate_the_cache(tmp_path):
+    git_dir = make_repo(tmp_path)
+    assert get_current_branch(str(tmp_path)) == "main"
+
+    (git_dir / "HEAD").write_text("ref: refs/heads/a-much-longer-branch\n")
+
+    assert get_current_branch(str(tmp_path)) == "a-much-longer-branch"
+
+
+def test_linked_worktree_shares_the_main_config(tmp_path):
+    main = tmp_path / "main"
+    main.mkdir()
+    git_dir = make_repo(main)
+    worktree_dir = git_dir / "worktrees" / "wt"
+    worktree_dir.mkdir(parents=True)
+    (worktree_dir / "HEAD").write_text("ref: refs/heads/hotfix\n")
+    (worktree_dir / "commondir").write_text("../..\n")
+    checkout = tmp_path / "wt"
+    checkout.mkdir()
+    (checkout / ".git").write_text(f"gitdir: {worktree_dir}\n")
+
+    assert get_current_branch(str(checkout)) == "hotfix"
+    assert get_repository_info(str(checkout)) == {"workspace": "team", "repo": "service"}
+    assert get_git_root(str(checkout)) == checkout
+
+
+def test_git_dir_environment_variable(tmp_path, monkeypatch):
+    git_dir = make_repo(tmp_path / "repo")
+    monkeypatch.setenv("GIT_DIR", str(git_dir))
+
+    assert get_current_branch(str(tmp_path)) == "main"
+
+
+@pytest.mark.parametrize("config", [
+    '[include]\n\tpath = extra.config\n' + ORIGIN,
+    '[includeIf "gitdir:~/work/"]\n\tpath = work.config\n' + ORIGIN,
+    '[extensions]\n\trefStorage = reftable\n' + ORIGIN,
+])
+def test_layouts_the_reader_does_not_handle(tmp_path, config):
+    make_repo(tmp_path, config=config)
+
+    with pytest.raises(_Unsupported):
+        _read_repository(str(tmp_path))
+
+
+def test_symbolic_ref_outside_heads_is_unsupported(tmp_path):
+    make_repo(tmp_path, head="ref: refs/remotes/origin/main")
+
+    with pytest.raises(_Unsupported):
+        _read_repository(str(tmp_path))
+
+
+def test_config_values_are_unquoted_and_comments_dropped():
+    config = _parse_config(
+        "# leading comment\n"
+        '[remote "my \\"odd\\" name"]\n'
+        '\turl = "https://bitbucket.org/ws/repo name.git" ; trailing\n'
+        "\tfetch = +refs/heads/*:refs/remotes/odd/*\n"
+        "[core]\n"
+        "\tbare\n"
+        "\tpath = a\\tb # comment\n"
+    )
+
+    assert config['remote.my "odd" name']["url"] == "https://bitbucket.org/ws/repo name.git"
+    assert config["core"] == {"bare": "true", "path": "a\tb"}
+
+
+def test_a_redefined_key_keeps_its_last_value(tmp_path):
+    make_repo(tmp_path, config=ORIGIN + "[core]\n\tbare = false\n" + '[remote "origin"]\n\tURL = https://bitbucket.org/moved/service.git\n')
+
+    assert _parse_config((tmp_path / ".git" / "config").read_text())["remote.origin"]["url"] == (
+        "https://bitbucket.org/moved/service.git"
+    )
+    assert get_repository_info(str(tmp_path)) == {"workspace": "moved", "repo": "service"}
+
+
+def test_config_line_continuation_is_unsupported():
+    with pytest.raises(_Unsupported):
+        _parse_config('[remote "origin"]\n\turl = https://bitbucket.org/\\\nws/repo.git\n')
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("git@bitbucket.org:ws/repo.git", ("ws", "repo")),
+    ("git@bitbucket.org:ws/repo", ("ws", "repo")),
+    ("https://bitbucket.org/ws/repo.git", ("ws", "repo")),
+    ("https://user@bitbucket.org/ws/repo/", ("ws", "repo")),
+])
+def test_parse_remote_url(url, expected):
+    assert parse_git_remote_url(url) == {"workspace": expected[0], "repo": expected[1]}
+
+
+def test_parse_rejects_non_bitbucket_remotes():
+    with pytest.raises(GitError):
+        parse_git_remote_url("git@github.com:ws/repo.git")
+
+
+def test_defaults_to_the_current_directory(tmp_path, monkeypatch):
+    make_repo(tmp_path)
+    monkeypatch.chdir(tmp_path)
+
+    assert _read_repository()["root"] == str(tmp_path)
@@ -0,0 +1,83 @@
+"""
+ABOUTME: Tests for listing pull requests across several repositories
+ABOUTME: Drives list_prs_multi_async against an in-memory fake of the async API
+"""
+
+import asyncio
+
+import pytest
+from click.testing import CliRunner
+
+from bitbucket_cli.cli import cli
+from bitbucket_cli.commands.list import list_prs_multi_async
+from bitbucket_cli.exceptions import NotFoundError
+
+
+class FakeAsyncAPI:
+    """The parts of AsyncBitbucketAPI that multi-repo listing uses."""
+
+    def __init__(self, prs):
+        self.prs = prs
+        self.listings = []
+
+    async def list_repositories(self, workspace):
+        return [{"full_name": f"{workspace}/{name}"} for name in sorted(self.prs)]
+
+    async def list_pull_requests(self, workspace, repo, limit=None, **params):
+        self.listings.append(dict(params, workspace=workspace, repo=repo, limit=limit))
+        prs = self.prs[repo]
+        if isinstance(prs, Exception):
+            raise prs
+        return prs[:limit] if limit else prs
+
+
+def pr(pr_id, updated_on):
+    return {"id": pr_id, "updated_on": updated_on}
+
+
+def list_multi(api, repos=None, **kwargs):
+    return asyncio.run(list_prs_multi_async(api, "ws", repos, **kwargs))
+
+
+@pytest.fixture
+def fake():
+    return FakeAsyncAPI({
+        "a": [pr(3, "2026-03-05"), pr(1, "2026-03-01")],
+        "b": [pr(4, "2026-03-06"), pr(2, "2026-03-02"), pr(5, None)],
+    })
+
+
+def test_lists_are_merged_newest_first(fake):
+    result = list_multi(fake, limit=None)
+
+    assert result["repos"] == ["ws/a", "ws/b"]
+    assert [p["id"] for p in result["pullrequests"]] == [4, 3, 2, 1, 5]
+    assert result["errors"] == []
+    assert {listing["sort"] for listing in fake.listings} == {"-updated_on"}
+
+
+def test_limit_applies_to_the_merged_list(fake):
+    result = list_multi(fake, ["a", "other/b"], limit=3)
+
+    assert [p["id"] for p in result["pullrequests"]] == [4, 3, 2]
+    assert [(listing["workspace"], listing["repo"]) for listing in fake.listings] == [("ws", "a"), ("other", "b")]
+
+
+def test_a_failing_repository_is_reported_without_hiding_the_others(fake):
+    fake.prs["b"] = NotFoundError("Repository not found")
+
+    result = list_multi(fake, limit=None)
+
+    assert [p["id"] for p in result["pullrequests"]] == [3, 1]
+    assert result["errors"] == [{"repo": "ws/b", "error": "Repository not found"}]
+
+
+@pytest.mark.parametrize("args", [
+    ["--workspace-wide", "--offline"],
+    ["--repos", "a,b", "--max-staleness", "60"],
+])
+def test_cli_rejects_the_mirror_across_repositories(config, args):
+    result = CliRunner().invoke(cli, ["-w", "ws", "pr", "list", *args], obj={"config": config})
+
+    assert result.exit_code == 2
+    assert "can't be combined with --offline or --max-staleness" in result.output
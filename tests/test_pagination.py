@@ -0,0 +1,155 @@
+"""
+ABOUTME: Tests for paginated reads: concurrent page fetches, streaming iteration and max_items budgets
+ABOUTME: Serves numbered and cursor pages from an in-memory collection in place of the API
+"""
+
+import math
+import random
+import threading
+import time
+
+import pytest
+
+from bitbucket_cli.api import MAX_PAGELEN, BitbucketAPI
+
+
+class PagedCollection:
+    """Answers api.get for one endpoint with pages of ``total`` integers."""
+
+    def __init__(self, total, pagelen=10, numbered=True, jitter=0.0):
+        self.total = total
+        self.pagelen = pagelen
+        self.numbered = numbered
+        self.jitter = jitter
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def __call__(self, endpoint, params=None):
+        params = dict(params or {})
+        if "?" in endpoint:
+            # A cursor ("next") URL: parameters travel in the query string
+            endpoint, _, query = endpoint.partition("?")
+            params.update(pair.split("=") for pair in query.split("&"))
+        page = int(params.get("page", 1))
+        pagelen = int(params.get("pagelen", self.pagelen))
+        with self._lock:
+            self.requests.append((page, pagelen))
+        if self.jitter:
+            # Later pages tend to finish first, so ordering has to be restored
+            time.sleep(random.uniform(0, self.jitter) / page)
+
+        values = list(range((page - 1) * pagelen, min(page * pagelen, self.total)))
+        response = {"values": values, "pagelen": pagelen}
+        if self.numbered:
+            response.update(size=self.total, page=page)
+        if page * pagelen < self.total:
+            response["next"] = f"/items?page={page + 1}&pagelen={pagelen}"
+        return response
+
+
+@pytest.fixture
+def collection(api):
+    def install(**kwargs):
+        pages = PagedCollection(**kwargs)
+        api.get = pages
+        return pages
+    return install
+
+
+def test_get_all_pages_returns_every_value_in_order(api, collection):
+    pages = collection(total=95, jitter=0.02)
+
+    assert api.get_all_pages("/items") == list(range(95))
+    assert sorted(page for page, _ in pages.requests) == list(range(1, 11))
+
+
+def test_remaining_pages_are_fetched_by_number_concurrently(api, collection):
+    pages = collection(total=200, jitter=0.05)
+    active = []
+    peak = [0]
+    inner = api.get
+
+    def tracking_get(endpoint, params=None):
+        active.append(1)
+        peak[0] = max(peak[0], len(active))
+        try:
+            return inner(endpoint, params)
+        finally:
+            active.pop()
+
+    api.get = tracking_get
+    assert api.get_all_pages("/items") == list(range(200))
+    assert peak[0] > 1
+    assert len(pages.requests) == 20
+
+
+def test_cursor_pagination_follows_next_links(api, collection):
+    pages = collection(total=25, numbered=False)
+
+    assert api.get_all_pages("/items") == list(range(25))
+    assert [page for page, _ in pages.requests] == [1, 2, 3]
+
+
+def test_sequential_mode_walks_next_links(api, collection):
+    pages = collection(total=30)
+
+    assert api.get_all_pages("/items", parallel=False) == list(range(30))
+    assert [page for page, _ in pages.requests] == [1, 2, 3]
+
+
+def test_iter_pages_yields_pages_in_order(api, collection):
+    collection(total=73, jitter=0.02)
+
+    numbers = [page["values"][0] // 10 + 1 for page in api.iter_pages("/items")]
+    assert numbers == list(range(1, 9))
+
+
+def test_iter_values_streams_before_the_last_page_is_fetched(api, collection):
+    pages = collection(total=1000)
+    api.max_workers = 2
+
+    values = api.iter_values("/items")
+    first = [next(values) for _ in range(10)]
+
+    assert first == list(range(10))
+    # Only the first page plus a bounded read-ahead window has been requested
+    assert len(pages.requests) <= 1 + 2 * api.max_workers
+    values.close()
+
+
+def test_max_items_stops_at_the_budget(api, collection):
+    pages = collection(total=1000)
+
+    assert api.get_all_pages("/items", max_items=60) == list(range(60))
+    # 60 items at the 50-per-page cap: two pages of 30, nothing past the budget
+    assert pages.requests == [(1, 30), (2, 30)]
+
+
+def test_max_items_within_the_first_page_costs_one_request(api, collection):
+    pages = collection(total=1000)
+
+    assert api.get_all_pages("/items", max_items=7) == list(range(7))
+    assert pages.requests == [(1, 7)]
+
+
+def test_max_items_over_cursor_pagination(api, collection):
+    pages = collection(total=1000, numbered=False)
+
+    assert api.get_all_pages("/items", max_items=120) == list(range(120))
+    assert len(pages.requests) == 3
+
+
+def test_max_items_larger_than_the_collection(api, collection):
+    collection(total=42)
+
+    assert api.get_all_pages("/items", max_items=500) == list(range(42))
+
+
+@pytest.mark.parametrize("max_items, cap", [(1, None), (49, None), (50, None), (51, None), (60, None),
+                                             (101, None), (1000, None), (25, 10), (7, 100)])
+def test_budget_pagelen_fetches_in_the_fewest_pages(max_items, cap):
+    pagelen = BitbucketAPI._budget_pagelen(max_items, cap)
+    limit = min(cap, MAX_PAGELEN) if cap else MAX_PAGELEN
+
+    assert 1 <= pagelen <= limit
+    assert math.ceil(max_items / pagelen) == math.ceil(max_items / limit)
@@ -0,0 +1,134 @@
+"""
+ABOUTME: Tests for the shared request scheduler: token bucket pacing, 429 backoff and Retry-After
+ABOUTME: Replaces sleeping with a recorder so waits are checked without slowing the suite
+"""
+
+import time
+from email.utils import formatdate
+
+import pytest
+
+from bitbucket_cli import api as api_module
+from bitbucket_cli.exceptions import BitbucketAPIError, ConfigurationError
+from bitbucket_cli.ratelimit import RequestScheduler, parse_retry_after
+
+from .helpers import FakeSession, make_response
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record sleeps (the scheduler's waits and the API's retry delays) instead of waiting."""
+    recorded = []
+    monkeypatch.setattr(time, "sleep", recorded.append)
+    return recorded
+
+
+def test_burst_is_free_then_requests_are_paced(sleeps):
+    scheduler = RequestScheduler(rate=10, burst=3)
+
+    waits = [scheduler.acquire() for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(0.1, abs=0.02)
+    assert waits[4] == pytest.approx(0.2, abs=0.02)
+    assert scheduler.stats()["throttle_waits"] == 2
+
+
+def test_429_halves_the_rate_down_to_the_floor():
+    scheduler = RequestScheduler(rate=8, min_rate=1)
+
+    rates = []
+    for _ in range(5):
+        scheduler.record_response(429, {})
+        rates.append(scheduler.rate)
+
+    assert rates == [4, 2, 1, 1, 1]
+    assert scheduler.stats()["rate_limited"] == 5
+
+
+def test_success_recovers_towards_the_ceiling():
+    scheduler = RequestScheduler(rate=10)
+    scheduler.record_response(429, {})
+
+    for _ in range(200):
+        scheduler.record_response(200, {})
+
+    assert scheduler.rate == 10
+
+
+def test_near_limit_warning_slows_down():
+    scheduler = RequestScheduler(rate=10)
+
+    scheduler.record_response(200, {"X-RateLimit-NearLimit": "true"})
+
+    assert scheduler.rate == 7.5
+
+
+def test_retry_after_blocks_every_caller(sleeps):
+    scheduler = RequestScheduler(rate=100, burst=100)
+
+    scheduler.record_response(429, {"Retry-After": "3"})
+
+    assert scheduler.acquire() == pytest.approx(3, abs=0.05)
+    assert sleeps and sleeps[0] == pytest.approx(3, abs=0.05)
+
+
+def test_exhausted_window_blocks_until_reset(sleeps):
+    scheduler = RequestScheduler(rate=100, burst=100)
+
+    scheduler.record_response(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 5)})
+
+    assert scheduler.acquire() == pytest.approx(5, abs=0.1)
+    assert scheduler.stats()["last_rate_limit_headers"]["X-RateLimit-Remaining"] == "0"
+
+
+def test_retry_delay_prefers_retry_after_and_caps_it():
+    scheduler = RequestScheduler(backoff_cap=30)
+
+    assert scheduler.retry_delay(0, {"Retry-After": "7"}) == 7
+    assert scheduler.retry_delay(0, {"Retry-After": "3600"}) == 30
+    assert all(0 <= scheduler.retry_delay(attempt) <= min(30, 0.5 * 2 ** attempt) for attempt in range(10))
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("12") == 12
+    assert parse_retry_after("-4") == 0
+    assert parse_retry_after(formatdate(time.time() + 60, usegmt=True)) == pytest.approx(60, abs=2)
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+@pytest.mark.parametrize("key, value", [("rate_limit", 0), ("rate_limit", -1), ("rate_limit", "fast"),
+                                        ("burst", 0), ("rate_limit", True)])
+def test_config_rejects_non_positive_limits(key, value):
+    with pytest.raises(ConfigurationError, match=f"api.{key}"):
+        RequestScheduler.from_config({"api": {key: value}})
+
+
+def test_config_defaults():
+    scheduler = RequestScheduler.from_config({})
+
+    assert (scheduler.max_rate, scheduler.burst) == (10, 20)
+
+
+def test_api_retries_429_after_retry_after(config, sleeps):
+    config["api"]["retries"] = 2
+    client = api_module.BitbucketAPI(config)
+    answers = [make_response(429, headers={"Retry-After": "2"}), make_response(200, {"ok": True})]
+    client.session = FakeSession(lambda m, u, k: answers.pop(0))
+
+    assert client.get("/user") == {"ok": True}
+    assert len(client.session.calls) == 2
+    assert 2 in sleeps
+    assert client.scheduler.stats()["retries"] == 1
+
+
+def test_posts_are_retried_only_on_429(config, sleeps):
+    config["api"]["retries"] = 2
+    client = api_module.BitbucketAPI(config)
+    client.session = FakeSession(lambda m, u, k: make_response(503, {"error": {"message": "busy"}}))
+
+    with pytest.raises(BitbucketAPIError):
+        client.post("/repositories/ws/repo/pullrequests", json={})
+
+    assert len(client.session.calls) == 1
@@ -0,0 +1,75 @@
+"""
+ABOUTME: Tests for the plain output backend: JSON layout and when stdout gets flushed
+ABOUTME: Writes to in-memory streams that count flushes instead of to the real stdout
+"""
+
+import io
+import json
+
+from bitbucket_cli.utils.render import write_json, write_json_array, write_ndjson
+
+
+class CountingBuffer(io.BytesIO):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+        super().flush()
+
+
+class Stream:
+    """A text stream over a CountingBuffer; ``line_buffering`` mimics a terminal."""
+
+    def __init__(self, line_buffering=False):
+        self.buffer = CountingBuffer()
+        self.line_buffering = line_buffering
+
+    def text(self):
+        return self.buffer.getvalue().decode("utf-8")
+
+
+def test_ndjson_rows_are_not_flushed_one_by_one_to_a_pipe():
+    out = Stream()
+    for n in range(100):
+        write_ndjson({"n": n, "name": "ü"}, out)
+
+    assert out.buffer.flushes == 0
+    assert [json.loads(line) for line in out.text().splitlines()] == [{"n": n, "name": "ü"} for n in range(100)]
+
+
+def test_ndjson_flushes_when_asked_or_on_a_terminal():
+    piped = Stream()
+    write_ndjson({"a": 1}, piped, flush=True)
+    terminal = Stream(line_buffering=True)
+    write_ndjson({"a": 1}, terminal)
+
+    assert piped.buffer.flushes == 1
+    assert terminal.buffer.flushes == 1
+
+
+def test_json_array_matches_whole_list_layout():
+    items = [{"id": 1, "tags": ["x"]}, {"id": 2, "tags": []}]
+    streamed, whole = Stream(), Stream()
+
+    write_json_array(iter(items), streamed)
+    write_json(items, whole)
+
+    assert streamed.text() == whole.text()
+    assert json.loads(streamed.text()) == items
+
+
+def test_empty_json_array():
+    out = Stream()
+    write_json_array([], out)
+
+    assert out.text() == "[]\n"
+
+
+def test_text_streams_without_a_buffer():
+    out = io.StringIO()
+    write_ndjson({"a": "b"}, out)
+
+    assert out.getvalue().endswith("\n")
+    assert json.loads(out.getvalue()) == {"a": "b"}
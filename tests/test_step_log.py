@@ -0,0 +1,92 @@
+"""
+ABOUTME: Tests for tailing pipeline step logs with suffix byte-range requests
+ABOUTME: Serves a log behind a fake S3 redirect that honours, ignores or shortens Range headers
+"""
+
+import pytest
+
+from bitbucket_cli import api as api_module
+
+from .helpers import FakeSession, make_response
+
+S3_URL = "https://s3.test/logs/step.txt?X-Amz-Signature=secret"
+
+
+def log_text(count):
+    return "".join(f"line {n}\n" for n in range(1, count + 1)).encode()
+
+
+def serve(log, honour_range=True, missing=False):
+    """Handler: the log endpoint redirects to S3, which answers suffix ranges."""
+
+    def handler(method, url, kwargs):
+        if "/steps/" in url:
+            assert kwargs["allow_redirects"] is False
+            if missing:
+                return make_response(404)
+            return make_response(302, headers={"Location": S3_URL})
+        assert "Authorization" not in (kwargs.get("headers") or {})
+        requested = (kwargs.get("headers") or {}).get("Range")
+        if not honour_range or requested is None:
+            return make_response(200, log)
+        size = int(requested.split("-")[1])
+        start = max(0, len(log) - size)
+        headers = {"Content-Range": f"bytes {start}-{len(log) - 1}/{len(log)}"}
+        return make_response(206, log[start:], headers=headers)
+
+    return handler
+
+
+def ranges(api):
+    return [kwargs["headers"].get("Range") for method, url, kwargs in api.session.calls if url == S3_URL]
+
+
+@pytest.fixture
+def small_window(monkeypatch):
+    monkeypatch.setattr(api_module, "LOG_TAIL_INITIAL_BYTES", 64)
+
+
+def test_first_range_covers_the_tail(api, small_window):
+    api.session = FakeSession(serve(log_text(1000)))
+
+    tail = api.get_step_log_tail("ws", "repo", "{p}", "{s}", lines=3)
+
+    assert tail == "line 998\nline 999\nline 1000"
+    assert ranges(api) == ["bytes=-64"]
+
+
+def test_range_widens_until_enough_lines_arrive(api, small_window):
+    api.session = FakeSession(serve(log_text(1000)))
+
+    tail = api.get_step_log_tail("ws", "repo", "{p}", "{s}", lines=40)
+
+    assert tail.splitlines() == [f"line {n}" for n in range(961, 1001)]
+    assert ranges(api) == ["bytes=-64", "bytes=-256", "bytes=-1024"]
+
+
+def test_short_logs_stop_once_the_whole_log_is_returned(api, small_window):
+    api.session = FakeSession(serve(log_text(5)))
+
+    assert api.get_step_log_tail("ws", "repo", "{p}", "{s}", lines=50) == "\n".join(f"line {n}" for n in range(1, 6))
+    assert len(ranges(api)) == 1
+
+
+def test_ignored_range_streams_the_body_keeping_only_the_tail(api, small_window):
+    api.session = FakeSession(serve(log_text(1000), honour_range=False))
+
+    assert api.get_step_log_tail("ws", "repo", "{p}", "{s}", lines=2) == "line 999\nline 1000"
+
+
+def test_missing_log_is_empty(api):
+    api.session = FakeSession(serve(b"", missing=True))
+
+    assert api.get_step_log_tail("ws", "repo", "{p}", "{s}", lines=10) == ""
+    assert api.get_step_log_tail("ws", "repo", "{p}", "{s}", lines=0) == ""
+
+
+def test_step_uuids_are_url_encoded(api):
+    api.session = FakeSession(serve(log_text(3)))
+
+    api.get_step_log_tail("ws", "repo", "{p}", "{s}", lines=1)
+
+    assert api.session.calls[0][1].endswith("/pipelines/%7Bp%7D/steps/%7Bs%7D/log")
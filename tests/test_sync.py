@@ -0,0 +1,242 @@
+"""
+ABOUTME: Tests for incremental sync into the local mirror and the PullRequestIndex it writes
+ABOUTME: Drives sync_repos_async against an in-memory fake of the async API and an in-memory index
+"""
+
+import asyncio
+
+import pytest
+
+from bitbucket_cli.commands.sync import (
+    ALL_STATES,
+    mirror_pull_request_scope,
+    mirror_scope,
+    open_mirror,
+    sync_repo_pull_requests,
+    sync_repos_async,
+)
+from bitbucket_cli.exceptions import NotFoundError
+from bitbucket_cli.store import PullRequestIndex
+
+
+def make_pr(pr_id, updated_on, state="OPEN", title=None, source="feature", destination="main"):
+    return {
+        "id": pr_id,
+        "title": title or f"PR {pr_id}",
+        "state": state,
+        "author": {"uuid": "{alice}", "nickname": "alice", "display_name": "Alice"},
+        "reviewers": [{"uuid": "{bob}", "nickname": "bob", "display_name": "Bob"}],
+        "source": {"branch": {"name": source}},
+        "destination": {"branch": {"name": destination}, "repository": {"full_name": "ws/repo"}},
+        "created_on": "2026-01-01T00:00:00+00:00",
+        "updated_on": updated_on,
+    }
+
+
+class FakeAsyncAPI:
+    """The parts of AsyncBitbucketAPI that sync uses, answered from dicts."""
+
+    def __init__(self, config):
+        self.config = config
+        self.prs = {}
+        self.comments = {}
+        self.activity = {}
+        self.failing_comments = set()
+        self.listings = []
+        self.comment_fetches = []
+
+    async def list_repositories(self, workspace):
+        return [{"full_name": f"{workspace}/repo"}]
+
+    async def list_pull_requests(self, workspace, repo, fetch_all=False, state=None, updated_since=None, **params):
+        self.listings.append({"state": state, "updated_since": updated_since})
+        prs = [pr for pr in self.prs.values() if pr["state"] in (state or ["OPEN"])]
+        if updated_since:
+            prs = [pr for pr in prs if pr["updated_on"] > updated_since]
+        return sorted(prs, key=lambda pr: pr["updated_on"], reverse=True)
+
+    async def iter_comments(self, workspace, repo, pr_id, updated_since=None):
+        self.comment_fetches.append(pr_id)
+        if pr_id in self.failing_comments:
+            raise RuntimeError("comments unavailable")
+        for comment in self.comments.get(pr_id, []):
+            if updated_since is None or comment["updated_on"] > updated_since:
+                yield comment
+
+    async def iter_activity(self, workspace, repo, pr_id):
+        for entry in self.activity.get(pr_id, []):
+            yield entry
+
+    async def list_pipelines(self, workspace, repo, limit=None):
+        raise NotFoundError("Pipelines are not enabled")
+
+
+@pytest.fixture
+def index():
+    store = PullRequestIndex(path=None)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def fake(config):
+    api = FakeAsyncAPI(config)
+    api.prs = {1: make_pr(1, "2026-03-01T10:00:00+00:00"), 2: make_pr(2, "2026-03-02T10:00:00+00:00")}
+    api.comments = {1: [{"id": 10, "created_on": "2026-03-01T09:00:00+00:00", "updated_on": "2026-03-01T09:00:00+00:00"}]}
+    api.activity = {1: [{"approval": {"date": "2026-03-01T09:30:00+00:00"}}]}
+    return api
+
+
+def sync(api, index, **kwargs):
+    return asyncio.run(sync_repos_async(api, "ws", ["repo"], index=index, **kwargs))
+
+
+def test_first_sync_mirrors_prs_comments_and_activity(fake, index):
+    result = sync(fake, index)
+
+    assert result["errors"] == []
+    assert result["repos"] == [
+        {"repo": "ws/repo", "pullrequests": 2, "comments": 1, "activity": 1, "pipelines": 0}
+    ]
+    assert index.get_pull_request("ws", "repo", 2)["title"] == "PR 2"
+    assert [c["id"] for c in index.comments("ws", "repo", 1)] == [10]
+    assert len(index.activity("ws", "repo", 1)) == 1
+    assert index.high_water(mirror_pull_request_scope("ws/repo", None)) == "2026-03-02T10:00:00+00:00"
+    assert index.synced_at(mirror_scope("ws/repo")) is not None
+
+
+def test_later_syncs_fetch_only_changes_in_every_state(fake, index):
+    sync(fake, index, state="OPEN")
+    fake.prs[1] = dict(fake.prs[1], state="MERGED", updated_on="2026-03-05T00:00:00+00:00")
+    fake.activity[1].insert(0, {"update": {"date": "2026-03-05T00:00:00+00:00", "state": "MERGED"}})
+
+    result = sync(fake, index, state="OPEN")
+
+    assert fake.listings[0] == {"state": ["OPEN"], "updated_since": None}
+    assert fake.listings[1] == {"state": ALL_STATES, "updated_since": "2026-03-02T10:00:00+00:00"}
+    assert result["repos"][0]["pullrequests"] == 1
+    # Only the new activity entry is appended
+    assert result["repos"][0]["activity"] == 1
+    assert index.get_pull_request("ws", "repo", 1)["state"] == "MERGED"
+
+
+def test_failed_detail_sync_does_not_advance_the_high_water_mark(fake, index):
+    fake.failing_comments = {1}
+
+    result = sync(fake, index)
+
+    assert result["errors"][0]["error"] == "comments unavailable"
+    assert index.high_water(mirror_pull_request_scope("ws/repo", None)) is None
+
+    # The next sync lists the same PRs again and fills in what was missed
+    fake.failing_comments = set()
+    fake.comment_fetches.clear()
+    result = sync(fake, index)
+
+    assert result["errors"] == []
+    assert sorted(fake.comment_fetches) == [1, 2]
+    assert [c["id"] for c in index.comments("ws", "repo", 1)] == [10]
+
+
+def test_a_search_refresh_does_not_hide_prs_from_the_mirror(fake, index):
+    # `bb pr search` indexes the PRs without their comments
+    asyncio.run(sync_repo_pull_requests(fake, index, "ws/repo"))
+
+    sync(fake, index)
+
+    assert sorted(fake.comment_fetches) == [1, 2]
+    assert [c["id"] for c in index.comments("ws", "repo", 1)] == [10]
+
+
+def test_open_mirror_offline(api, index):
+    with pytest.raises(NotFoundError, match="only kept while caching is enabled"):
+        open_mirror(api, "ws", "repo", offline=True, index=index)
+
+
+def test_open_mirror_offline_needs_a_previous_sync(api, tmp_path):
+    store = PullRequestIndex(path=tmp_path / "index.db")
+    try:
+        with pytest.raises(NotFoundError, match="has not been synced yet"):
+            open_mirror(api, "ws", "repo", offline=True, index=store)
+        store.mark_synced(mirror_scope("ws/repo"), None)
+        assert open_mirror(api, "ws", "repo", offline=True, index=store) is store
+    finally:
+        store.close()
+
+
+def test_index_follows_the_cache_setting(config):
+    assert PullRequestIndex.from_config(config).path is None
+    config["cache"]["enabled"] = True
+    assert PullRequestIndex.from_config(config).path is not None
+
+
+# ─── Index ────────────────────────────────────────────────────────────
+
+
+def test_high_water_mark_never_moves_backwards(index):
+    index.mark_synced("scope", "2026-03-02")
+    index.mark_synced("scope", "2026-03-01")
+    index.mark_synced("scope", None)
+
+    assert index.high_water("scope") == "2026-03-02"
+
+
+def test_search_filters(index):
+    index.upsert_pull_requests([
+        make_pr(1, "2026-03-01T00:00:00+00:00", title="Fix login bug", source="fix/login"),
+        make_pr(2, "2026-03-02T00:00:00+00:00", state="MERGED", destination="release"),
+        make_pr(3, "2026-03-03T00:00:00+00:00", title="Add LOGIN page"),
+    ])
+
+    def ids(**filters):
+        return [pr["id"] for pr in index.search(repos=["ws/repo"], **filters)]
+
+    assert ids() == [3, 2, 1]
+    assert ids(state="open") == [3, 1]
+    assert ids(branch="fix/login") == [1]
+    assert ids(destination_branch="release") == [2]
+    assert ids(title_contains="login") == [3, 1]
+    assert ids(updated_since="2026-03-02T00:00:00+00:00") == [3, 2]
+    assert ids(updated_before="2026-03-02T00:00:00+00:00") == [1]
+    assert ids(author={"nickname": "alice"}) == [3, 2, 1]
+    assert ids(reviewer={"uuid": "{bob}"}) == [3, 2, 1]
+    assert ids(reviewer={"nickname": "carol"}) == []
+    assert ids(limit=1) == [3]
+
+
+# ─── Freshness by synced state ────────────────────────────────────────
+
+
+@pytest.fixture
+def disk_index(tmp_path):
+    store = PullRequestIndex(path=tmp_path / "index.db")
+    yield store
+    store.close()
+
+
+def test_offline_reads_accept_the_state_that_was_synced(fake, api, disk_index):
+    sync(fake, disk_index, state="OPEN")
+
+    assert open_mirror(api, "ws", "repo", offline=True, index=disk_index, state="OPEN") is disk_index
+    assert open_mirror(api, "ws", "repo", offline=True, index=disk_index) is disk_index
+    with pytest.raises(NotFoundError, match="no MERGED pull requests synced"):
+        open_mirror(api, "ws", "repo", offline=True, index=disk_index, state="MERGED")
+    with pytest.raises(NotFoundError, match="has not been synced yet"):
+        open_mirror(api, "ws", "repo", offline=True, index=disk_index, state="ALL")
+
+
+def test_staleness_is_judged_by_the_synced_state(fake, api, disk_index, monkeypatch):
+    from bitbucket_cli.commands import sync as sync_module
+
+    refreshes = []
+    monkeypatch.setattr(sync_module, "sync_repos", lambda *args, **kwargs: refreshes.append(kwargs["state"]) or {"errors": []})
+    sync(fake, disk_index, state="OPEN")
+
+    open_mirror(api, "ws", "repo", max_staleness=60, index=disk_index, state="OPEN")
+    open_mirror(api, "ws", "repo", max_staleness=60, index=disk_index)
+    assert refreshes == []  # Fresh enough: no refresh
+
+    open_mirror(api, "ws", "repo", max_staleness=60, index=disk_index, state="ALL")
+    open_mirror(api, "ws", "repo", max_staleness=60, index=disk_index, state="MERGED")
+    open_mirror(api, "ws", "repo", max_staleness=0, index=disk_index, state="OPEN")
+    assert refreshes == [None, "MERGED", "OPEN"]